@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Benchmarks run outside pytest, so mirror conftest.py and put the layers on the path.
+_DEV_ENV = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for _layer in ("common_layer/python", "shared_layer/python"):
+    _path = os.path.join(_DEV_ENV, _layer)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
@@ -0,0 +1,131 @@
+"""Cold-start import profile for every Lambda handler module.
+
+Each handler module is imported in a fresh interpreter (as Lambda does on a
+cold start) and the script reports the import time, the peak RSS added by the
+import and, with --top, the slowest modules reported by ``python -X importtime``.
+Use --json to save the numbers so init duration can be compared across releases.
+
+Usage (from dev-env):
+    python -m benchmarks.bench_cold_start [--repeat N] [--top N] [--json PATH]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HANDLER_MODULES = (
+    "lambda_functions.orchestrator.app",
+    "lambda_functions.open_search.app",
+    "lambda_functions.sql_comment_ingest.app",
+    "lambda_functions.sql_docket_ingest.app",
+    "lambda_functions.sql_document_ingest.app",
+    "lambda_functions.sql_federal_document_ingest.app",
+    "lambda_functions.sql_htm_summary.app",
+    "lambda_functions.pdf_text_extract.app",
+)
+
+_DEV_ENV = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Runs inside the child interpreter; prints one JSON line with the measurements.
+_PROBE = """
+import importlib, json, resource, sys, time
+sys.path[:0] = {paths!r}
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "import_ms": elapsed * 1000, "baseline_rss_kb": baseline, "peak_rss_kb": peak
+}}))
+"""
+
+
+_MARKER = "--handler-import-start--"
+
+
+def _parse_importtime(stderr, top):
+    """
+    Return the `top` slowest modules (cumulative microseconds) from -X importtime output.
+    """
+    rows = []
+    # Interpreter start-up imports are logged before the marker and are not the handler's
+    # cost.
+    stderr = stderr.split(_MARKER, 1)[-1]
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def profile_module(module, top=0):
+    """Import module in a fresh interpreter and return its measurements."""
+    paths = [
+        _DEV_ENV,
+        os.path.join(_DEV_ENV, "shared_layer", "python"),
+        os.path.join(_DEV_ENV, "common_layer", "python"),
+    ]
+    cmd = [sys.executable]
+    if top:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", _PROBE.format(paths=paths, module=module, marker=_MARKER)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=_DEV_ENV)
+    if proc.returncode != 0:
+        return {"module": module, "error": proc.stderr.strip().splitlines()[-1]}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["module"] = module
+    result["added_rss_kb"] = result["peak_rss_kb"] - result["baseline_rss_kb"]
+    if top:
+        result["slowest_imports"] = _parse_importtime(proc.stderr, top)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="fresh interpreters per module; the fastest run is kept",
+    )
+    parser.add_argument(
+        "--top", type=int, default=0, help="also list the N slowest imports per module"
+    )
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    parser.add_argument("modules", nargs="*", default=HANDLER_MODULES)
+    args = parser.parse_args(argv)
+
+    results = []
+    for module in args.modules:
+        runs = [profile_module(module, top=args.top) for _ in range(max(1, args.repeat))]
+        ok = [r for r in runs if "error" not in r]
+        results.append(min(ok, key=lambda r: r["import_ms"]) if ok else runs[0])
+
+    print(f"{'module':52} {'import ms':>10} {'peak RSS MB':>12} {'added MB':>9}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['module']:52} error: {r['error']}")
+            continue
+        print(
+            f"{r['module']:52} {r['import_ms']:10.1f} "
+            f"{r['peak_rss_kb'] / 1024:12.1f} {r['added_rss_kb'] / 1024:9.1f}"
+        )
+        for cumulative_us, name in r.get("slowest_imports", []):
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
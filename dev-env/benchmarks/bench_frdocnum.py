@@ -0,0 +1,114 @@
+"""Benchmark frdocnum collection on large document / docket payloads.
+
+Compares the recursive walk the ingest functions used to have (json.loads
+and a recursive visit of every node), the shared iterative walk over the
+parsed tree, and the raw JSON scan that never builds the tree. The synthetic
+payloads follow the regulations.gov document shape, with a list of included
+records that carry long text fields and a few frDocNum members.
+
+Usage (from dev-env):
+    python -m benchmarks.bench_frdocnum [--records N ...] [--repeat N]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from shared.frdocnum import collect_frdocnums, scan_frdocnums
+
+_FR_KEYS = frozenset({"frdocnum", "fdocnum"})
+
+
+def make_payload(records):
+    included = [
+        {
+            "id": f"EPA-HQ-OAR-2021-0317-{n:04d}",
+            "type": "documents",
+            "attributes": {
+                "title": f"Standards of Performance, supporting document {n}",
+                "abstract": (
+                    "The Environmental Protection Agency is proposing amendments. " * 20
+                ),
+                "frDocNum": f"2021-{24000 + n}" if n % 50 == 0 else None,
+                "topics": ["Air Pollution Control", "Reporting and Recordkeeping"],
+                "fileFormats": [
+                    {"format": "pdf", "size": 1000 + n},
+                    {"format": "htm", "size": 200 + n},
+                ],
+            },
+        }
+        for n in range(records)
+    ]
+    payload = {
+        "data": {
+            "id": "EPA-HQ-OAR-2021-0317-0001",
+            "attributes": {"frDocNum": "2021-24202"},
+        }
+    }
+    payload["included"] = included
+    return json.dumps(payload)
+
+
+def legacy_collect(raw):
+    """json.loads and the recursive walk of the per-function frdocnum_extract modules."""
+    found = set()
+
+    def visit(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(key, str) and key.lower() in _FR_KEYS and value is not None:
+                    text = str(value).strip()
+                    if text:
+                        found.add(text)
+                visit(value)
+        elif isinstance(node, list):
+            for item in node:
+                visit(item)
+
+    visit(json.loads(raw))
+    return found
+
+
+def walk_collect(raw):
+    return collect_frdocnums(json.loads(raw))
+
+
+def _best_of(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(data)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--records", type=int, nargs="*", default=[10, 1000, 10000, 50000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'bytes':>10} {'legacy ms':>10} {'walk ms':>9} {'scan ms':>9} "
+        f"{'scan speedup':>13}"
+    )
+    for records in args.records:
+        raw = make_payload(records)
+        legacy_seconds, expected = _best_of(legacy_collect, raw, args.repeat)
+        walk_seconds, walked = _best_of(walk_collect, raw, args.repeat)
+        scan_seconds, scanned = _best_of(scan_frdocnums, raw, args.repeat)
+        if not expected == walked == scanned:
+            print(f"{len(raw)} bytes: collectors disagree", file=sys.stderr)
+            return 1
+        print(
+            f"{len(raw):10d} {legacy_seconds * 1000:10.2f} {walk_seconds * 1000:9.2f} "
+            f"{scan_seconds * 1000:9.2f} {legacy_seconds / scan_seconds:12.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
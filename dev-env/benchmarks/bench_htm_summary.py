@@ -0,0 +1,133 @@
+"""Benchmark the streaming HTM summary scanner against the BeautifulSoup pipeline.
+
+The synthetic documents follow the Federal Register HTM layout (a <pre>
+body with the preamble, SUMMARY, DATES and a long supplementary section),
+at several sizes. The streaming scanner is fed 16 KB chunks, as the handler
+reads them from S3.
+
+Usage (from dev-env):
+    python -m benchmarks.bench_htm_summary [--paragraphs N ...] [--repeat N]
+"""
+
+import argparse
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from lambda_functions.sql_htm_summary.summary_scanner import extract_summary
+
+CHUNK_BYTES = 16384
+
+_PREAMBLE = """<html>
+<head><title>Federal Register, Volume 88 Issue 12 (Thursday, January 19, 2023)</title>\
+</head>
+<body><pre>
+[Federal Register Volume 88, Number 12 (Thursday, January 19, 2023)]
+[Proposed Rules]
+[Pages 3355-3457]
+From the Federal Register Online via the Government Publishing Office \
+[<a href="https://www.gpo.gov/">www.gpo.gov</a>]
+
+-----------------------------------------------------------------------
+
+DEPARTMENT OF AGRICULTURE
+
+Animal and Plant Health Inspection Service
+
+7 CFR Part 319
+
+[Docket No. APHIS-2022-0055]
+
+AGENCY: Animal and Plant Health Inspection Service, USDA.
+
+ACTION: Proposed rule.
+
+-----------------------------------------------------------------------
+
+SUMMARY: We are proposing to amend the fruits and vegetables regulations to
+allow the importation of fresh citrus from Chile into the continental
+United States. As a condition of entry, the fruit would have to be produced
+in accordance with a systems approach.
+
+DATES: We will consider all comments that we receive on or before March 20, 2023.
+
+SUPPLEMENTARY INFORMATION:
+
+"""
+
+_PARAGRAPH = (
+    "Under the regulations in &sect; 319.56-4, the Administrator may authorize the\n"
+    "importation of a fruit or vegetable into the United States if the risks\n"
+    "presented by its importation can be mitigated by one or more of the\n"
+    "designated phytosanitary measures (<a href=\"#\">see table {n}</a>).\n"
+)
+
+
+def make_document(paragraphs):
+    body = "\n".join(
+        _PARAGRAPH.format(n=n)
+        + (f"\n[[Page {3356 + n // 20}]]\n" if n % 20 == 19 else "")
+        for n in range(paragraphs)
+    )
+    return (_PREAMBLE + body + "\n</pre></body></html>\n").encode("utf-8")
+
+
+def legacy_summary(data):
+    """The handler's BeautifulSoup pipeline before the streaming scanner."""
+    plain_text = BeautifulSoup(data.decode("utf-8"), "html.parser").get_text()
+    summary_start = plain_text.find("SUMMARY:")
+    if summary_start == -1:
+        return None
+    summary_text = plain_text[summary_start + len("SUMMARY:"):]
+    summary_text = re.sub(r'\n?\s*\[\[Page \d+\]\]\s*\n?', ' ', summary_text)
+    empty_line_match = re.search(r'\n\s*\n', summary_text)
+    if empty_line_match:
+        summary_text = summary_text[:empty_line_match.start()].strip()
+    return re.sub(r'\s+', ' ', summary_text).strip()
+
+
+def streaming_summary(data):
+    return extract_summary(
+        data[i:i + CHUNK_BYTES] for i in range(0, len(data), CHUNK_BYTES)
+    )
+
+
+def _best_of(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(data)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--paragraphs", type=int, nargs="*", default=[10, 200, 2000, 20000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>10} {'bs4 ms':>9} {'stream ms':>10} {'speedup':>8}")
+    for paragraphs in args.paragraphs:
+        data = make_document(paragraphs)
+        legacy_seconds, expected = _best_of(legacy_summary, data, args.repeat)
+        stream_seconds, summary = _best_of(streaming_summary, data, args.repeat)
+        if summary != expected:
+            print(
+                f"{len(data)} bytes: output differs from the BeautifulSoup pipeline",
+                file=sys.stderr,
+            )
+            return 1
+        print(
+            f"{len(data):10d} {legacy_seconds * 1000:9.2f} {stream_seconds * 1000:10.2f} "
+            f"{legacy_seconds / stream_seconds:7.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Compare the registered PDF extraction backends for throughput and output length.
+
+Every backend extracts every document of the fixed corpus serially (one
+process), so the numbers compare engines rather than parallelism. The
+"selected" column shows which backend the handler would pick.
+
+Usage (from dev-env):
+    python -m benchmarks.bench_pdf_backends [--backend NAME ...] [--pages N ...]
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks.pdf_corpus import default_corpus, make_pdf
+from lambda_functions.pdf_text_extract.backends import (
+    get_backend,
+    registered_backends,
+    select_backend,
+)
+from lambda_functions.pdf_text_extract.parallel_extract import extract_text_from_file
+from lambda_functions.pdf_text_extract.pdf_input import mapped_file
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--backend", nargs="*", help="backends to compare (default: all registered)"
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        nargs="*",
+        help="page counts to generate instead of the default corpus",
+    )
+    args = parser.parse_args(argv)
+
+    backends = (
+        [get_backend(name) for name in args.backend]
+        if args.backend
+        else registered_backends()
+    )
+    corpus = (
+        [(f"{n} pages", make_pdf(n)) for n in args.pages]
+        if args.pages
+        else default_corpus()
+    )
+
+    print(
+        f"{'document':28} {'backend':15} {'seconds':>8} {'pages/s':>8} "
+        f"{'chars':>9}  selected"
+    )
+    for name, path in corpus:
+        with mapped_file(path) as data:
+            selected = select_backend(data).name
+        for backend in backends:
+            page_stats = []
+            started = time.perf_counter()
+            text = extract_text_from_file(
+                path, page_stats, max_workers=1, backend=backend
+            )
+            seconds = time.perf_counter() - started
+            rate = len(page_stats) / seconds if seconds else float("inf")
+            marker = "*" if backend.name == selected else ""
+            print(
+                f"{name:28} {backend.name:15} {seconds:8.2f} {rate:8.1f} "
+                f"{len(text):9d}  {marker}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
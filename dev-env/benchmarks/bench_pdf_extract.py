@@ -0,0 +1,79 @@
+"""Benchmark single-pass PDF text extraction against the previous double-extract version.
+
+Usage (from dev-env):
+    python -m benchmarks.bench_pdf_extract [--pages N ...]
+"""
+
+import argparse
+import io
+import sys
+import time
+
+from benchmarks.pdf_corpus import default_corpus, make_pdf
+from lambda_functions.pdf_text_extract.app import (
+    PdfReader,
+    extract_text,
+    summarize_page_stats,
+)
+
+
+def legacy_extract_text(file_stream):
+    """The extractor before single-pass streaming: extract_text() ran twice per page."""
+    reader = PdfReader(file_stream)
+    return " ".join(
+        [
+            page.extract_text().replace("\n", " ")
+            for page in reader.pages
+            if page.extract_text()
+        ]
+    ).strip()
+
+
+def _time(fn, path):
+    with open(path, "rb") as f:
+        data = f.read()
+    started = time.perf_counter()
+    result = fn(io.BytesIO(data))
+    return time.perf_counter() - started, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--pages",
+        type=int,
+        nargs="*",
+        help="page counts to generate instead of the default corpus",
+    )
+    args = parser.parse_args(argv)
+
+    corpus = (
+        [(f"{n} pages", make_pdf(n)) for n in args.pages]
+        if args.pages
+        else default_corpus()
+    )
+
+    print(
+        f"{'document':28} {'legacy s':>9} {'stream s':>9} {'speedup':>8} "
+        f"{'chars':>9}  slowest page"
+    )
+    for name, path in corpus:
+        legacy_seconds, legacy_text = _time(legacy_extract_text, path)
+        page_stats = []
+        stream_seconds, text = _time(
+            lambda stream: extract_text(stream, page_stats), path
+        )
+        if text != legacy_text:
+            print(f"{name}: output differs from the legacy extractor", file=sys.stderr)
+            return 1
+        summary = summarize_page_stats(page_stats)
+        print(
+            f"{name:28} {legacy_seconds:9.2f} {stream_seconds:9.2f} "
+            f"{legacy_seconds / stream_seconds:7.2f}x {len(text):9d}  "
+            f"#{summary['slowest_page']} ({summary['slowest_page_seconds']:.3f}s)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
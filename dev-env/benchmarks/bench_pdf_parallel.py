@@ -0,0 +1,59 @@
+"""Speedup of multi-process PDF extraction against worker count.
+
+Run this on a machine (or Lambda memory size) with the vCPU count you want to
+size for; worker counts above the available vCPUs will not speed anything up.
+
+Usage (from dev-env):
+    python -m benchmarks.bench_pdf_parallel [--pages N] [--workers 1 2 4 ...]
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks.pdf_corpus import make_pdf
+from lambda_functions.pdf_text_extract import parallel_extract
+from lambda_functions.pdf_text_extract.parallel_extract import (
+    available_cpus,
+    extract_text_from_file,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="*")
+    args = parser.parse_args(argv)
+
+    cpus = available_cpus()
+    worker_counts = args.workers or sorted({1, 2, 4, cpus} | {cpus * 2})
+    path = make_pdf(args.pages)
+    # Always take the parallel path so worker count is the only variable.
+    parallel_extract.PARALLEL_PAGE_THRESHOLD = 1
+
+    print(f"{args.pages}-page synthetic PDF, {cpus} vCPU(s) available")
+    print(f"{'workers':>7} {'seconds':>8} {'speedup':>8} {'pages/s':>8}")
+    baseline = None
+    reference = None
+    for workers in worker_counts:
+        started = time.perf_counter()
+        text = extract_text_from_file(path, max_workers=workers)
+        seconds = time.perf_counter() - started
+        if reference is None:
+            reference = text
+        elif text != reference:
+            print(
+                f"{workers} workers: output differs from the 1-worker run",
+                file=sys.stderr,
+            )
+            return 1
+        baseline = baseline or seconds
+        print(
+            f"{workers:7d} {seconds:8.2f} {baseline / seconds:7.2f}x "
+            f"{args.pages / seconds:8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Micro-benchmark for the orchestrator routing table.
+
+Resolves a corpus of real mirrulations key shapes many times and reports the
+mean cost per key. Exits with status 1 when the mean exceeds the budget.
+
+Usage (from dev-env):
+    python -m benchmarks.bench_routing [--iterations N] [--budget-ns NS]
+"""
+
+import argparse
+import sys
+import timeit
+
+from lambda_functions.orchestrator.app import resolve_route
+
+# Key shapes seen in the mirrulations bucket, plus legacy flat keys used in local testing.
+KEY_CORPUS = (
+    "raw-data/CMS/CMS-2020-0098/text-CMS-2020-0098/docket/CMS-2020-0098.json",
+    "raw-data/CMS/CMS-2020-0098/text-CMS-2020-0098/documents/CMS-2020-0098-0001.json",
+    "raw-data/CMS/CMS-2020-0098/text-CMS-2020-0098/documents/"
+    "CMS-2020-0098-0001_content.htm",
+    "raw-data/CMS/CMS-2020-0098/text-CMS-2020-0098/comments/CMS-2020-0098-0002.json",
+    "raw-data/APHIS/APHIS-2022-0044/binary-APHIS-2022-0044/comments_attachments/"
+    "APHIS-2022-0044-0003_attachment_1.pdf",
+    "raw-data/APHIS/APHIS-2022-0044/binary-APHIS-2022-0044/comments_attachments/"
+    "APHIS-2022-0044-0003_attachment_2.docx",
+    "raw-data/APHIS/APHIS-2022-0044/binary-APHIS-2022-0044/documents_attachments/"
+    "APHIS-2022-0044-0001_attachment_1.pdf",
+    "raw-data/APHIS/APHIS-2022-0044/binary-APHIS-2022-0044/federal_register/"
+    "2022-12345.json",
+    "raw-data/ACF/ACF-2025-0004/text-ACF-2025-0004/documents/"
+    "ACF-2025-0004-0001_content.html",
+    "raw-data/docket_TEST-2023-0001.json",
+    "raw-data/federal_register_2024-00001.json",
+    "raw-data/path/to/regular_file.json",
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--budget-ns", type=float, default=1000.0)
+    args = parser.parse_args(argv)
+
+    def run():
+        for key in KEY_CORPUS:
+            resolve_route(key)
+
+    # Best of five repeats to keep scheduler noise out of the number.
+    best = min(timeit.repeat(run, number=args.iterations, repeat=5))
+    per_key_ns = best / (args.iterations * len(KEY_CORPUS)) * 1e9
+
+    for key in KEY_CORPUS:
+        route = resolve_route(key)
+        print(f"{route.description if route else '-':32} {key}")
+    print(
+        f"\nresolve_route: {per_key_ns:.0f} ns/key over {len(KEY_CORPUS)} key shapes "
+        f"(budget {args.budget_ns:.0f} ns)"
+    )
+
+    return 0 if per_key_ns <= args.budget_ns else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Synthetic PDF corpus shared by the PDF extraction benchmarks.
+
+Documents are generated with reportlab (a dev dependency) and cached under
+the system temp directory so repeated benchmark runs do not pay for
+generation.
+"""
+
+import os
+import tempfile
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "mirrulations-bench-pdfs")
+
+_WORDS = (
+    "the agency proposes to amend its regulations governing the importation of "
+    "plants and plant products comments must be received on or before the date "
+    "specified federal register docket rulemaking section paragraph table"
+).split()
+
+
+def make_pdf(pages, lines_per_page=45, table_columns=0):
+    """
+    Return the path of a cached synthetic PDF with `pages` pages of running text.
+    table_columns > 0 lays each line out as that many separately positioned cells,
+    which is the shape that makes text extraction slow on large tables.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(
+        CACHE_DIR, f"synthetic_{pages}p_{lines_per_page}l_{table_columns}c.pdf"
+    )
+    if os.path.exists(path):
+        return path
+
+    c = canvas.Canvas(path, pagesize=letter)
+    word = 0
+    for page in range(pages):
+        c.setFont("Helvetica", 9)
+        c.drawString(72, 760, f"[[Page {page + 1}]]")
+        for line in range(lines_per_page):
+            y = 740 - line * 15
+            if table_columns:
+                for column in range(table_columns):
+                    c.drawString(
+                        40 + column * (530 // table_columns),
+                        y,
+                        _WORDS[word % len(_WORDS)],
+                    )
+                    word += 1
+            else:
+                text = " ".join(_WORDS[(word + i) % len(_WORDS)] for i in range(14))
+                word += 14
+                c.drawString(40, y, text)
+        c.showPage()
+    c.save()
+    return path
+
+
+def default_corpus():
+    """(name, path) pairs covering small, large and table-heavy documents."""
+    return [
+        ("10 pages", make_pdf(10)),
+        ("100 pages", make_pdf(100)),
+        ("300 pages", make_pdf(300)),
+        ("50 pages, 8-column table", make_pdf(50, table_columns=8)),
+    ]
@@ -5,4 +5,12 @@ import os
 # This assumes your conftest.py is in the dev-env directory.
 layer_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "./common_layer/python"))
 if layer_path not in sys.path:
-    sys.path.insert(0, layer_path)
\ No newline at end of file
+    sys.path.insert(0, layer_path)
+
+# Same for the in-repo 'shared' package (shared_layer), which holds code used by several
+# lambdas.
+shared_layer_path = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "./shared_layer/python")
+)
+if shared_layer_path not in sys.path:
+    sys.path.insert(0, shared_layer_path)
\ No newline at end of file
@@ -0,0 +1,33 @@
+import logging
+from shared.aws_clients import get_client
+from shared.comment_sink import handle_comment_event
+from shared.lazy import lazy_callable
+
+logger = logging.getLogger(__name__)
+
+# Heavy dependencies are imported on first use to keep cold starts short.
+ingest_comment_sql = lazy_callable("common.ingest", "ingest_comment_sql")
+ingest_comment_opensearch = lazy_callable("common.ingest", "ingest_comment_opensearch")
+
+
+def handler(event, context):
+    """
+    Lambda handler that ingests a comment.json into both the SQL database and OpenSearch.
+    With COMBINED_COMMENT_INGEST set, the orchestrator invokes it for every comment
+    instead of the open_search and sql_comment_ingest functions. The comment is downloaded
+    and parsed once and both stores are written at the same time, with the outcome of each
+    reported under "sinks" in the response body.
+
+    Args:
+        event (dict): Contains the payload from the invoking Lambda
+        context: Lambda context object
+    """
+    return handle_comment_event(
+        event,
+        {
+            "sql": lambda payload: ingest_comment_sql(payload),
+            "opensearch": lambda payload: ingest_comment_opensearch(payload),
+        },
+        get_client,
+        "CommentIngest",
+    )
@@ -1,89 +1,280 @@
-import boto3
 import json
 import logging
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from shared.aws_clients import get_client
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on records routed at the same time for one SNS/S3 delivery.
+MAX_WORKERS = int(os.environ.get("ORCHESTRATOR_MAX_WORKERS", "8"))
+# Send comments to the combined comment ingest (one read, both stores) instead of one
+# function per store. Off until the common layer reads the OpenSearch secret separately
+# from DB_SECRET_NAME.
+COMBINED_COMMENT_INGEST = (
+    os.environ.get("COMBINED_COMMENT_INGEST", "false").lower() == "true"
+)
 
-def _is_html_summary_key(file_key):
-    """True if key ends with .htm or .html (case-insensitive)."""
-    lower = file_key.lower()
-    return lower.endswith(".htm") or lower.endswith(".html")
 
+class Route(NamedTuple):
+    """One row of the routing table.
 
-def extractS3(event):
+    kinds: path segments (e.g. "documents") that identify the object type, or None to
+    match any kind.
+    extensions: lower-case file extensions the route accepts.
+    targets: environment variables holding the Lambda function name(s) to invoke.
+    mode: Lambda InvocationType used for every target. 'Event' queues the child and
+        returns immediately; its outcome is reported through the child's EventInvokeConfig
+        destination.
+    on_complete: optional callback(s3dict, function_name, invoke_response) run after each
+        invoke returns (after completion for 'RequestResponse', after enqueue for
+        'Event').
     """
-    extractS3 function to extract S3 bucket name and object key from the event.
-    It handles both direct S3 events and wrapped SNS events.
-    It raises a ValueError if the event is empty or if the S3 information cannot be extracted.
+    description: str
+    kinds: Optional[Tuple[str, ...]]
+    extensions: Tuple[str, ...]
+    targets: Tuple[str, ...]
+    mode: str = 'RequestResponse'
+    on_complete: Optional[Callable] = None
+
+
+def log_dispatch_record(s3dict, function_name, response):
+    """
+    Print a structured dispatch record so queued (Event) invocations can be traced in
+    CloudWatch.
+    """
+    print(json.dumps({
+        "dispatch": function_name,
+        "bucket": s3dict['bucket'],
+        "file_key": s3dict['file_key'],
+        "statusCode": response.get('StatusCode'),
+        "requestId": response.get('ResponseMetadata', {}).get('RequestId'),
+    }))
+
+
+# Routing table for raw-data/<agency>/<docket>/<text-or-binary-docket>/<kind>/<file> keys.
+# Adding a new file type is a new row here (plus its environment variable below), not a
+# new branch.
+ROUTES = (
+    Route("docket json", ("docket", "dockets"), (".json",),
+          ("SQL_DOCKET_INGEST_FUNCTION",)),
+    Route("document json", ("documents", "document"), (".json",),
+          ("SQL_DOCUMENT_INGEST_FUNCTION",)),
+    # Text extraction can run for minutes, so it is queued instead of holding the
+    # orchestrator open.
+    Route("pdf file", ("comments_attachments",), (".pdf",),
+          ("OPENSEARCH_TEXT_EXTRACT_FUNCTION",),
+          mode='Event', on_complete=log_dispatch_record),
+    # With COMBINED_COMMENT_INGEST one function writes both stores from a single read
+    # (see shared/comment_sink.py).
+    Route("comment json", ("comments", "comment"), (".json",),
+          ("COMMENT_INGEST_FUNCTION",) if COMBINED_COMMENT_INGEST
+          else ("OPENSEARCH_COMMENT_INGEST_FUNCTION", "SQL_COMMENT_INGEST_FUNCTION")),
+    Route("htm/html file", None, (".htm", ".html"), ("HTM_SUMMARY_INGEST_FUNCTION",)),
+    Route("federal register document json", ("federal_register",), (".json",),
+          ("SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION",)),
+)
+
+# Human-readable names used when a target's environment variable is missing.
+FUNCTION_ENV_VARS = {
+    "SQL_DOCKET_INGEST_FUNCTION": "SQL ingest",
+    "SQL_DOCUMENT_INGEST_FUNCTION": "SQL ingest",
+    "OPENSEARCH_COMMENT_INGEST_FUNCTION": "OpenSearch ingest",
+    "SQL_COMMENT_INGEST_FUNCTION": "SQL comment ingest",
+    "COMMENT_INGEST_FUNCTION": "Comment ingest",
+    "HTM_SUMMARY_INGEST_FUNCTION": "HTM summary",
+    "OPENSEARCH_TEXT_EXTRACT_FUNCTION": "OpenSearch text extract",
+    "SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION": "Federal register ingest",
+}
+
+
+def _compile_routes(routes):
+    """
+    Build the segment index {kind: {extension: route}} (the None kind holds routes that
+    match any kind) and the filename-prefix pattern used for legacy flat keys.
+    """
+    index = {}
+    for route in routes:
+        for kind in route.kinds or (None,):
+            by_ext = index.setdefault(kind, {})
+            for ext in route.extensions:
+                by_ext.setdefault(ext, route)
+    kinds = sorted((k for k in index if k is not None), key=len, reverse=True)
+    # Legacy flat keys (raw-data/docket_X.json) carry the kind as a filename prefix.
+    # Longest alternative first so "comments_attachments" wins over "comments".
+    prefix = re.compile("^(" + "|".join(re.escape(k) for k in kinds) + r")(?=[_.\-])")
+    return index, prefix
+
+
+_ROUTE_INDEX, _KIND_PREFIX = _compile_routes(ROUTES)
+_ANY_KIND = _ROUTE_INDEX.get(None, {})
+
+
+def parse_key(file_key):
+    """
+    Split a raw-data key into (kind, extension) in a single pass.
+    kind is the deepest directory segment that names a known object type (None if there is
+    none); extension is lower-cased and includes the dot.
+    """
+    head, _, filename = file_key.rpartition('/')
+    dot = filename.rfind('.')
+    ext = filename[dot:].lower() if dot != -1 else ''
+
+    # Fast path: the kind is the parent directory of the file.
+    parent = head[head.rfind('/') + 1:]
+    if parent in _ROUTE_INDEX:
+        return parent, ext
+    for segment in reversed(head.split('/')[1:-1]):
+        if segment in _ROUTE_INDEX:
+            return segment, ext
+    match = _KIND_PREFIX.match(filename)
+    return (match.group(1) if match else None), ext
+
+
+def resolve_route(file_key):
+    """Return the Route for a raw-data key, or None when no route handles it."""
+    kind, ext = parse_key(file_key)
+    by_ext = _ROUTE_INDEX.get(kind)
+    return (by_ext and by_ext.get(ext)) or _ANY_KIND.get(ext)
+
+
+@lru_cache(maxsize=1)
+def get_target_functions():
+    """
+    Read and validate every target function name once per container.
+    Raises if any function referenced by the routing table is not configured.
+    """
+    functions = {}
+    for env_var in dict.fromkeys(t for route in ROUTES for t in route.targets):
+        value = os.environ.get(env_var)
+        if not value:
+            raise Exception(
+                f"{FUNCTION_ENV_VARS.get(env_var, env_var)} function name is not set "
+                "in the environment variables"
+            )
+        functions[env_var] = value
+    return functions
+
+
+def extract_s3_records(event, malformed=None):
+    """
+    extract_s3_records function to extract the S3 bucket name and object key of every
+    record in the event. It handles both direct S3 events and wrapped SNS events,
+    including SNS deliveries whose inner message carries several S3 records. It raises a
+    ValueError if the event is empty or if the S3 information cannot be extracted from any
+    record. When a malformed list is passed, a record that cannot be read is appended to
+    it as an error message instead, so the rest of the delivery can still be routed.
     """
     if not event:
         raise ValueError("Event is empty")
 
-    # Check if event is wrapped by SNS
-    record = event['Records'][0]
-    if 'Sns' in record:
-        # Parse the inner SNS message, which is a JSON string
-        message = json.loads(record['Sns']['Message'])
-    else:
-        message = event
-
     try:
-        bucket_name = message['Records'][0]['s3']['bucket']['name']
-        object_key = message['Records'][0]['s3']['object']['key']
-    except (KeyError, IndexError) as e:
+        records = event['Records']
+    except (KeyError, TypeError) as e:
         raise ValueError(f"Cannot extract S3 information from event: {e}")
 
-    return {
-        "bucket": bucket_name,
-        "file_key": object_key
-    }
+    s3dicts = []
+    for record in records:
+        try:
+            # Check if record is wrapped by SNS
+            if 'Sns' in record:
+                # Parse the inner SNS message, which is a JSON string
+                message = json.loads(record['Sns']['Message'])
+                inner_records = message.get('Records', [])
+            else:
+                inner_records = [record]
+        except (KeyError, TypeError, AttributeError, ValueError) as e:
+            error = f"Cannot extract S3 information from event: {e}"
+            if malformed is None:
+                raise ValueError(error)
+            malformed.append(error)
+            continue
+
+        for inner in inner_records:
+            try:
+                s3dicts.append({
+                    "bucket": inner['s3']['bucket']['name'],
+                    "file_key": inner['s3']['object']['key']
+                })
+            except (KeyError, TypeError) as e:
+                if malformed is None:
+                    raise ValueError(f"Cannot extract S3 information from event: {e}")
+                malformed.append(f"Cannot extract S3 information from event: {e}")
+
+    if not s3dicts:
+        if malformed:
+            raise ValueError(malformed[0])
+        raise ValueError("Cannot extract S3 information from event: no S3 records")
+    return s3dicts
+
+
+def extractS3(event):
+    """
+    extractS3 function to extract S3 bucket name and object key from the event.
+    It handles both direct S3 events and wrapped SNS events.
+    It raises a ValueError if the event is empty or if the S3 information cannot be extracted.
+    Only the first record is returned; use extract_s3_records to get every record in the
+    event.
+    """
+    return extract_s3_records(event)[0]
 
 
 def get_lambda_client():
-    # AWS_SAM_LOCAL is set to "true" when running locally via SAM CLI.
-    if os.getenv("AWS_SAM_LOCAL", "false").lower() == "true":
-        return boto3.client("lambda", endpoint_url="http://host.docker.internal:3001")
-    else:
-        return boto3.client("lambda")
+    # Cached per container; honors AWS_SAM_LOCAL for the sam local endpoint.
+    return get_client("lambda")
 
 
-def orch_lambda(event, context):
+def invoke_target(s3dict, route, function_name, lambda_client):
     """
-    The def orch_lambda function is the main entry point for the Lambda function.
-    def orch_lambda(event, context) processes incoming S3 events, extracts the relevant information, and invokes other Lambda functions based on the file type. The lambda function is designed to handle various file types, and is very easily extensible to add more file types in the future. 
+    Invoke one target of a route and return its result: {"function", "statusCode"[,
+    "error"]}. Invoke errors, Lambda FunctionErrors and child responses with statusCode >=
+    400 are reported in the result instead of raised, so a failing target never hides the
+    others.
     """
-    
-    lambda_client = get_lambda_client()
+    payload = json.dumps(s3dict).encode('utf-8')
+    try:
+        response = lambda_client.invoke(
+            FunctionName=function_name,
+            InvocationType=route.mode,
+            Payload=payload
+        )
+        if route.on_complete is not None:
+            route.on_complete(s3dict, function_name, response)
+    except Exception as e:
+        logger.exception(
+            "Invoking %s failed for key %s", function_name, s3dict['file_key']
+        )
+        return {'function': function_name, 'statusCode': 500, 'error': str(e)}
 
-    # Retrieve the SQL ingest function's name (or ARN) from the environment
-    sql_docket_function = os.environ.get("SQL_DOCKET_INGEST_FUNCTION")
-    if not sql_docket_function:
-        raise Exception("SQL ingest function name is not set in the environment variables")
-    sql_document_function = os.environ.get("SQL_DOCUMENT_INGEST_FUNCTION")
-    if not sql_document_function:
-        raise Exception("SQL ingest function name is not set in the environment variables")
-    opensearch_function = os.environ.get("OPENSEARCH_COMMENT_INGEST_FUNCTION")
-    if not opensearch_function:
-        raise Exception("OpenSearch ingest function name is not set in the environment variables")
-    sql_comment_function = os.environ.get("SQL_COMMENT_INGEST_FUNCTION")
-    if not sql_comment_function:
-        raise Exception("SQL comment ingest function name is not set in the environment variables")
-    htm_summary_function = os.environ.get("HTM_SUMMARY_INGEST_FUNCTION")
-    if not htm_summary_function:
-        raise Exception("HTM summary function name is not set in the environment variables")
-    opensearch_text_extract_function = os.environ.get("OPENSEARCH_TEXT_EXTRACT_FUNCTION")
-    if not opensearch_text_extract_function:
-        raise Exception("OpenSearch text extract function name is not set in the environment variables")
-    sql_fed_docs_function = os.environ.get("SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION")
-    if not sql_fed_docs_function:
-        raise Exception("Federal register ingest function name is not set in the environment variables")
+    result = {'function': function_name, 'statusCode': response.get('StatusCode', 200)}
+    if response.get('FunctionError'):
+        result['statusCode'] = 500
+        result['error'] = response['FunctionError']
+    elif route.mode == 'RequestResponse' and response.get('Payload') is not None:
+        # Child handlers report their own failures as {"statusCode": ..., "body": ...}.
+        try:
+            child = json.loads(response['Payload'].read() or b'null')
+        except ValueError:
+            child = None
+        if isinstance(child, dict) and isinstance(child.get('statusCode'), int):
+            result['statusCode'] = child['statusCode']
+            if child['statusCode'] >= 400:
+                result['error'] = child.get('body')
+    return result
 
-    
 
+def route_record(s3dict, lambda_client, functions):
+    """
+    Route a single {"bucket", "file_key"} record to the Lambda function(s) for its file
+    type. Routes with several targets invoke them at the same time; the body carries one
+    result per target. Returns the same statusCode/body response shape that orch_lambda
+    returns for a single-record event.
+    """
     try:
-        s3dict = extractS3(event)
         print(s3dict)
         print("Bucket: ", s3dict['bucket'])
         print("File Key: ", s3dict['file_key'])
@@ -96,91 +287,81 @@ def orch_lambda(event, context):
                 'body': json.dumps("File not processed - not in raw-data folder")
             }
 
-        if  s3dict['file_key'].endswith('.json') and 'docket' in s3dict['file_key']:
-
-            print("docket json found!")
-            response = lambda_client.invoke(
-                FunctionName=sql_docket_function,
-                InvocationType='RequestResponse',
-                Payload=json.dumps(s3dict).encode('utf-8')
-            )
-            return {
-                'statusCode': 200,
-                'body': json.dumps('Lambda function invoked successfully')
-            }
-            
-        elif s3dict['file_key'].endswith('.json') and 'document' in s3dict['file_key']:
-
-            print("document json found!")
-            response = lambda_client.invoke(
-                FunctionName=sql_document_function,
-                InvocationType='RequestResponse',
-                Payload=json.dumps(s3dict)
-            )
+        route = resolve_route(s3dict['file_key'])
+        if route is None:
+            print("File not processed")
             return {
-                'statusCode': 200,
-                'body': json.dumps('Lambda function invoked successfully')
+                'statusCode': 404,
+                'body': json.dumps('File not processed')
             }
-        elif s3dict['file_key'].endswith('.pdf') and 'comments_attachments' in s3dict['file_key']:
-            print("pdf file found!")
-            response = lambda_client.invoke(
-                FunctionName=opensearch_text_extract_function,
-                InvocationType='RequestResponse',
-                Payload=json.dumps(s3dict)
-            )
-            return {
-                'statusCode': 200,
-                'body': json.dumps('Lambda function invoked successfully')
-            }  
-        elif s3dict['file_key'].endswith('.json') and 'comments' in s3dict['file_key']:
-
-            print("comment json found!")
-            response = lambda_client.invoke(
-                FunctionName=opensearch_function,
-                InvocationType='RequestResponse',
-                Payload=json.dumps(s3dict)
-            )
 
-            response = lambda_client.invoke(
-                FunctionName=sql_comment_function,
-                InvocationType='RequestResponse',
-                Payload=json.dumps(s3dict)
-            )
+        print(f"{route.description} found!")
+        function_names = [functions[target] for target in route.targets]
+        if len(function_names) == 1:
+            results = [invoke_target(s3dict, route, function_names[0], lambda_client)]
+        else:
+            with ThreadPoolExecutor(max_workers=len(function_names)) as pool:
+                results = list(
+                    pool.map(
+                        lambda function_name: invoke_target(
+                            s3dict, route, function_name, lambda_client
+                        ),
+                        function_names,
+                    )
+                )
 
+        failed = [r for r in results if 'error' in r]
+        if failed:
             return {
-                'statusCode': 200,
-                'body': json.dumps('Lambda function invoked successfully')
+                'statusCode': 207 if len(failed) < len(results) else 500,
+                'body': json.dumps(
+                    {'message': 'Lambda function invocation failed', 'targets': results}
+                ),
             }
-        elif _is_html_summary_key(s3dict['file_key']):
-            print("htm/html file found!")
-            response = lambda_client.invoke(
-                FunctionName=htm_summary_function,
-                InvocationType='RequestResponse',
-                Payload=json.dumps(s3dict)
-            )
-            return {
-                'statusCode': 200,
-                'body': json.dumps('Lambda function invoked successfully')
-            }
-            
-        elif s3dict['file_key'].endswith('.json') and 'federal_register' in s3dict['file_key']:
-            print("federal register document json found!")
-            response = lambda_client.invoke(
-                FunctionName=sql_fed_docs_function,
-                InvocationType='RequestResponse',
-                Payload=json.dumps(s3dict)
-            )
-            return {
-                'statusCode': 200,
-                'body': json.dumps('Lambda function invoked successfully')
-            }
-        else:
-            print("File not processed")
+        if route.mode == 'Event':
             return {
-                'statusCode': 404,
-                'body': json.dumps('File not processed')
+                'statusCode': 202,
+                'body': json.dumps(
+                    {'message': 'Lambda function queued successfully', 'targets': results}
+                ),
             }
+        return {
+            'statusCode': 200,
+            'body': json.dumps(
+                {'message': 'Lambda function invoked successfully', 'targets': results}
+            ),
+        }
 
+    except ValueError as e:
+        logger.warning("Orchestrator bad request: %s", e)
+        return {
+            'statusCode': 400,
+            'body': json.dumps(f'Error processing request: {str(e)}')
+        }
+    except Exception as e:
+        logger.exception("Orchestrator failed for key %s", s3dict.get('file_key'))
+        return {
+            'statusCode': 500,
+            'body': json.dumps(f'Unexpected error: {str(e)}')
+        }
+
+
+def orch_lambda(event, context):
+    """
+    The def orch_lambda function is the main entry point for the Lambda function.
+    def orch_lambda(event, context) processes incoming S3 events, extracts the relevant
+    information, and invokes other Lambda functions based on the file type. File types are
+    declared in the ROUTES table, so supporting a new one is a data change. Every S3
+    record in the delivery (direct or SNS-wrapped) is routed; multi-record events are
+    dispatched on a bounded worker pool and answered with a per-record result list so
+    partial failures are visible.
+    """
+    
+    lambda_client = get_lambda_client()
+    functions = get_target_functions()
+    malformed = []
+    try:
+        s3dicts = extract_s3_records(event, malformed)
     except ValueError as e:
         logger.warning("Orchestrator bad request: %s", e)
         return {
@@ -193,4 +374,46 @@ def orch_lambda(event, context):
             'statusCode': 500,
             'body': json.dumps(f'Unexpected error: {str(e)}')
         }
-    
\ No newline at end of file
+
+    # Single-record deliveries keep the original response shape.
+    if len(s3dicts) == 1 and not malformed:
+        return route_record(s3dicts[0], lambda_client, functions)
+
+    # boto3 clients are thread safe, so the workers share the one Lambda client.
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(s3dicts)))) as pool:
+        responses = list(
+            pool.map(
+                lambda s3dict: route_record(s3dict, lambda_client, functions), s3dicts
+            )
+        )
+
+    results = [
+        {
+            'bucket': s3dict['bucket'],
+            'file_key': s3dict['file_key'],
+            'statusCode': response['statusCode'],
+            'body': json.loads(response['body']),
+        }
+        for s3dict, response in zip(s3dicts, responses)
+    ]
+    # Records that could not be read fail on their own; the rest is still routed.
+    for error in malformed:
+        logger.warning("Orchestrator skipped a malformed record: %s", error)
+        results.append({
+            'bucket': None,
+            'file_key': None,
+            'statusCode': 400,
+            'body': {'error': error},
+        })
+    # A 207 record had at least one failing target, so it counts as failed too.
+    failed = [
+        r
+        for r in results
+        if (r['statusCode'] >= 400 and r['statusCode'] != 404) or r['statusCode'] == 207
+    ]
+    if failed:
+        print(f"{len(failed)} of {len(results)} records failed")
+    return {
+        'statusCode': 207 if failed else 200,
+        'body': json.dumps({'results': results})
+    }
@@ -1,24 +1,99 @@
 import json
 import logging
-import boto3
+import os
+from shared.aws_clients import get_client
+from shared.lazy import lazy_callable
 import io
-from pypdf import PdfReader as Re
-from common.ingest import ingest_extracted_text
 
 logger = logging.getLogger(__name__)
 
+# Heavy dependencies are imported on first use to keep cold starts short.
+ingest_extracted_text = lazy_callable("common.ingest", "ingest_extracted_text")
 
-def extract_text(file_stream):
-    """Extract text from a PDF file stream and return as a string."""
-    reader = Re(file_stream)
-    extracted_text = " ".join(
-        [
-            page.extract_text().replace("\n", " ")
-            for page in reader.pages
-            if page.extract_text()
-        ]
+try:
+    from page_text import (
+        PdfReader,
+        collect_page_stats,
+        join_pages,
+        summarize_page_stats,
+        write_text,
+    )
+    from parallel_extract import extract_pages
+    from checkpoint import (
+        ContinuationLimitExceeded,
+        continue_later,
+        delete_checkpoint,
+        load_checkpoint,
+        save_checkpoint,
+        time_budget,
+    )
+    from pdf_input import mapped_file, probe_object, spooled_object
+    from backends import FORCED_BACKEND, select_backend
+    from extraction_cache import content_digest, get_cached_pages, put_cached_pages
+    from chunks import CHUNK_MAX_CHARS, OUTPUT_MODE, chunk_pages, encode_chunks
+except ImportError:
+    from lambda_functions.pdf_text_extract.page_text import (
+        PdfReader,
+        collect_page_stats,
+        join_pages,
+        summarize_page_stats,
+        write_text,
+    )
+    from lambda_functions.pdf_text_extract.parallel_extract import extract_pages
+    from lambda_functions.pdf_text_extract.checkpoint import (
+        ContinuationLimitExceeded,
+        continue_later,
+        delete_checkpoint,
+        load_checkpoint,
+        save_checkpoint,
+        time_budget,
+    )
+    from lambda_functions.pdf_text_extract.pdf_input import (
+        mapped_file,
+        probe_object,
+        spooled_object,
+    )
+    from lambda_functions.pdf_text_extract.backends import FORCED_BACKEND, select_backend
+    from lambda_functions.pdf_text_extract.extraction_cache import (
+        content_digest,
+        get_cached_pages,
+        put_cached_pages,
     )
-    return extracted_text.strip()
+    from lambda_functions.pdf_text_extract.chunks import (
+        CHUNK_MAX_CHARS,
+        OUTPUT_MODE,
+        chunk_pages,
+        encode_chunks,
+    )
+
+# PDFs larger than this many bytes are handed to PDF_LARGE_FILE_FUNCTION (0 disables the
+# limit).
+MAX_PDF_BYTES = int(os.environ.get("PDF_MAX_BYTES", "0"))
+# Raise on 5xx (S3, IO, ingest and other unexpected errors) instead of returning the
+# response. Lambda only retries an asynchronous invocation, and only sends it to the
+# OnFailure destination, when the handler raises. 4xx responses reject the content itself
+# (not a PDF, no text, unreadable) and would fail the same way on every retry, so they
+# are always returned.
+RAISE_ON_FAILURE = os.environ.get("PDF_RAISE_ON_FAILURE", "false").lower() == "true"
+
+
+class TextExtractionFailed(Exception):
+    """Raised with a 5xx response when RAISE_ON_FAILURE is set."""
+
+    def __init__(self, response):
+        super().__init__(
+            f"Text extraction failed with status {response['statusCode']}: "
+            f"{response['body']}"
+        )
+        self.response = response
+
+
+def extract_text(file_stream, page_stats=None):
+    """Extract text from a PDF file stream and return as a string."""
+    reader = PdfReader(file_stream)
+    buffer = io.StringIO()
+    write_text(reader, buffer, page_stats)
+    return buffer.getvalue().strip()
 
 
 def s3_saver(file_stream, bucket, file_key, s3):
@@ -34,7 +109,38 @@ def s3_saver(file_stream, bucket, file_key, s3):
             'statusCode': 422,
             'body': json.dumps({'error': str(e)})
         }
-        
+
+
+def divert_large_file(event, size):
+    """
+    Hand an oversized PDF to the large-file extraction function (asynchronously).
+    Returns the handler response, or None when no large-file function is configured.
+    """
+    function_name = os.environ.get("PDF_LARGE_FILE_FUNCTION")
+    if not function_name:
+        logger.warning(
+            "PDF of %d bytes exceeds PDF_MAX_BYTES "
+            "but PDF_LARGE_FILE_FUNCTION is not set",
+            size,
+        )
+        return None
+    get_client("lambda").invoke(
+        FunctionName=function_name,
+        InvocationType="Event",
+        Payload=json.dumps(event).encode("utf-8"),
+    )
+    print(f"Diverted {event.get('file_key')} ({size} bytes) to {function_name}")
+    return {
+        "statusCode": 202,
+        "body": json.dumps(
+            {
+                "message": "PDF diverted to large-file extraction",
+                "function": function_name,
+                "size": size,
+            }
+        ),
+    }
+
 
 def handler(event, context):
     """
@@ -47,20 +153,29 @@ def handler(event, context):
     Returns:
         _type_: _description_
     """
-    
+    response = _handle(event, context)
+    if RAISE_ON_FAILURE and response['statusCode'] >= 500:
+        raise TextExtractionFailed(response)
+    return response
+
+
+def _handle(event, context):
+    """
+    The handler body; every outcome, failures included, is returned as a statusCode/body
+    response.
+    """
     print("Received PDF file in event.")
     print(f"Received event: {json.dumps(event)}")
 
     try:
-        # Retrieve PDF file from S3 using the event data
-        s3 = boto3.client('s3')
-        file_obj = s3.get_object(Bucket=event['bucket'], Key=event['file_key'])
-        file_content = file_obj['Body'].read()
+        s3 = get_client('s3')
 
         # Guardrail: many "pdfs" are actually HTML error pages.
-        # A real PDF typically starts with "%PDF-".
-        if not file_content or not file_content.startswith(b"%PDF-"):
-            prefix = file_content[:64] if file_content else b""
+        # A real PDF typically starts with "%PDF-", which a 1 KB ranged GET is enough to
+        # check.
+        head, size = probe_object(s3, event['bucket'], event['file_key'])
+        if not head.startswith(b"%PDF-"):
+            prefix = head[:64]
             logger.error(
                 "Object is not a valid PDF (prefix=%r) bucket=%s key=%s",
                 prefix,
@@ -78,17 +193,82 @@ def handler(event, context):
                 ),
             }
 
-        # Step 2: Extract text from the PDF
-        try:
-            extracted_text = extract_text(io.BytesIO(file_content))
-        except Exception as e:
-            logger.exception("PDF read failed")
-            return {
-                "statusCode": 422,
-                "body": json.dumps({"error": str(e)}),
-            }
+        if MAX_PDF_BYTES and size > MAX_PDF_BYTES:
+            diverted = divert_large_file(event, size)
+            if diverted:
+                return diverted
+
+        # Step 1: Spool the PDF from S3 to /tmp (ranged GETs for large objects)
+        with spooled_object(s3, event['bucket'], event['file_key']) as pdf_path:
+            with mapped_file(pdf_path) as pdf_data:
+                digest = content_digest(pdf_data)
+                # Duplicate attachments (mass-comment campaigns) reuse the pages extracted
+                # from the first copy, together with the backend that extracted them, so a
+                # hit never opens the PDF
+                cached = get_cached_pages(
+                    s3, event['bucket'], digest, FORCED_BACKEND or None
+                )
+                if cached is None:
+                    # Pick the extraction backend from page count, bytes per page and
+                    # text-layer presence
+                    try:
+                        backend = select_backend(pdf_data)
+                    except Exception as e:
+                        logger.exception("PDF read failed")
+                        return {
+                            "statusCode": 422,
+                            "body": json.dumps({"error": str(e)}),
+                        }
+
+            continuation = event.get("continuation")
+            if cached is not None:
+                method, pages = cached
+                print(f"Extraction cache hit for sha256 {digest} ({method})")
+                # Another copy finished first; this continuation's partial pages are not
+                # needed
+                if continuation:
+                    delete_checkpoint(s3, event['bucket'], continuation["checkpoint_key"])
+            else:
+                method = backend.name
+                print(f"Extracting with {method}")
+                # Step 2: Extract text from the PDF, resuming from a checkpoint when this
+                # is a continuation
+                try:
+                    pages, start_page = [], 0
+                    if continuation:
+                        checkpoint = load_checkpoint(
+                            s3, event['bucket'], continuation["checkpoint_key"]
+                        )
+                        pages, start_page = checkpoint["pages"], checkpoint["next_page"]
+                    # Large documents are extracted by several processes that each map the
+                    # same /tmp file.
+                    new_pages, page_count = extract_pages(
+                        pdf_path, start_page, time_budget(context), backend=backend
+                    )
+                    pages.extend(new_pages)
+                except Exception as e:
+                    logger.exception("PDF read failed")
+                    return {
+                        "statusCode": 422,
+                        "body": json.dumps({"error": str(e)}),
+                    }
 
-        if not extracted_text:
+                # Out of time: save the pages done so far and finish in a new invocation
+                next_page = start_page + len(new_pages)
+                if next_page < page_count:
+                    key = save_checkpoint(
+                        s3, event['bucket'], event['file_key'], digest, pages, page_count
+                    )
+                    return continue_later(event, context, key, next_page, page_count)
+
+                stats = summarize_page_stats(collect_page_stats(pages))
+                print(f"Extraction stats: {json.dumps(stats)}")
+                if any(text for _, text, _ in pages):
+                    put_cached_pages(s3, event['bucket'], digest, pages, method)
+                if continuation:
+                    delete_checkpoint(s3, event['bucket'], continuation["checkpoint_key"])
+
+        if not any(text for _, text, _ in pages):
             raise ValueError("Extracted text is empty")
 
         # Extract docketId, commentId, and attachmentId from the file_key
@@ -103,25 +283,54 @@ def handler(event, context):
         commentId = filename.split('_')[0]  # Extract commentId (e.g. "APHIS-2022-0055-0002" from "APHIS-2022-0055-0002_attachment_1.pdf")
         attachmentId = commentId + "-" + filename.split('_')[-1].replace('.pdf', '')  # Extract attachmentId (e.g. "APHIS-2022-0055-0002-1" from "APHIS-2022-0055-0002_attachment_1.pdf")
 
-        # Construct the dictionary with the extracted text and other necessary data
+        # Construct the dictionary with the identifiers shared by the document (or every
+        # chunk)
         data = {
-            "extractedText": extracted_text,
             "docketId": docketId,  # Extracted from the file_key
             "commentId": commentId,  # Extracted from the file_key
             "attachmentId": attachmentId,   # Extracted from the file_key
-            "extractedMethod": "pypdf",  # Indicating the library used for extraction            
+            "extractedMethod": method,  # Indicating the backend used for extraction
         }
-        
-        print(f"Extracted data: {data}")
+
+        # Log the identifiers only; the extracted text can run to megabytes
+        print(f"Extracted data: {json.dumps(data)}")
 
         # Check if the event is related to comments_attachments
         if 'comments_attachments' in event['file_key']:
-            txt_filename = filename.replace('.pdf', '_extracted.txt')
-            txt_key = f"derived-data/{agency}/{docketId}/mirrulations/extracted_txt/comments_extracted_text/pypdf/{txt_filename}"
-            s3_saver(io.BytesIO(extracted_text.encode('utf-8')), bucket, txt_key, s3)
-            # Ingest the extracted text and the prepared data
-            print("Ingesting extracted text...")
-            ingest_extracted_text(data)  # Pass the dictionary to the ingest function
+            derived_prefix = (
+                f"derived-data/{agency}/{docketId}/mirrulations/extracted_txt/"
+                f"comments_extracted_text/{method}/"
+            )
+            if OUTPUT_MODE == "chunked":
+                # Step 3: Write page-aligned chunks as one JSONL.gz object and index each
+                # chunk separately
+                chunks = list(chunk_pages(pages, CHUNK_MAX_CHARS))
+                chunks_key = derived_prefix + filename.replace('.pdf', '_chunks.jsonl.gz')
+                s3_saver(
+                    io.BytesIO(encode_chunks(chunks, attachmentId)),
+                    bucket,
+                    chunks_key,
+                    s3,
+                )
+                print(f"Ingesting {len(chunks)} chunks...")
+                for chunk in chunks:
+                    ingest_extracted_text({
+                        **data,
+                        "extractedText": chunk["text"],
+                        "chunkId": f"{attachmentId}-{chunk['chunkIndex']}",
+                        "chunkIndex": chunk["chunkIndex"],
+                        "chunkCount": len(chunks),
+                        "pageStart": chunk["pageStart"],
+                        "pageEnd": chunk["pageEnd"],
+                    })
+            else:
+                extracted_text = join_pages(pages)
+                txt_key = derived_prefix + filename.replace('.pdf', '_extracted.txt')
+                s3_saver(io.BytesIO(extracted_text.encode('utf-8')), bucket, txt_key, s3)
+                # Ingest the extracted text and the prepared data
+                print("Ingesting extracted text...")
+                # Pass the dictionary to the ingest function
+                ingest_extracted_text({**data, "extractedText": extracted_text})
             print("Ingestion complete!")
 
         return {
@@ -129,9 +338,16 @@ def handler(event, context):
             'body': json.dumps({'message': 'Data processed successfully'})
         }
 
+    except (ValueError, ContinuationLimitExceeded) as e:
+        # The document itself cannot be processed (e.g. no text); a retry would fail again
+        logger.exception("OpenSearchTextExtract rejected the document")
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': str(e)})
+        }
     except Exception as e:
         logger.exception("OpenSearchTextExtract handler failed")
         return {
-            'statusCode': 400,
+            'statusCode': 500,
             'body': json.dumps({'error': str(e)})
         }
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""Pluggable PDF text extraction backends and per-document backend selection.
+
+A backend opens the PDF bytes (a bytes object or a read-only mmap), counts
+its pages and yields (index, text, seconds) tuples for a page range, in
+the same shape as page_text.iter_page_text, so the serial, parallel and
+resumable extractors work with any of them. The chosen backend's name is
+recorded as extractedMethod and in the derived-data path.
+
+Bundled backends:
+  pypdf          the default.
+  pypdf-upright  pypdf limited to upright text; skips the scan for rotated
+                 text, which pays off on dense, table-heavy pages.
+  pdfminer       pdfminer.six, registered only when it is installed.
+  no-text-layer  for scanned documents where no page declares a font;
+                 yields empty pages without interpreting any content streams.
+"""
+
+import importlib.util
+import io
+import logging
+import os
+import time
+from functools import partial
+from typing import Callable, NamedTuple
+
+try:
+    from page_text import PdfReader, iter_page_text
+except ImportError:
+    from lambda_functions.pdf_text_extract.page_text import PdfReader, iter_page_text
+
+logger = logging.getLogger(__name__)
+
+# Force one backend for every document (empty: select per document).
+FORCED_BACKEND = os.environ.get("PDF_BACKEND", "")
+# Average bytes per page above which pages are treated as dense (large tables, heavy
+# layout).
+DENSE_BYTES_PER_PAGE = int(os.environ.get("PDF_DENSE_BYTES_PER_PAGE", str(256 * 1024)))
+# Documents with at least this many pages use the cheaper upright-only extraction.
+LONG_DOCUMENT_PAGES = int(os.environ.get("PDF_LONG_DOCUMENT_PAGES", "1000"))
+# Pages checked first (first, middle, last) when looking for a text layer.
+TEXT_LAYER_SAMPLE_PAGES = 3
+
+
+class Backend(NamedTuple):
+    name: str
+    open: Callable  # PDF bytes or mmap -> document
+    page_count: Callable  # document -> int
+    # (document, start=0, stop=None) -> (index, text, seconds) tuples
+    iter_pages: Callable
+
+
+_BACKENDS = {}
+
+
+def register_backend(backend):
+    """
+    Make a backend available to the selector and to PDF_BACKEND; replaces one of the same
+    name.
+    """
+    _BACKENDS[backend.name] = backend
+    return backend
+
+
+def get_backend(name):
+    try:
+        return _BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown PDF backend {name!r}; registered: {', '.join(sorted(_BACKENDS))}"
+        ) from None
+
+
+def registered_backends():
+    return list(_BACKENDS.values())
+
+
+def _pypdf_open(data):
+    # pypdf reads an mmap in place but needs plain bytes wrapped in a stream
+    return PdfReader(io.BytesIO(data) if isinstance(data, bytes) else data)
+
+
+def _pypdf_page_count(reader):
+    return len(reader.pages)
+
+
+def _iter_blank_pages(reader, start=0, stop=None):
+    stop = len(reader.pages) if stop is None else stop
+    for index in range(start, stop):
+        yield index, "", 0.0
+
+
+def _pdfminer_open(data):
+    # mmap is file-like; plain bytes need wrapping
+    return data if hasattr(data, "seek") else io.BytesIO(data)
+
+
+def _pdfminer_page_count(fp):
+    from pdfminer.pdfpage import PDFPage
+
+    fp.seek(0)
+    return sum(1 for _ in PDFPage.get_pages(fp))
+
+
+def _pdfminer_iter_pages(fp, start=0, stop=None):
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    stop = _pdfminer_page_count(fp) if stop is None else stop
+    fp.seek(0)
+    index = start
+    started = time.perf_counter()
+    for layout in extract_pages(fp, page_numbers=set(range(start, stop))):
+        text = "".join(
+            element.get_text()
+            for element in layout
+            if isinstance(element, LTTextContainer)
+        )
+        yield index, text.replace("\n", " "), time.perf_counter() - started
+        index += 1
+        started = time.perf_counter()
+
+
+register_backend(Backend("pypdf", _pypdf_open, _pypdf_page_count, iter_page_text))
+register_backend(
+    Backend(
+        "pypdf-upright",
+        _pypdf_open,
+        _pypdf_page_count,
+        partial(iter_page_text, orientations=(0,)),
+    )
+)
+register_backend(
+    Backend("no-text-layer", _pypdf_open, _pypdf_page_count, _iter_blank_pages)
+)
+if importlib.util.find_spec("pdfminer") is not None:
+    register_backend(
+        Backend("pdfminer", _pdfminer_open, _pdfminer_page_count, _pdfminer_iter_pages)
+    )
+
+
+def _resources_have_fonts(resources, seen=None):
+    """
+    True when a resource dictionary, or any form XObject nested in it, declares fonts.
+    """
+    resources = resources.get_object() if resources is not None else None
+    if not resources:
+        return False
+    if "/Font" in resources:
+        return True
+    if "/XObject" not in resources:
+        return False
+    # Forms can nest (and refer back to each other), so each one is visited once.
+    seen = set() if seen is None else seen
+    for reference in resources["/XObject"].get_object().values():
+        marker = getattr(reference, "idnum", None) or id(reference)
+        if marker in seen:
+            continue
+        seen.add(marker)
+        xobject = reference.get_object()
+        if xobject.get("/Subtype") == "/Form" and _resources_have_fonts(
+            xobject.get("/Resources"), seen
+        ):
+            return True
+    return False
+
+
+def has_text_layer(reader):
+    """
+    Whether any page declares fonts, at any form XObject depth. Only resource dictionaries
+    are read, never content streams, and the first, middle and last pages are checked
+    first so a typical text document answers after one page. A document is only reported
+    as having no text layer once every page has been checked.
+    """
+    page_count = len(reader.pages)
+    if page_count == 0:
+        return False
+    first = list(
+        dict.fromkeys([0, page_count // 2, page_count - 1][:TEXT_LAYER_SAMPLE_PAGES])
+    )
+    order = first + [index for index in range(page_count) if index not in first]
+    seen = set()
+    return any(
+        _resources_have_fonts(reader.pages[index].get("/Resources"), seen)
+        for index in order
+    )
+
+
+def select_backend(data):
+    """
+    Choose a backend for the PDF bytes (or mmap) from cheap signals: page count,
+    bytes per page and whether a text layer is present.
+    """
+    if FORCED_BACKEND:
+        return get_backend(FORCED_BACKEND)
+    reader = _pypdf_open(data)
+    page_count = len(reader.pages)
+    try:
+        text_layer = has_text_layer(reader)
+    except Exception:
+        # A malformed resource tree makes the check inconclusive; pypdf still extracts
+        # what it can.
+        logger.warning(
+            "Text layer detection failed; extracting with pypdf", exc_info=True
+        )
+        text_layer = True
+    if not text_layer:
+        return get_backend("no-text-layer")
+    if (
+        page_count >= LONG_DOCUMENT_PAGES
+        or len(data) / max(page_count, 1) > DENSE_BYTES_PER_PAGE
+    ):
+        return get_backend("pypdf-upright")
+    return get_backend("pypdf")
@@ -0,0 +1,116 @@
+"""Checkpoints for PDF extractions that do not fit in one invocation.
+
+When the time left in an invocation drops below RESERVE_MS, the pages
+extracted so far are saved to S3 and the function re-invokes itself
+asynchronously with a continuation token pointing at the checkpoint. The
+next invocation resumes at the first page not yet extracted. The chain is
+bounded by MAX_CONTINUATIONS. Checkpoints are per file, not per content, so
+identical PDFs extracted at the same time never share one.
+"""
+
+import gzip
+import json
+import os
+
+from shared.aws_clients import get_client
+
+CHECKPOINT_PREFIX = os.environ.get(
+    "PDF_CHECKPOINT_PREFIX", "derived-data/extraction_checkpoints/"
+)
+# Time kept back for saving the checkpoint and re-invoking, plus the page or batch in
+# flight.
+RESERVE_MS = int(os.environ.get("PDF_TIME_RESERVE_MS", "30000"))
+MAX_CONTINUATIONS = int(os.environ.get("PDF_MAX_CONTINUATIONS", "20"))
+
+
+class ContinuationLimitExceeded(RuntimeError):
+    """The extraction needs over MAX_CONTINUATIONS invocations; a retry cannot fix it."""
+
+
+def time_budget(context, reserve_ms=None):
+    """
+    Return a should_stop() callable that is True once the invocation is within reserve_ms
+    of its timeout, or None when there is no Lambda context to ask.
+    """
+    remaining = getattr(context, "get_remaining_time_in_millis", None)
+    if remaining is None:
+        return None
+    reserve = RESERVE_MS if reserve_ms is None else reserve_ms
+    return lambda: remaining() < reserve
+
+
+def checkpoint_key(file_key, digest):
+    return f"{CHECKPOINT_PREFIX}{file_key}.{digest[:16]}.json.gz"
+
+
+def save_checkpoint(s3, bucket, file_key, digest, pages, page_count):
+    """
+    Store the (index, text, seconds) tuples extracted so far and return the checkpoint
+    key.
+    """
+    key = checkpoint_key(file_key, digest)
+    body = {
+        "file_key": file_key,
+        "digest": digest,
+        "page_count": page_count,
+        "next_page": pages[-1][0] + 1 if pages else 0,
+        "pages": pages,
+    }
+    s3.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=gzip.compress(json.dumps(body).encode("utf-8")),
+        ContentType="application/json",
+        ContentEncoding="gzip",
+    )
+    return key
+
+
+def load_checkpoint(s3, bucket, key):
+    """Return the checkpoint dict, with pages as (index, text, seconds) tuples."""
+    body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    checkpoint = json.loads(gzip.decompress(body))
+    checkpoint["pages"] = [tuple(page) for page in checkpoint["pages"]]
+    return checkpoint
+
+
+def delete_checkpoint(s3, bucket, key):
+    s3.delete_object(Bucket=bucket, Key=key)
+
+
+def continue_later(event, context, checkpoint_key_, next_page, page_count):
+    """
+    Re-invoke this function asynchronously to resume at next_page; returns the handler
+    response.
+    """
+    invocation = event.get("continuation", {}).get("invocation", 0) + 1
+    if invocation > MAX_CONTINUATIONS:
+        raise ContinuationLimitExceeded(
+            f"PDF extraction did not finish within {MAX_CONTINUATIONS} continuations"
+        )
+    payload = dict(event)
+    payload["continuation"] = {
+        "checkpoint_key": checkpoint_key_,
+        "next_page": next_page,
+        "invocation": invocation,
+    }
+    function = getattr(context, "invoked_function_arn", None) or context.function_name
+    get_client("lambda").invoke(
+        FunctionName=function,
+        InvocationType="Event",
+        Payload=json.dumps(payload).encode("utf-8"),
+    )
+    print(
+        f"Extracted pages up to {next_page} of {page_count}; "
+        f"continuing in invocation {invocation}"
+    )
+    return {
+        "statusCode": 202,
+        "body": json.dumps(
+            {
+                "message": "PDF extraction continues in a new invocation",
+                "next_page": next_page,
+                "page_count": page_count,
+            }
+        ),
+    }
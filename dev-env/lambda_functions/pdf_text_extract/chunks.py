@@ -0,0 +1,84 @@
+"""Page-aligned chunks of extracted PDF text.
+
+Indexing a whole attachment as one search document puts pressure on the
+OpenSearch heap and slows refreshes. In chunked output mode the pages are
+grouped into chunks of at most CHUNK_MAX_CHARS characters; a chunk only
+ends on a page boundary, except when a single page is itself too long, in
+which case the page is split at whitespace.
+"""
+
+import gzip
+import json
+import os
+
+OUTPUT_MODE = os.environ.get("PDF_OUTPUT_MODE", "document")  # "document" or "chunked"
+CHUNK_MAX_CHARS = int(os.environ.get("PDF_CHUNK_MAX_CHARS", "20000"))
+
+
+def _split_long_text(text, max_chars):
+    """Split text into pieces of at most max_chars, preferring to break at whitespace."""
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        yield text[:cut]
+        text = text[cut:].lstrip()
+    if text:
+        yield text
+
+
+def chunk_pages(pages, max_chars=None):
+    """
+    Group (index, text, seconds) pages into chunks.
+    Yields {"chunkIndex", "pageStart", "pageEnd", "text"} dicts; page numbers are 1-based.
+    Blank pages are skipped, page text is stripped and neighbouring pages are joined with
+    a single space.
+    """
+    max_chars = max_chars or CHUNK_MAX_CHARS
+    chunk_index = 0
+    parts, length, first, last = [], 0, None, None
+
+    def emit():
+        return {
+            "chunkIndex": chunk_index,
+            "pageStart": first + 1,
+            "pageEnd": last + 1,
+            "text": " ".join(parts),
+        }
+
+    for index, text, _ in pages:
+        text = text.strip()
+        if not text:
+            continue
+        if parts and length + 1 + len(text) > max_chars:
+            yield emit()
+            chunk_index += 1
+            parts, length = [], 0
+        if not parts and len(text) > max_chars:
+            for piece in _split_long_text(text, max_chars):
+                first = last = index
+                parts = [piece]
+                yield emit()
+                chunk_index += 1
+            parts, length = [], 0
+            continue
+        if not parts:
+            first = index
+        parts.append(text)
+        length += len(text) + (1 if length else 0)
+        last = index
+    if parts:
+        yield emit()
+
+
+def encode_chunks(chunks, attachment_id):
+    """Serialize chunks as gzipped JSON Lines, one compact record per chunk."""
+    lines = (
+        json.dumps(
+            {"attachmentId": attachment_id, **chunk},
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        for chunk in chunks
+    )
+    return gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
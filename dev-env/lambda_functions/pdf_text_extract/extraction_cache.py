@@ -0,0 +1,99 @@
+"""Content-addressed cache of extracted PDF text.
+
+Mass-comment campaigns attach the same PDF to thousands of comments. The
+per-page text extracted from a PDF is stored under the SHA-256 of its bytes
+in a derived-data prefix, with a small per-container LRU in front, so every
+duplicate after the first skips extraction entirely. The entry records the
+backend that produced it, so a hit also skips opening the PDF to choose one.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = os.environ.get(
+    "PDF_EXTRACTION_CACHE_PREFIX", "derived-data/extraction_cache/"
+)
+LOCAL_CACHE_ENTRIES = int(os.environ.get("PDF_EXTRACTION_CACHE_ENTRIES", "32"))
+
+_local_cache = OrderedDict()
+
+
+def content_digest(data):
+    """SHA-256 hex digest of the PDF bytes (bytes or mmap)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(digest):
+    """S3 key of the cached pages."""
+    return f"{CACHE_PREFIX}{digest[:2]}/{digest}.json.gz"
+
+
+def _remember(key, entry):
+    _local_cache[key] = entry
+    _local_cache.move_to_end(key)
+    while len(_local_cache) > LOCAL_CACHE_ENTRIES:
+        _local_cache.popitem(last=False)
+
+
+def get_cached_pages(s3, bucket, digest, method=None):
+    """
+    Return (method, pages) previously extracted for this digest, pages being (index, text,
+    seconds) tuples, or None on a miss. With method, an entry produced by another backend
+    is a miss.
+    """
+    key = cache_key(digest)
+    entry = _local_cache.get(key)
+    if entry is not None:
+        _local_cache.move_to_end(key)
+    else:
+        try:
+            body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+        except Exception as e:
+            if getattr(e, "response", {}).get("Error", {}).get("Code") not in (
+                "NoSuchKey",
+                "404",
+            ):
+                logger.warning("Extraction cache lookup failed for %s: %r", key, e)
+            return None
+        stored = json.loads(gzip.decompress(body))
+        # Extraction time is not cached; a hit costs nothing.
+        entry = (
+            stored["method"],
+            [(index, text, 0.0) for index, text in stored["pages"]],
+        )
+        _remember(key, entry)
+    if method and entry[0] != method:
+        return None
+    return entry
+
+
+def put_cached_pages(s3, bucket, digest, pages, method="pypdf"):
+    """
+    Store the pages method extracted for this digest. Failures are logged; the cache is
+    best effort.
+    """
+    key = cache_key(digest)
+    _remember(key, (method, pages))
+    stored = {"method": method, "pages": [[index, text] for index, text, _ in pages]}
+    body = gzip.compress(json.dumps(stored).encode("utf-8"))
+    try:
+        s3.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=body,
+            ContentType="application/json",
+            ContentEncoding="gzip",
+        )
+    except Exception:
+        logger.exception("Extraction cache store failed for %s", key)
+
+
+def clear_local_cache():
+    """Empty the per-container LRU (used by tests)."""
+    _local_cache.clear()
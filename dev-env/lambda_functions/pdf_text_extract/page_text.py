@@ -0,0 +1,82 @@
+"""Per-page PDF text extraction shared by the serial and parallel extractors."""
+
+import io
+import time
+
+from shared.lazy import lazy_callable
+
+# pypdf is imported on first use to keep cold starts short.
+PdfReader = lazy_callable("pypdf", "PdfReader")
+
+
+def iter_page_text(reader, start=0, stop=None, **extract_options):
+    """
+    Yield (page_index, text, seconds) for each page of an open PdfReader.
+    Each page's text is extracted exactly once and its newlines are normalized to spaces.
+    extract_options are passed to PageObject.extract_text.
+    """
+    stop = len(reader.pages) if stop is None else stop
+    for index in range(start, stop):
+        started = time.perf_counter()
+        text = reader.pages[index].extract_text(**extract_options) or ""
+        yield index, text.replace("\n", " "), time.perf_counter() - started
+
+
+def write_pages(pages, sink, page_stats=None):
+    """
+    Stream (page_index, text, seconds) tuples, in page order, into sink (anything with a
+    write(str) method), skipping empty pages and separating the rest with single spaces.
+    When page_stats is a list, one {"page", "seconds", "chars"} entry is appended per
+    page. Returns the number of characters written.
+    """
+    written = 0
+    for index, text, seconds in pages:
+        if page_stats is not None:
+            page_stats.append({"page": index, "seconds": seconds, "chars": len(text)})
+        if not text:
+            continue
+        if written:
+            sink.write(" ")
+            written += 1
+        sink.write(text)
+        written += len(text)
+    return written
+
+
+def join_pages(pages, page_stats=None):
+    """
+    Join (page_index, text, seconds) tuples into one stripped string; see write_pages.
+    """
+    buffer = io.StringIO()
+    write_pages(pages, buffer, page_stats)
+    return buffer.getvalue().strip()
+
+
+def write_text(reader, sink, page_stats=None):
+    """Stream the text of every page of an open PdfReader into sink; see write_pages."""
+    return write_pages(iter_page_text(reader), sink, page_stats)
+
+
+def collect_page_stats(pages):
+    """
+    Per-page {"page", "seconds", "chars"} entries for (page_index, text, seconds) tuples.
+    """
+    return [
+        {"page": index, "seconds": seconds, "chars": len(text)}
+        for index, text, seconds in pages
+    ]
+
+
+def summarize_page_stats(page_stats):
+    """Condense per-page stats into a small dict suitable for logging."""
+    if not page_stats:
+        return {"pages": 0, "chars": 0, "seconds": 0.0}
+    slowest = max(page_stats, key=lambda stat: stat["seconds"])
+    return {
+        "pages": len(page_stats),
+        "chars": sum(stat["chars"] for stat in page_stats),
+        "seconds": round(sum(stat["seconds"] for stat in page_stats), 3),
+        "slowest_page": slowest["page"],
+        "slowest_page_seconds": round(slowest["seconds"], 3),
+        "empty_pages": sum(1 for stat in page_stats if not stat["chars"]),
+    }
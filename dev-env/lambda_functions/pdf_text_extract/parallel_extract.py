@@ -0,0 +1,173 @@
+"""Multi-core PDF text extraction.
+
+Large PDFs are split into contiguous page ranges and each range is extracted
+by its own worker process, which opens the PDF from the shared file on /tmp.
+The page texts are reassembled in page order. Every reader works on a
+read-only mmap of the file, so the PDF is never copied into process memory.
+Small documents, or containers with a single vCPU, use the serial extractor.
+
+Lambda has no /dev/shm, so multiprocessing.Pool and Queue are unavailable;
+workers are plain Processes reporting back over a Pipe.
+"""
+
+import logging
+import multiprocessing
+import os
+
+try:
+    from backends import get_backend
+    from page_text import join_pages
+    from pdf_input import mapped_file
+except ImportError:
+    from lambda_functions.pdf_text_extract.backends import get_backend
+    from lambda_functions.pdf_text_extract.page_text import join_pages
+    from lambda_functions.pdf_text_extract.pdf_input import mapped_file
+
+logger = logging.getLogger(__name__)
+
+# Documents with at least this many pages are extracted in parallel.
+PARALLEL_PAGE_THRESHOLD = int(os.environ.get("PDF_PARALLEL_PAGE_THRESHOLD", "150"))
+# Upper bound on worker processes; 0 means one per available vCPU.
+MAX_WORKERS = int(os.environ.get("PDF_PARALLEL_MAX_WORKERS", "0"))
+# Under a time budget, parallel extraction runs in batches of this many pages per worker,
+# checking the budget between batches.
+BATCH_PAGES_PER_WORKER = int(os.environ.get("PDF_PARALLEL_BATCH_PAGES", "16"))
+
+
+def available_cpus():
+    """vCPUs this process may run on (Lambda grants more as memory grows)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def plan_workers(page_count, max_workers=None):
+    """Number of worker processes to use for a document, 1 meaning serial extraction."""
+    limit = max_workers or MAX_WORKERS or available_cpus()
+    if page_count < PARALLEL_PAGE_THRESHOLD or limit < 2:
+        return 1
+    return min(limit, page_count)
+
+
+def shard_ranges(page_count, workers, start=0):
+    """
+    Split [start, page_count) into `workers` contiguous, near-equal (start, stop) ranges.
+    """
+    base, extra = divmod(page_count - start, workers)
+    ranges = []
+    for shard in range(workers):
+        stop = start + base + (1 if shard < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _extract_range(path, start, stop, conn, backend_name="pypdf"):
+    """
+    Worker body: extract pages [start, stop) and send the (index, text, seconds) tuples
+    back.
+    """
+    try:
+        backend = get_backend(backend_name)
+        with mapped_file(path) as data:
+            document = backend.open(data)
+            conn.send(("ok", list(backend.iter_pages(document, start, stop))))
+    except Exception as e:
+        conn.send(("error", f"pages {start}-{stop - 1}: {e!r}"))
+    finally:
+        conn.close()
+
+
+def extract_pages_parallel(path, page_count, workers, start=0, backend=None):
+    """
+    Return the (index, text, seconds) tuples of pages [start, page_count), in page order,
+    using `workers` processes.
+    """
+    # fork keeps the already-imported pypdf in the workers; fall back to the platform
+    # default elsewhere.
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+
+    backend_name = backend.name if backend else "pypdf"
+    jobs = []
+    for shard_start, shard_stop in shard_ranges(page_count, workers, start):
+        receiver, sender = ctx.Pipe(duplex=False)
+        process = ctx.Process(
+            target=_extract_range,
+            args=(path, shard_start, shard_stop, sender, backend_name),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+        jobs.append((process, receiver))
+
+    pages = []
+    errors = []
+    # Drain every pipe before joining so a worker never blocks on a full pipe.
+    for process, receiver in jobs:
+        try:
+            status, payload = receiver.recv()
+        except EOFError:
+            status, payload = "error", f"worker {process.pid} exited without a result"
+        finally:
+            receiver.close()
+        if status == "ok":
+            pages.extend(payload)
+        else:
+            errors.append(payload)
+    for process, _ in jobs:
+        process.join()
+
+    if errors:
+        raise RuntimeError("Parallel PDF extraction failed: " + "; ".join(errors))
+    return pages
+
+
+def extract_pages(path, start=0, should_stop=None, max_workers=None, backend=None):
+    """
+    Extract pages from `start` onwards, in page order, serially or in parallel depending
+    on size, with the given backend (pypdf by default). When `should_stop` is given it is
+    consulted between pages (between batches when parallel), after at least one has been
+    extracted, and extraction stops early once it returns True. Returns (pages,
+    page_count) where pages are (index, text, seconds) tuples for a contiguous run of
+    pages beginning at `start`.
+    """
+    backend = backend or get_backend("pypdf")
+    pages = []
+    with mapped_file(path) as data:
+        document = backend.open(data)
+        page_count = backend.page_count(document)
+        workers = plan_workers(page_count - start, max_workers)
+        if workers > 1:
+            logger.info(
+                "Extracting %d pages with %d worker processes",
+                page_count - start,
+                workers,
+            )
+            step = page_count if should_stop is None else workers * BATCH_PAGES_PER_WORKER
+            for batch_start in range(start, page_count, step):
+                if pages and should_stop():
+                    break
+                batch_stop = min(batch_start + step, page_count)
+                pages.extend(
+                    extract_pages_parallel(
+                        path, batch_stop, workers, batch_start, backend
+                    )
+                )
+        else:
+            for page in backend.iter_pages(document, start):
+                pages.append(page)
+                if should_stop is not None and should_stop():
+                    break
+    return pages, page_count
+
+
+def extract_text_from_file(path, page_stats=None, max_workers=None, backend=None):
+    """
+    Extract the text of the PDF at `path`, choosing serial or parallel extraction from its
+    page count. The file is memory-mapped rather than read into memory. Produces exactly
+    the same text as the serial extractor.
+    """
+    pages, _ = extract_pages(path, max_workers=max_workers, backend=backend)
+    return join_pages(pages, page_stats)
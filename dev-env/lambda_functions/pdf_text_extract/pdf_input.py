@@ -0,0 +1,86 @@
+"""Probe, spool and memory-map S3 objects for the PDF extractor.
+
+Reading a PDF with get_object(...)['Body'].read() keeps the whole file in
+memory (usually twice, once more for a BytesIO copy) next to pypdf's object
+graph. Spooling it to /tmp with concurrent ranged GETs and handing pypdf a
+read-only mmap keeps peak RSS governed by pypdf's working set instead of the
+file size; mapped pages are file-backed and can be dropped by the kernel.
+"""
+
+import contextlib
+import mmap
+import os
+import tempfile
+
+# Leading bytes fetched by probe_object; enough for the magic bytes and a useful error
+# prefix.
+PROBE_BYTES = 1024
+
+# Objects larger than this are downloaded as concurrent ranged GETs of this size.
+DOWNLOAD_PART_SIZE = int(os.environ.get("PDF_DOWNLOAD_PART_SIZE", str(8 * 1024 * 1024)))
+DOWNLOAD_CONCURRENCY = int(os.environ.get("PDF_DOWNLOAD_CONCURRENCY", "8"))
+
+
+def transfer_config():
+    """
+    TransferConfig for ranged, concurrent downloads (boto3 is imported on first use).
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=DOWNLOAD_PART_SIZE,
+        multipart_chunksize=DOWNLOAD_PART_SIZE,
+        max_concurrency=DOWNLOAD_CONCURRENCY,
+        use_threads=True,
+    )
+
+
+def probe_object(s3, bucket, key, nbytes=PROBE_BYTES):
+    """
+    Return (leading bytes, total size) of an S3 object using a single ranged GET,
+    so junk and oversized objects can be turned away without transferring the body.
+    """
+    try:
+        response = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=0-{nbytes - 1}")
+    except Exception as e:
+        # S3 answers a ranged GET on an empty object with InvalidRange.
+        if getattr(e, "response", {}).get("Error", {}).get("Code") == "InvalidRange":
+            return b"", 0
+        raise
+    head = response["Body"].read()
+    content_range = response.get("ContentRange")  # "bytes 0-1023/52431"
+    if content_range and "/" in content_range:
+        size = int(content_range.rsplit("/", 1)[1])
+    else:
+        size = response.get("ContentLength", len(head))
+    return head, size
+
+
+@contextlib.contextmanager
+def spooled_object(s3, bucket, key, suffix=".pdf"):
+    """
+    Download s3://bucket/key to a temporary file under /tmp, yield its path and delete it
+    afterwards.
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        s3.download_file(bucket, key, path, Config=transfer_config())
+        yield path
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+@contextlib.contextmanager
+def mapped_file(path):
+    """
+    Yield a read-only mmap of the file at path (b"" for an empty file, which cannot be
+    mapped).
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
@@ -1,48 +1,28 @@
-import json
 import logging
-import boto3
-from common.ingest import ingest_comment_sql
+from shared.aws_clients import get_client
+from shared.comment_sink import handle_comment_event
+from shared.lazy import lazy_callable
 
 logger = logging.getLogger(__name__)
 
+# Heavy dependencies are imported on first use to keep cold starts short.
+ingest_comment_sql = lazy_callable("common.ingest", "ingest_comment_sql")
+
 
 def handler(event, context):
    """
-   Duplicate of the open_search function that interacts with the SQL database
-   
+   Duplicate of the open_search function that interacts with the SQL database.
+   This remains the orchestrator's default comment route, alongside the OpenSearch comment
+   ingest; the combined comment_ingest function is opt-in through COMBINED_COMMENT_INGEST,
+   once the common layer reads OPENSEARCH_SECRET_NAME.
+
    Args:
        event (dict): Contains the payload from the invoking Lambda
        context: Lambda context object
    """
-   print(f"Received event: {json.dumps(event)}")
-
-   try:
-       # Handle direct Lambda invocations
-       s3dict = event
-       print("Data: ", s3dict)
-       
-       # Get file contents from aws s3 (s3dict is the dictionary containing the bucket and file_key)
-       s3 = boto3.client('s3')
-       file_obj = s3.get_object(Bucket=s3dict['bucket'], Key=s3dict['file_key'])
-       file_content = file_obj['Body'].read().decode('utf-8')
-
-       if not file_content:
-           raise ValueError("File content is empty")
-
-       if 'comments' in s3dict['file_key']:
-           #set environment variables and ingest comment
-           print("ingesting")
-           ingest_comment_sql(file_content)
-           print("ingest complete!")
-       
-       return {
-           'statusCode': 200,
-           'body': json.dumps({'message': 'Data processed successfully'})
-       }
-       
-   except Exception as e:
-       logger.exception("SQLCommentIngest failed")
-       return {
-           'statusCode': 500,
-           'body': json.dumps({'error': str(e)})
-       }
\ No newline at end of file
+   return handle_comment_event(
+       event,
+       {"sql": lambda payload: ingest_comment_sql(payload)},
+       get_client,
+       "SQLCommentIngest",
+   )
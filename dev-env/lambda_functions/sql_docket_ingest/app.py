@@ -1,36 +1,24 @@
 import json
 import logging
-import os
-import boto3
-from common.ingest import ingest_docket
+from shared.aws_clients import get_client
+from shared.federal_fanout import fan_out_frdocnums
+from shared.lazy import lazy_callable
+from shared.payload import JsonPayload
 
 logger = logging.getLogger(__name__)
 
+# Heavy dependencies are imported on first use to keep cold starts short.
+ingest_docket = lazy_callable("common.ingest", "ingest_docket")
+
 try:
-    from frdocnum_extract import collect_frdocnums
+    from frdocnum_extract import scan_frdocnums
 except ImportError:
-    from lambda_functions.sql_docket_ingest.frdocnum_extract import collect_frdocnums
+    from lambda_functions.sql_docket_ingest.frdocnum_extract import scan_frdocnums
 
 
-def _queue_federal_ingest_for_payload(file_content: str) -> None:
-    try:
-        data = json.loads(file_content)
-    except json.JSONDecodeError:
-        return
-    nums = collect_frdocnums(data)
-    if not nums:
-        return
-    fn = os.environ.get("SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION")
-    if not fn:
-        print(
-            "SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION not set; skipping federal register fan-out"
-        )
-        return
-    client = boto3.client("lambda")
-    for num in sorted(nums):
-        payload = json.dumps({"frdocnum": num}).encode("utf-8")
-        client.invoke(FunctionName=fn, InvocationType="Event", Payload=payload)
-        print(f"Queued federal register ingest for frdocnum={num!r}")
+def _queue_federal_ingest_for_payload(file_content: str, refresh: bool = False) -> dict:
+    # Scan the raw JSON; the docket tree itself is never needed here
+    return fan_out_frdocnums(scan_frdocnums(file_content), get_client, refresh)
 
 
 def handler(event, context):
@@ -49,24 +37,27 @@ def handler(event, context):
         print("Data: ", s3dict)
         
         # Get file contents from aws s3 (s3dict is the dictionary containing the bucket and file_key)
-        s3 = boto3.client('s3')
+        s3 = get_client('s3')
         file_obj = s3.get_object(Bucket=s3dict['bucket'], Key=s3dict['file_key'])
-        file_content = file_obj['Body'].read().decode('utf-8')
+        file_content = JsonPayload.from_bytes(file_obj['Body'].read())
         print("File content Retrieved!")
 
         if not file_content:
             raise ValueError("File content is empty")
 
+        body = {'message': 'Data processed successfully'}
         if 'docket' in s3dict['file_key']:
             #set environment variables and ingest docket
             print("ingesting")
             ingest_docket(file_content)
             print("ingest complete!")
-            _queue_federal_ingest_for_payload(file_content)
+            body['federal_fanout'] = _queue_federal_ingest_for_payload(
+                file_content, refresh=bool(s3dict.get("force_refresh"))
+            )
 
         return {
             'statusCode': 200,
-            'body': json.dumps({'message': 'Data processed successfully'})
+            'body': json.dumps(body)
         }
         
     except Exception as e:
@@ -1,27 +1,9 @@
-"""Collect Federal Register document numbers from nested JSON (docket / document payloads)."""
+"""Collect Federal Register document numbers from nested JSON (docket / document
+payloads).
 
-from __future__ import annotations
+The implementation is shared with the other ingest functions; see shared/frdocnum.py.
+"""
 
-from typing import Any, Set
+from shared.frdocnum import collect_frdocnums, scan_frdocnums
 
-_FR_KEYS = frozenset({"frdocnum", "fdocnum"})
-
-
-def collect_frdocnums(obj: Any) -> Set[str]:
-    """Return unique non-empty frdocnum / fdocnum string values anywhere in the tree."""
-    found: Set[str] = set()
-
-    def walk(node: Any) -> None:
-        if isinstance(node, dict):
-            for key, val in node.items():
-                if key in _FR_KEYS and val is not None:
-                    s = str(val).strip()
-                    if s:
-                        found.add(s)
-                walk(val)
-        elif isinstance(node, list):
-            for item in node:
-                walk(item)
-
-    walk(obj)
-    return found
+__all__ = ["collect_frdocnums", "scan_frdocnums"]
@@ -1,32 +1,24 @@
 import json
 import logging
-import os
-import boto3
-from common.ingest import ingest_document
+from shared.aws_clients import get_client
+from shared.federal_fanout import fan_out_frdocnums
+from shared.lazy import lazy_callable
+from shared.payload import JsonPayload
 
 logger = logging.getLogger(__name__)
 
+# Heavy dependencies are imported on first use to keep cold starts short.
+ingest_document = lazy_callable("common.ingest", "ingest_document")
+
 try:
-    from frdocnum_extract import collect_frdocnums
+    from frdocnum_extract import scan_frdocnums
 except ImportError:
-    from lambda_functions.sql_document_ingest.frdocnum_extract import collect_frdocnums
+    from lambda_functions.sql_document_ingest.frdocnum_extract import scan_frdocnums
 
 
-def _queue_federal_ingest_for_payload(data: dict) -> None:
-    nums = collect_frdocnums(data)
-    if not nums:
-        return
-    fn = os.environ.get("SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION")
-    if not fn:
-        print(
-            "SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION not set; skipping federal register fan-out"
-        )
-        return
-    client = boto3.client("lambda")
-    for num in sorted(nums):
-        payload = json.dumps({"frdocnum": num}).encode("utf-8")
-        client.invoke(FunctionName=fn, InvocationType="Event", Payload=payload)
-        print(f"Queued federal register ingest for frdocnum={num!r}")
+def _queue_federal_ingest_for_payload(file_content: str, refresh: bool = False) -> dict:
+    # Scan the raw JSON rather than walking the parsed document tree
+    return fan_out_frdocnums(scan_frdocnums(file_content), get_client, refresh)
 
 
 def handler(event, context):
@@ -47,35 +39,41 @@ def handler(event, context):
 
         
         # Get file contents from aws s3 (s3dict is the dictionary containing the bucket and file_key)
-        s3 = boto3.client('s3')
+        s3 = get_client('s3')
         file_obj = s3.get_object(Bucket=s3dict['bucket'], Key=s3dict['file_key'])
-        file_content = file_obj['Body'].read().decode('utf-8')
+        file_content = JsonPayload.from_bytes(file_obj['Body'].read())
         print("File content Retrieved!")
 
         if not file_content:
             raise ValueError("File content is empty")
 
-        # Parse the file content as JSON
-        file_data = json.loads(file_content)
+        # Parsed once here; the payload carries the parsed document to ingest_document
+        payload = file_content
+        file_data = payload.data
 
         # Extract docketId from the JSON and file path
         if 'docketId' in file_data and file_data['docketId'] is None:
             # Extract docketId from the file path
             file_key = s3dict['file_key']
             docket_id_from_path = file_key.split('/')[2]  # Assuming the docketId is the third part of the file name
-            file_data['docketId'] = docket_id_from_path
+            payload = JsonPayload.from_data(
+                {**file_data, 'docketId': docket_id_from_path}
+            )
             print(f"docketId was null. Set docketId to: {docket_id_from_path}")
 
+        body = {'message': 'Data processed successfully'}
         if 'document' in s3dict['file_key']:
             # Set environment variables and ingest document
             print("Ingesting")
-            ingest_document(json.dumps(file_data))  # Pass the updated JSON data
+            ingest_document(payload)  # Pass the updated JSON data
             print("Ingest complete!")
-            _queue_federal_ingest_for_payload(file_data)
+            body['federal_fanout'] = _queue_federal_ingest_for_payload(
+                file_content, refresh=bool(s3dict.get("force_refresh"))
+            )
 
         return {
             'statusCode': 200,
-            'body': json.dumps({'message': 'Data processed successfully'})
+            'body': json.dumps(body)
         }
         
     except Exception as e:
@@ -1,15 +1,23 @@
 import json
 import logging
-import boto3
-from common.ingest import ingest_federal_document, ingest_cfr_part
+from shared.aws_clients import get_client
+from shared.federal_fanout import batched
+from shared.frdocnum_claims import CLAIM_TABLE, release
+from shared.lazy import lazy_callable
+from shared.payload import JsonPayload
 
 logger = logging.getLogger(__name__)
 
+# Heavy dependencies are imported on first use to keep cold starts short.
+ingest_federal_document = lazy_callable("common.ingest", "ingest_federal_document")
+ingest_cfr_part = lazy_callable("common.ingest", "ingest_cfr_part")
+
 try:
-    from federal_register_fetch import fetch_document_json
+    from federal_register_fetch import fetch_document_json, fetch_documents_json
 except ImportError:
     from lambda_functions.sql_federal_document_ingest.federal_register_fetch import (
         fetch_document_json,
+        fetch_documents_json,
     )
 
 
@@ -19,12 +27,77 @@ def _normalize_event(event):
     return event
 
 
+def _ingest(file_content):
+    # Both ingest steps get the same payload, so the document is parsed at most once.
+    payload = (
+        file_content
+        if isinstance(file_content, JsonPayload)
+        else JsonPayload(file_content)
+    )
+    print("Ingesting federal register document...")
+    ingest_federal_document(payload)
+
+    print("Ingesting CFR parts...")
+    ingest_cfr_part(payload)
+
+
+def _ingest_batch(frdocnums, refresh=False):
+    """
+    Fetch the numbers in API batches (bypassing the response cache when refresh is set)
+    and ingest each document; returns the handler body.
+    """
+    ingested, not_found, failed = [], [], {}
+    for batch in batched(str(num).strip() for num in frdocnums if str(num).strip()):
+        print(f"Fetching {len(batch)} Federal Register documents from API...")
+        try:
+            documents, missing = fetch_documents_json(batch, refresh=refresh)
+        except Exception as e:
+            # One batch the API would not serve (even after retries) does not lose the
+            # other batches.
+            logger.exception("Federal Register fetch failed for %d frdocnums", len(batch))
+            failed.update(dict.fromkeys(batch, str(e)))
+            continue
+        not_found.extend(missing)
+        for num, file_content in documents.items():
+            try:
+                _ingest(file_content)
+                ingested.append(num)
+            except Exception as e:
+                logger.exception("Federal register ingest failed for frdocnum=%r", num)
+                failed[num] = str(e)
+    if not_found:
+        print(f"Federal Register API did not return: {not_found}")
+    return {"ingested": ingested, "not_found": not_found, "failed": failed}
+
+
+def _release_claims(nums):
+    """
+    Let the next payload citing these numbers queue them again instead of waiting out the
+    claim TTL.
+    """
+    if not CLAIM_TABLE or not nums:
+        return
+    try:
+        release(get_client("dynamodb"), CLAIM_TABLE, nums)
+    except Exception:
+        logger.exception("Releasing the claims on %d failed frdocnums failed", len(nums))
+
+
 def handler(event, context):
     try:
         s3dict = _normalize_event(event)
         print("Received event keys:", list(s3dict.keys()) if isinstance(s3dict, dict) else type(s3dict))
         print("Data: ", s3dict)
 
+        if s3dict.get("frdocnums") and not s3dict.get("file_key"):
+            body = _ingest_batch(s3dict["frdocnums"], refresh=bool(s3dict.get("refresh")))
+            print(f"Ingested {len(body['ingested'])} documents")
+            _release_claims(sorted(body["failed"]))
+            return {
+                "statusCode": 500 if body["failed"] else 200,
+                "body": json.dumps(body),
+            }
+
         if s3dict.get("frdocnum") and not s3dict.get("file_key"):
             frdocnum = str(s3dict["frdocnum"]).strip()
             if not frdocnum:
@@ -32,19 +105,15 @@ def handler(event, context):
             print(f"Fetching Federal Register document {frdocnum!r} from API...")
             file_content = fetch_document_json(frdocnum)
         else:
-            s3 = boto3.client("s3")
+            s3 = get_client("s3")
             file_obj = s3.get_object(Bucket=s3dict["bucket"], Key=s3dict["file_key"])
-            file_content = file_obj["Body"].read().decode("utf-8")
+            file_content = JsonPayload.from_bytes(file_obj["Body"].read())
             print("File content Retrieved!")
 
         if not file_content:
             raise ValueError("File content is empty")
 
-        print("Ingesting federal register document...")
-        ingest_federal_document(file_content)
-
-        print("Ingesting CFR parts...")
-        ingest_cfr_part(file_content)
+        _ingest(file_content)
 
         print("Ingest complete!")
 
@@ -0,0 +1,95 @@
+"""Cache of Federal Register API document responses.
+
+Many dockets cite the same Federal Register documents, and backfills fetch
+them again and again. Each document JSON is stored gzipped under
+CACHE_PREFIX in CACHE_BUCKET, with a per-container LRU in front. An entry is
+served until it is CACHE_TTL_SECONDS old (the object's LastModified time),
+after which the document is fetched from the API again. The prefetch
+command fills the cache in bulk for a publication-date range.
+"""
+
+import gzip
+import logging
+import os
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CACHE_BUCKET = os.environ.get("FEDERAL_REGISTER_CACHE_BUCKET", "")
+CACHE_PREFIX = os.environ.get(
+    "FEDERAL_REGISTER_CACHE_PREFIX", "derived-data/federal_register_cache/"
+)
+CACHE_TTL_SECONDS = int(
+    os.environ.get("FEDERAL_REGISTER_CACHE_TTL_SECONDS", str(7 * 24 * 3600))
+)
+LOCAL_CACHE_ENTRIES = int(os.environ.get("FEDERAL_REGISTER_CACHE_ENTRIES", "128"))
+
+_local_cache = OrderedDict()  # frdocnum -> (stored_at, document JSON)
+
+
+def cache_key(frdocnum):
+    """S3 key of the cached document JSON."""
+    return f"{CACHE_PREFIX}documents/{frdocnum}.json.gz"
+
+
+def _fresh(stored_at, now=None):
+    return (time.time() if now is None else now) - stored_at < CACHE_TTL_SECONDS
+
+
+def _remember(frdocnum, stored_at, document):
+    _local_cache[frdocnum] = (stored_at, document)
+    _local_cache.move_to_end(frdocnum)
+    while len(_local_cache) > LOCAL_CACHE_ENTRIES:
+        _local_cache.popitem(last=False)
+
+
+def get_cached_document(s3, bucket, frdocnum):
+    """
+    Return the cached document JSON for frdocnum, or None on a miss or an expired entry.
+    """
+    local = _local_cache.get(frdocnum)
+    if local is not None:
+        if _fresh(local[0]):
+            _local_cache.move_to_end(frdocnum)
+            return local[1]
+        del _local_cache[frdocnum]
+    key = cache_key(frdocnum)
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=key)
+    except Exception as e:
+        if getattr(e, "response", {}).get("Error", {}).get("Code") not in (
+            "NoSuchKey",
+            "404",
+        ):
+            logger.warning("Federal Register cache lookup failed for %s: %r", key, e)
+        return None
+    stored_at = obj["LastModified"].timestamp()
+    if not _fresh(stored_at):
+        return None
+    document = gzip.decompress(obj["Body"].read()).decode("utf-8")
+    _remember(frdocnum, stored_at, document)
+    return document
+
+
+def put_cached_document(s3, bucket, frdocnum, document):
+    """
+    Store the document JSON for frdocnum. Failures are logged; the cache is best effort.
+    """
+    _remember(frdocnum, time.time(), document)
+    key = cache_key(frdocnum)
+    try:
+        s3.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=gzip.compress(document.encode("utf-8")),
+            ContentType="application/json",
+            ContentEncoding="gzip",
+        )
+    except Exception:
+        logger.exception("Federal Register cache store failed for %s", key)
+
+
+def clear_local_cache():
+    """Empty the per-container LRU (used by tests)."""
+    _local_cache.clear()
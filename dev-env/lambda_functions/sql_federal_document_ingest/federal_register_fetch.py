@@ -3,37 +3,138 @@
 from __future__ import annotations
 
 import json
-import ssl
-import urllib.error
+import os
 import urllib.parse
-import urllib.request
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from shared.aws_clients import get_client
+from shared.payload import JsonPayload
 
 try:
-    import certifi
-    _SSL_CTX = ssl.create_default_context(cafile=certifi.where())
+    import federal_register_cache
+    from http_client import HTTPError, KeepAliveClient
 except ImportError:
-    _SSL_CTX = ssl.create_default_context()
+    from lambda_functions.sql_federal_document_ingest import federal_register_cache
+    from lambda_functions.sql_federal_document_ingest.http_client import (
+        HTTPError,
+        KeepAliveClient,
+    )
+
+# Largest page the documents search allows.
+SEARCH_PAGE_SIZE = 1000
 
 # Public read API; Lambda must have outbound internet (e.g. NAT) if run inside a private VPC subnet.
-_BASE = "https://www.federalregister.gov/api/v1/documents"
+API_BASE = os.environ.get(
+    "FEDERAL_REGISTER_API_BASE", "https://www.federalregister.gov/api/v1"
+)
+
+_client = None
+
+
+def get_api_client() -> KeepAliveClient:
+    """The container's keep-alive API client, created on first use."""
+    global _client
+    if _client is None:
+        _client = KeepAliveClient(API_BASE)
+    return _client
+
+
+def _get(path: str, what: str, conditional: bool = True) -> str:
+    try:
+        return get_api_client().get(path, conditional=conditional).body.decode("utf-8")
+    except HTTPError as e:
+        body = e.body.decode("utf-8", errors="replace")
+        raise ValueError(
+            f"Federal Register API HTTP {e.status} for {what}: {body[:500]}"
+        ) from e
 
 
-def fetch_document_json(frdocnum: str) -> str:
+def fetch_document_json(frdocnum: str, refresh: bool = False) -> str:
+    """
+    Return the document JSON for frdocnum, from the response cache when one is configured
+    (FEDERAL_REGISTER_CACHE_BUCKET) and holds a fresh copy, else from the API.
+    refresh=True skips the cache lookup (the fetched copy is still stored).
+    """
     num = frdocnum.strip()
     if not num:
         raise ValueError("frdocnum is empty")
+    bucket = federal_register_cache.CACHE_BUCKET
+    if bucket and not refresh:
+        cached = federal_register_cache.get_cached_document(get_client("s3"), bucket, num)
+        if cached is not None:
+            return cached
     segment = urllib.parse.quote(num, safe="")
-    url = f"{_BASE}/{segment}.json"
-    req = urllib.request.Request(
-        url,
-        headers={"User-Agent": "MirrulationsETL/1.0"},
-        method="GET",
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=90, context=_SSL_CTX) as resp:
-            return resp.read().decode("utf-8")
-    except urllib.error.HTTPError as e:
-        body = e.read().decode("utf-8", errors="replace")
-        raise ValueError(
-            f"Federal Register API HTTP {e.code} for frdocnum={num!r}: {body[:500]}"
-        ) from e
+    document = _get(f"/documents/{segment}.json", f"frdocnum={num!r}")
+    if bucket:
+        federal_register_cache.put_cached_document(
+            get_client("s3"), bucket, num, document
+        )
+    return document
+
+
+def fetch_documents_json(
+    frdocnums: Iterable[str], refresh: bool = False
+) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Fetch several documents: cached ones from the response cache and the rest with one
+    API request (the API takes comma-separated numbers).
+    Returns ({frdocnum: document JSON}, [numbers the API did not return]).
+    """
+    nums = sorted({n.strip() for n in frdocnums if n and n.strip()})
+    if not nums:
+        raise ValueError("frdocnums is empty")
+    bucket = federal_register_cache.CACHE_BUCKET
+    documents = {}
+    if bucket and not refresh:
+        s3 = get_client("s3")
+        for num in nums:
+            cached = federal_register_cache.get_cached_document(s3, bucket, num)
+            if cached is not None:
+                documents[num] = JsonPayload(cached)
+    wanted = [num for num in nums if num not in documents]
+    if not wanted:
+        return documents, []
+
+    segment = ",".join(urllib.parse.quote(num, safe="") for num in wanted)
+    payload = json.loads(_get(f"/documents/{segment}.json", f"frdocnums={wanted!r}"))
+    # A multi-number request answers {"count", "results": [...]}; a single number gets the
+    # bare document.
+    results = payload["results"] if "results" in payload else [payload]
+    for result in results:
+        num = result.get("document_number")
+        if num in wanted:
+            # The parsed result travels with the text, so ingest does not parse it again.
+            documents[num] = JsonPayload.from_data(result)
+            if bucket:
+                federal_register_cache.put_cached_document(
+                    get_client("s3"), bucket, num, documents[num]
+                )
+    return documents, [num for num in wanted if num not in documents]
+
+
+def search_document_numbers(published_from: str, published_to: str) -> Iterator[str]:
+    """
+    Yield the numbers of the documents published between two YYYY-MM-DD dates (inclusive),
+    oldest first.
+    """
+    page = 1
+    while True:
+        query = urllib.parse.urlencode([
+            ("conditions[publication_date][gte]", published_from),
+            ("conditions[publication_date][lte]", published_to),
+            ("fields[]", "document_number"),
+            ("order", "oldest"),
+            ("per_page", str(SEARCH_PAGE_SIZE)),
+            ("page", str(page)),
+        ])
+        payload = json.loads(_get(
+            f"/documents.json?{query}",
+            f"publication dates {published_from}..{published_to} page {page}",
+            conditional=False,
+        ))
+        for result in payload.get("results", []):
+            if result.get("document_number"):
+                yield result["document_number"]
+        if page >= payload.get("total_pages", 0):
+            return
+        page += 1
@@ -0,0 +1,245 @@
+"""Keep-alive HTTP(S) client for the Federal Register API.
+
+urllib.request.urlopen opens a new connection (and TLS handshake) per
+request and gives up on the first 429 or 5xx. This client keeps a small
+pool of persistent connections per container, so warm invocations reuse
+them, and it:
+  - sends Accept-Encoding: gzip and decompresses the response,
+  - retries 429 / 5xx responses and dropped connections with full-jitter
+    exponential backoff, waiting at least as long as Retry-After asks,
+  - remembers the ETag / Last-Modified of recent responses and sends
+    If-None-Match / If-Modified-Since on re-fetches, so an unchanged
+    document comes back as a body-less 304. The bodies kept for this are
+    bounded by count and by total size.
+"""
+
+from __future__ import annotations
+
+import gzip
+import http.client
+import logging
+import os
+import random
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = float(os.environ.get("FEDERAL_REGISTER_HTTP_TIMEOUT", "90"))
+HTTP_MAX_ATTEMPTS = int(os.environ.get("FEDERAL_REGISTER_HTTP_MAX_ATTEMPTS", "5"))
+HTTP_POOL_SIZE = int(os.environ.get("FEDERAL_REGISTER_HTTP_POOL_SIZE", "4"))
+# Responses whose validators (and body) are kept for conditional re-fetches.
+VALIDATOR_ENTRIES = int(os.environ.get("FEDERAL_REGISTER_VALIDATOR_ENTRIES", "256"))
+# Upper bound on the bodies kept with them; multi-document responses can be several MB.
+VALIDATOR_MAX_BYTES = int(
+    os.environ.get("FEDERAL_REGISTER_VALIDATOR_MAX_BYTES", str(16 * 1024 * 1024))
+)
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 20.0
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# A pooled connection the server has closed fails on reuse with one of these.
+_CONNECTION_ERRORS = (http.client.HTTPException, OSError)
+
+_ssl_context = None
+
+
+def _get_ssl_context():
+    # certifi (when installed) and the default context are only loaded by the first HTTPS
+    # request.
+    global _ssl_context
+    if _ssl_context is None:
+        try:
+            import certifi
+            _ssl_context = ssl.create_default_context(cafile=certifi.where())
+        except ImportError:
+            _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+class Response(NamedTuple):
+    status: int
+    body: bytes
+    headers: Dict[str, str]
+    # True when the body came from the validator store after a 304.
+    not_modified: bool = False
+
+
+class HTTPError(Exception):
+    """A non-2xx response that was not retried, or the last one after retries ran out."""
+
+    def __init__(self, status, body, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.body = body
+        self.url = url
+
+
+def retry_after_seconds(
+    value: Optional[str], now: Optional[float] = None
+) -> Optional[float]:
+    """Seconds a Retry-After header asks for (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+def backoff_seconds(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Full-jitter exponential backoff for the given (0-based) retry, never shorter than
+    retry_after.
+    """
+    delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, BACKOFF_MAX_SECONDS * 3))
+    return delay
+
+
+class KeepAliveClient:
+    """A per-origin pool of persistent connections with retries and conditional GETs."""
+
+    def __init__(
+        self,
+        base_url,
+        user_agent="MirrulationsETL/1.0",
+        timeout=HTTP_TIMEOUT,
+        max_attempts=HTTP_MAX_ATTEMPTS,
+        pool_size=HTTP_POOL_SIZE,
+        sleep=time.sleep,
+    ):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.pool_size = pool_size
+        self.sleep = sleep
+        self._idle = []
+        self._validators = OrderedDict()  # path -> (etag, last_modified, body)
+        self._validator_bytes = 0
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _new_connection(self):
+        self.connections_opened += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                               context=_get_ssl_context())
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _checkin(self, conn):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _remember(self, path, headers, body):
+        etag, last_modified = headers.get("etag"), headers.get("last-modified")
+        with self._lock:
+            old = self._validators.pop(path, None)
+            if old is not None:
+                self._validator_bytes -= len(old[2])
+            # A body larger than the whole budget is not kept (nor are its validators).
+            if not (etag or last_modified) or len(body) > VALIDATOR_MAX_BYTES:
+                return
+            self._validators[path] = (etag, last_modified, body)
+            self._validator_bytes += len(body)
+            while (len(self._validators) > VALIDATOR_ENTRIES
+                   or self._validator_bytes > VALIDATOR_MAX_BYTES):
+                _, (_, _, evicted) = self._validators.popitem(last=False)
+                self._validator_bytes -= len(evicted)
+
+    def _request_once(self, path, headers):
+        conn, reused = self._checkout()
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except _CONNECTION_ERRORS:
+            conn.close()
+            if reused:
+                # The server dropped an idle keep-alive connection; retry at once on a
+                # fresh one.
+                return self._request_once(path, headers)
+            raise
+        response_headers = {k.lower(): v for k, v in resp.getheaders()}
+        if resp.will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+        if response_headers.get("content-encoding", "").lower() == "gzip" and body:
+            body = gzip.decompress(body)
+        return resp.status, body, response_headers
+
+    def get(self, path, conditional=True):
+        """
+        GET base_url + path. Returns a Response for 2xx (and for a 304 answered from the
+        validator store); raises HTTPError for other statuses once retries are used up.
+        """
+        path = self.base_path + path
+        url = f"{self.scheme}://{self.host}{f':{self.port}' if self.port else ''}{path}"
+        headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip",
+            "Accept": "application/json",
+        }
+        cached = self._validators.get(path) if conditional else None
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        for attempt in range(self.max_attempts):
+            last_attempt = attempt == self.max_attempts - 1
+            try:
+                status, body, response_headers = self._request_once(path, headers)
+            except _CONNECTION_ERRORS as e:
+                if last_attempt:
+                    raise
+                logger.warning("GET %s failed (%r); retrying", url, e)
+                self.sleep(backoff_seconds(attempt))
+                continue
+            if status == 304 and cached:
+                return Response(200, cached[2], response_headers, not_modified=True)
+            if 200 <= status < 300:
+                self._remember(path, response_headers, body)
+                return Response(status, body, response_headers)
+            if status not in RETRY_STATUSES or last_attempt:
+                raise HTTPError(status, body, url)
+            delay = backoff_seconds(
+                attempt, retry_after_seconds(response_headers.get("retry-after"))
+            )
+            logger.warning(
+                "GET %s returned HTTP %s; retrying in %.2fs", url, status, delay
+            )
+            self.sleep(delay)
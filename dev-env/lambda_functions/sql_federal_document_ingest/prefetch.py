@@ -0,0 +1,52 @@
+"""Bulk-fill the Federal Register response cache for a publication-date range.
+
+The range is searched in windows of a few days (the API stops paging a
+single search after 10,000 results), and the documents found are fetched
+in FEDERAL_INGEST_BATCH_SIZE batches through fetch_documents_json, which
+stores every fetched document in the cache. Run it with
+scripts/prefetch_federal_register.py.
+"""
+
+from datetime import date, timedelta
+
+from shared.federal_fanout import batched
+
+try:
+    from federal_register_fetch import fetch_documents_json, search_document_numbers
+except ImportError:
+    from lambda_functions.sql_federal_document_ingest.federal_register_fetch import (
+        fetch_documents_json,
+        search_document_numbers,
+    )
+
+
+def date_windows(published_from, published_to, window_days=7):
+    """
+    Yield inclusive (start, end) YYYY-MM-DD pairs covering the range in window_days steps.
+    """
+    start, end = date.fromisoformat(published_from), date.fromisoformat(published_to)
+    if end < start:
+        raise ValueError(f"{published_to} is before {published_from}")
+    step = timedelta(days=max(1, window_days))
+    while start <= end:
+        window_end = min(end, start + step - timedelta(days=1))
+        yield start.isoformat(), window_end.isoformat()
+        start = window_end + timedelta(days=1)
+
+
+def prefetch_range(published_from, published_to, window_days=7, refresh=False):
+    """
+    Cache every document published in the range. Returns {"found", "cached", "not_found"}
+    counts.
+    """
+    found = cached = 0
+    not_found = []
+    for window_from, window_to in date_windows(published_from, published_to, window_days):
+        nums = list(search_document_numbers(window_from, window_to))
+        found += len(nums)
+        for batch in batched(nums):
+            documents, missing = fetch_documents_json(batch, refresh=refresh)
+            cached += len(documents)
+            not_found.extend(missing)
+        print(f"{window_from}..{window_to}: {len(nums)} documents")
+    return {"found": found, "cached": cached, "not_found": len(not_found)}
@@ -1,12 +1,28 @@
 import json
 import logging
-import boto3
-from bs4 import BeautifulSoup
-import re
-from common.ingest import ingest_summary
+import os
+from shared.aws_clients import get_client
+from shared.lazy import lazy_callable
+
+try:
+    from summary_scanner import scan_document
+    from summary_candidates import CANDIDATE_TABLE, ingest_if_best, score_candidate
+except ImportError:
+    from lambda_functions.sql_htm_summary.summary_scanner import scan_document
+    from lambda_functions.sql_htm_summary.summary_candidates import (
+        CANDIDATE_TABLE,
+        ingest_if_best,
+        score_candidate,
+    )
 
 logger = logging.getLogger(__name__)
 
+# Heavy dependencies are imported on first use to keep cold starts short.
+ingest_summary = lazy_callable("common.ingest", "ingest_summary")
+
+# The HTM body is read in chunks of this size until the summary has been found.
+READ_CHUNK_BYTES = int(os.environ.get("HTM_READ_CHUNK_BYTES", "16384"))
+
 
 def _is_html_summary_key(file_key):
     """True if key ends with .htm or .html (case-insensitive)."""
@@ -17,8 +33,9 @@ def _is_html_summary_key(file_key):
 def handler(event, context):
     """
     Lambda handler that processes an .htm file from S3,
-    extracts the 'SUMMARY' section from its content,
-    and prepares it for ingestion.
+    extracts the 'SUMMARY' section and the structured preamble
+    (agency, action, dates, contacts, CFR parts, page range) from its content
+    in a single pass, and prepares them for ingestion.
     
     Args:
         event (dict): Contains the payload with 'bucket' and 'file_key'
@@ -34,17 +51,13 @@ def handler(event, context):
         s3dict = event
         print("Data: ", s3dict)
 
-        s3 = boto3.client('s3')
-        file_obj = s3.get_object(Bucket=s3dict['bucket'], Key=s3dict['file_key'])
-        file_content = file_obj['Body'].read().decode('utf-8')
-        print("File content retrieved!")
-
-        if not file_content:
-            raise ValueError("File content is empty")
-
         file_key = s3dict['file_key']
         print(f"Processing file_key: {file_key}")
 
+        # Reject anything that is not HTM/HTML before downloading it
+        if not _is_html_summary_key(file_key):
+            raise ValueError("Provided file is not an HTM or HTML file.")
+
         # Extract the docket-id from the file key
         file_key_parts = file_key.split('/')
         if len(file_key_parts) > 1:
@@ -54,56 +67,69 @@ def handler(event, context):
         else:
             raise ValueError("Invalid file key format. Unable to extract docket-id.")
 
-        if _is_html_summary_key(file_key):
-            # Use BeautifulSoup to parse the HTML content
-            soup = BeautifulSoup(file_content, 'html.parser')
-
-            # Extract the plain text from the HTM/HTML
-            plain_text = soup.get_text()
-            print("Extracted plain text from HTM/HTML.")
-
-            # Find the "SUMMARY:" section
-            summary_start = plain_text.find("SUMMARY:")
-            if summary_start != -1:
-                # Extract the text starting from "SUMMARY:"
-                summary_text = plain_text[summary_start + len("SUMMARY:"):]
-
-                # Remove the page pattern and its surrounding blank lines
-                summary_text = re.sub(r'\n?\s*\[\[Page \d+\]\]\s*\n?', ' ', summary_text)
-
-                # Stop at the first empty line
-                empty_line_match = re.search(r'\n\s*\n', summary_text)
-                if empty_line_match:
-                    summary_text = summary_text[:empty_line_match.start()].strip()
-
-                # Clean up extra spaces in the extracted summary
-                summary_text = re.sub(r'\s+', ' ', summary_text).strip()
+        s3 = get_client('s3')
+        file_obj = s3.get_object(Bucket=s3dict['bucket'], Key=file_key)
+        if not file_obj.get('ContentLength'):
+            raise ValueError("File content is empty")
 
-                print("Extracted Summary:")
-                print(summary_text)
-            else:
-                summary_text = None
-                print("No SUMMARY section found in the file.")
+        # Stream the body through the tag-stripping scanner once; it stops reading when
+        # the SUMMARY paragraph is settled and the preamble ends
+        # (SUPPLEMENTARY INFORMATION:).
+        body = file_obj['Body']
+        try:
+            summary_text, preamble = scan_document(body.iter_chunks(READ_CHUNK_BYTES))
+        finally:
+            body.close()
+
+        if summary_text is not None:
+            print("Extracted Summary:")
+            print(summary_text)
+        else:
+            print("No SUMMARY section found in the file.")
 
-            # Create a dictionary with docket-id and summary_text
-            data = {
-                "docket_id": docket_id,
-                "summary_text": summary_text
-            }
+        # Create a dictionary with docket-id, summary_text and the structured preamble
+        data = {
+            "docket_id": docket_id,
+            "summary_text": summary_text,
+            "preamble": preamble,
+        }
 
+        # A file without a summary never overwrites one found in another file of the
+        # docket
+        if summary_text is None:
+            ingested = False
+        elif CANDIDATE_TABLE:
+            # Several .htm files per docket: only ingest when this file's summary beats
+            # the stored best
+            score = score_candidate(file_key, summary_text, preamble)
+            ingested = ingest_if_best(
+                get_client('dynamodb'),
+                CANDIDATE_TABLE,
+                docket_id,
+                score,
+                data,
+                ingest_summary,
+            )
+            outcome = 'ingested' if ingested else 'skipped; a better candidate is stored'
+            print(f"Summary candidate {score} {outcome}")
+        else:
             # Pass the dictionary to the ingest_htm_summary function (when implemented)
             print("Ingesting summary...")
             ingest_summary(data)
             print("Summary ingestion completed.")
-
-        else:
-            raise ValueError("Provided file is not an HTM or HTML file.")
+            ingested = True
 
         return {
-                'statusCode': 200,
-                'body': json.dumps({'message': 'Summary extracted successfully', 'data': data})
-            }
-    
+            'statusCode': 200,
+            'body': json.dumps(
+                {
+                    'message': 'Summary extracted successfully',
+                    'data': data,
+                    'ingested': ingested,
+                }
+            ),
+        }
+
     except Exception as e:
         logger.exception("HTMSummaryIngest failed")
         return {
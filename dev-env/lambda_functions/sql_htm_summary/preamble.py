@@ -0,0 +1,103 @@
+"""Structured fields of a Federal Register document preamble.
+
+The preamble is the text of an HTM document up to "SUPPLEMENTARY
+INFORMATION:". It carries the publication header, the page range, the CFR
+part headings, docket numbers and RIN, and the labelled sections (AGENCY,
+ACTION, DATES, ADDRESSES, FOR FURTHER INFORMATION CONTACT). The summary is
+extracted separately, by summary_scanner, with the rules it has always used.
+"""
+
+import re
+
+PREAMBLE_END = "SUPPLEMENTARY INFORMATION:"
+
+_PAGE_MARKER = re.compile(r'\n?\s*\[\[Page \d+\]\]\s*\n?')
+_WHITESPACE = re.compile(r'\s+')
+# The dashed separators between preamble blocks.
+_RULE_LINE = re.compile(r'^[ \t]*-{3,}[ \t]*$', re.M)
+
+_HEADER = re.compile(r'\[Federal Register Volume (\d+), Number (\d+) \(([^)]*)\)\]')
+_DOCUMENT_TYPE = re.compile(
+    r'^\[(Rules and Regulations|Proposed Rules|Notices|Presidential Documents)\]', re.M
+)
+_PAGES = re.compile(r'\[Pages? (\d+)(?:\s*-\s*(\d+))?\]')
+_CFR_HEADING = re.compile(
+    r'^[ \t]*(\d+) CFR (?:Parts?|Chapters?|Subchapters?)[ \t]+\S[^\n]*$', re.M
+)
+_CFR_NUMBER = re.compile(r'\d+[A-Za-z]?')
+_DOCKET = re.compile(r'\[Docket Nos?\.\s*([^\]]+)\]')
+_RIN = re.compile(r'^[ \t]*RIN[ \t]+(\d{4}-[A-Z0-9]{4})', re.M)
+
+# Labelled sections, keyed by the field name they are stored under.
+_SECTION_LABELS = {
+    "AGENCY": "agency",
+    "AGENCIES": "agency",
+    "ACTION": "action",
+    # SUMMARY only bounds the neighbouring sections; summary_scanner extracts the summary.
+    "SUMMARY": None,
+    "DATE": "dates",
+    "DATES": "dates",
+    "ADDRESSES": "addresses",
+    "FOR FURTHER INFORMATION CONTACT": "further_information_contact",
+}
+_SECTION = re.compile(
+    r'^[ \t]*('
+    + "|".join(sorted(map(re.escape, _SECTION_LABELS), key=len, reverse=True))
+    + r')[ \t]*:',
+    re.M,
+)
+
+
+def _clean(text):
+    return _WHITESPACE.sub(' ', _PAGE_MARKER.sub(' ', _RULE_LINE.sub('', text))).strip()
+
+
+def parse_preamble(text):
+    """
+    Return the structured preamble fields found in text (the document text before
+    PREAMBLE_END).
+    """
+    preamble = {}
+
+    header = _HEADER.search(text)
+    if header:
+        preamble["volume"] = int(header.group(1))
+        preamble["number"] = int(header.group(2))
+        preamble["publication_date"] = header.group(3).strip()
+    document_type = _DOCUMENT_TYPE.search(text)
+    if document_type:
+        preamble["document_type"] = document_type.group(1)
+    pages = _PAGES.search(text)
+    if pages:
+        preamble["page_start"] = int(pages.group(1))
+        preamble["page_end"] = int(pages.group(2) or pages.group(1))
+
+    sections = list(_SECTION.finditer(text))
+    # Headings (CFR parts, dockets, RIN) sit above the first labelled section.
+    headings = text[:sections[0].start()] if sections else text
+    cfr_parts = []
+    for heading in _CFR_HEADING.finditer(headings):
+        line = _clean(heading.group(0))
+        title, _, rest = line.partition(" CFR ")
+        cfr_parts.append({
+            "heading": line,
+            "title": int(title),
+            "parts": _CFR_NUMBER.findall(rest.split(" ", 1)[1] if " " in rest else ""),
+        })
+    if cfr_parts:
+        preamble["cfr_parts"] = cfr_parts
+    dockets = [_clean(docket) for docket in _DOCKET.findall(headings)]
+    if dockets:
+        preamble["docket_numbers"] = dockets
+    rin = _RIN.search(headings)
+    if rin:
+        preamble["rin"] = rin.group(1)
+
+    for section, following in zip(sections, sections[1:] + [None]):
+        field = _SECTION_LABELS[section.group(1)]
+        if field is None or field in preamble:
+            continue
+        body = _clean(text[section.end():following.start() if following else len(text)])
+        if body:
+            preamble[field] = body
+    return preamble
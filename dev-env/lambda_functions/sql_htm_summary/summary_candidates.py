@@ -0,0 +1,147 @@
+"""Per-docket summary candidate store.
+
+A docket can have several .htm files and each one runs the summary function,
+so without coordination the last file to arrive wins and the docket row is
+rewritten once per file. Every candidate is scored instead, and a DynamoDB
+conditional update keeps only the best one per docket; ingest_summary is
+called only when a candidate becomes the new best. The outcome no longer
+depends on arrival order.
+
+Candidates are ranked, most significant first, by:
+  1. having a non-empty summary,
+  2. the summary being meaningful (at least SUMMARY_MIN_CHARS characters,
+     not a one-word "Closed."),
+  3. publication order: earlier publication dates, then lower document
+     sequence numbers, win, since the document that opened the docket
+     (usually the proposed rule or notice) describes it best,
+  4. summary length,
+  5. the file key, so that equal candidates still have a fixed order.
+The ranks are packed into a fixed-width string, so "better" is plain string
+comparison and can be evaluated by DynamoDB in the condition expression.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+CANDIDATE_TABLE = os.environ.get("SUMMARY_CANDIDATE_TABLE", "")
+SUMMARY_MIN_CHARS = int(os.environ.get("SUMMARY_MIN_CHARS", "40"))
+
+_DOCUMENT_SEQUENCE = re.compile(r'-(\d{1,5})(?:_[^/]*)?\.html?$', re.IGNORECASE)
+# Re-ingests after losing a race to a better candidate before giving up.
+_MAX_CONVERGE_ROUNDS = 3
+
+
+def _publication_date(preamble):
+    value = (preamble or {}).get("publication_date", "")
+    try:
+        return datetime.strptime(value.split(", ", 1)[-1], "%B %d, %Y")
+    except ValueError:
+        return None
+
+
+def score_candidate(file_key, summary_text, preamble=None):
+    """Fixed-width, string-comparable score of a summary candidate (higher is better)."""
+    summary_text = summary_text or ""
+    published = _publication_date(preamble)
+    date_rank = 99999999 - int(published.strftime("%Y%m%d")) if published else 0
+    sequence = _DOCUMENT_SEQUENCE.search(file_key)
+    sequence_rank = 99999 - int(sequence.group(1)) if sequence else 0
+    return (
+        f"{1 if summary_text else 0}"
+        f"{1 if len(summary_text) >= SUMMARY_MIN_CHARS else 0}"
+        f"{date_rank:08d}"
+        f"{sequence_rank:05d}"
+        f"{min(len(summary_text), 9999999):07d}"
+        f"|{file_key}"
+    )
+
+
+def _offer(dynamodb, table, docket_id, score, data):
+    # Returns (stored, previous item or None).
+    try:
+        response = dynamodb.update_item(
+            TableName=table,
+            Key={"docket_id": {"S": docket_id}},
+            UpdateExpression=(
+                "SET score = :score, candidate = :candidate, updated_at = :now"
+            ),
+            ConditionExpression="attribute_not_exists(score) OR score < :score",
+            ExpressionAttributeValues={
+                ":score": {"S": score},
+                ":candidate": {"S": json.dumps(data)},
+                ":now": {"S": datetime.utcnow().isoformat(timespec="seconds") + "Z"},
+            },
+            ReturnValues="ALL_OLD",
+        )
+    except dynamodb.exceptions.ConditionalCheckFailedException:
+        return False, None
+    return True, response.get("Attributes") or None
+
+
+def offer_candidate(dynamodb, table, docket_id, score, data):
+    """
+    Store the candidate if it beats the docket's current best. Returns True when it did
+    (the caller should ingest it) and False when a better or equal candidate is already
+    stored.
+    """
+    return _offer(dynamodb, table, docket_id, score, data)[0]
+
+
+def _withdraw(dynamodb, table, docket_id, score, previous):
+    """
+    Undo an offer whose ingest failed, unless a better candidate has replaced it since:
+    restore the previous best, or drop the item if there was none. Otherwise a retry of
+    the same file would find its own score stored and be skipped forever.
+    """
+    condition = {
+        "ConditionExpression": "score = :score",
+        "ExpressionAttributeValues": {":score": {"S": score}},
+    }
+    try:
+        if previous:
+            dynamodb.put_item(TableName=table, Item=previous, **condition)
+        else:
+            dynamodb.delete_item(
+                TableName=table, Key={"docket_id": {"S": docket_id}}, **condition
+            )
+    except dynamodb.exceptions.ConditionalCheckFailedException:
+        pass
+
+
+def current_best(dynamodb, table, docket_id):
+    """Return (score, data) of the docket's best candidate, or None if it has none."""
+    item = dynamodb.get_item(
+        TableName=table,
+        Key={"docket_id": {"S": docket_id}},
+        ConsistentRead=True,
+    ).get("Item")
+    if not item:
+        return None
+    return item["score"]["S"], json.loads(item["candidate"]["S"])
+
+
+def ingest_if_best(dynamodb, table, docket_id, score, data, ingest):
+    """
+    Offer the candidate and, if it is the new best, ingest it. A better candidate may be
+    stored while this one is being ingested; afterwards the stored best is re-read and
+    ingested again if it changed, so the docket row ends on the best candidate whatever
+    order the ingests finish in. If this candidate's own ingest raises, the offer is
+    withdrawn before the error propagates. Returns True if anything was ingested.
+    """
+    stored, previous = _offer(dynamodb, table, docket_id, score, data)
+    if not stored:
+        return False
+    try:
+        ingest(data)
+    except Exception:
+        _withdraw(dynamodb, table, docket_id, score, previous)
+        raise
+    for _ in range(_MAX_CONVERGE_ROUNDS):
+        best = current_best(dynamodb, table, docket_id)
+        if best is None or best[0] == score:
+            break
+        score, data = best
+        ingest(data)
+    return True
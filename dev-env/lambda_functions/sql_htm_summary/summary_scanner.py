@@ -0,0 +1,287 @@
+"""Streaming extraction of the SUMMARY paragraph and preamble from Federal Register HTM
+files.
+
+The handler used to parse the whole document with BeautifulSoup, take
+get_text() of everything and only then look for "SUMMARY:". The summary is
+near the top of the document, so this module strips tags with a streaming
+HTMLParser fed from S3 in chunks, and stops reading as soon as the blank
+line that ends the summary has been seen. The result is identical to the
+BeautifulSoup pipeline: the same text is collected (script, style and
+template contents, comments and declarations are skipped; entities are
+decoded the way bs4's html.parser builder decodes them; a string made only
+of ASCII whitespace is reduced to one newline or space outside pre and
+textarea, as bs4 does), and the same page-marker removal, blank-line cut
+and whitespace collapse are applied.
+"""
+
+import codecs
+import re
+from html.entities import html5
+from html.parser import HTMLParser
+
+try:
+    from preamble import PREAMBLE_END, parse_preamble
+except ImportError:
+    from lambda_functions.sql_htm_summary.preamble import PREAMBLE_END, parse_preamble
+
+SUMMARY_MARKER = "SUMMARY:"
+# Upper bound on the text kept for the preamble when "SUPPLEMENTARY INFORMATION:" never
+# appears.
+PREAMBLE_MAX_CHARS = 200_000
+
+# The same three passes the handler applied to the text after "SUMMARY:", precompiled.
+_PAGE_MARKER = re.compile(r'\n?\s*\[\[Page \d+\]\]\s*\n?')
+_BLANK_LINE = re.compile(r'\n\s*\n')
+_WHITESPACE = re.compile(r'\s+')
+_PAGE_MARKER_HEAD = "[[Page "
+
+
+class DocumentTextScanner(HTMLParser):
+    """
+    Tag-stripping scanner that collects the text
+    BeautifulSoup(html, 'html.parser').get_text() would return. Feed it decoded text and
+    call take() for the text seen since the last call.
+    """
+
+    # bs4 stores the strings inside these elements as Script/Stylesheet/TemplateString,
+    # which get_text() leaves out.
+    SKIPPED_TAGS = frozenset(("script", "style", "template"))
+    # Inside these, bs4 keeps whitespace-only strings as they are.
+    PRESERVE_WHITESPACE_TAGS = frozenset(("pre", "textarea"))
+    ASCII_SPACES = " \n\t\x0c\r"
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self._pieces = []
+        self._skipped = []
+        self._preserved = []
+        # The current string (text between two pieces of markup) so far, while it is all
+        # ASCII whitespace; whether it is reduced is only known once the string ends.
+        self._blank = []
+        self._string_has_text = False
+
+    def take(self):
+        text = "".join(self._pieces)
+        self._pieces.clear()
+        return text
+
+    def _end_string(self):
+        # bs4 replaces a string of ASCII whitespace with "\n" if it has one, else " ".
+        if self._blank:
+            newline = any("\n" in piece for piece in self._blank)
+            self._pieces.append("\n" if newline else " ")
+            self._blank.clear()
+        self._string_has_text = False
+
+    def close(self):
+        super().close()
+        self._end_string()
+
+    def handle_starttag(self, tag, attrs):
+        self._end_string()
+        if tag in self.SKIPPED_TAGS:
+            self._skipped.append(tag)
+        elif tag in self.PRESERVE_WHITESPACE_TAGS:
+            self._preserved.append(tag)
+
+    def handle_endtag(self, tag):
+        self._end_string()
+        if tag in self._skipped:
+            while self._skipped and self._skipped.pop() != tag:
+                pass
+        elif tag in self._preserved:
+            while self._preserved and self._preserved.pop() != tag:
+                pass
+
+    def handle_comment(self, data):
+        self._end_string()
+
+    def handle_decl(self, decl):
+        self._end_string()
+
+    def handle_pi(self, data):
+        self._end_string()
+
+    def handle_data(self, data):
+        if self._skipped or not data:
+            return
+        if self._preserved or self._string_has_text:
+            self._pieces.append(data)
+        elif data.strip(self.ASCII_SPACES):
+            # The string has text: keep it verbatim, with the whitespace held so far.
+            self._pieces.extend(self._blank)
+            self._pieces.append(data)
+            self._blank.clear()
+            self._string_has_text = True
+        else:
+            self._blank.append(data)
+
+    def handle_entityref(self, name):
+        # Known entities are decoded; unknown ones are kept as "&name", as bs4 does.
+        character = html5.get(name + ";")
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def handle_charref(self, name):
+        # bs4 reads references below 256 as windows-1252 when that is defined, else as
+        # code points.
+        try:
+            code = int(name.lstrip("xX"), 16) if name[:1] in ("x", "X") else int(name)
+        except ValueError:
+            code = -1
+        data = None
+        if code == 0 or 0xD800 <= code <= 0xDFFF:
+            # NUL and surrogates are not characters (a lone surrogate cannot even be
+            # encoded as UTF-8).
+            code = -1
+        elif 0 < code < 256:
+            try:
+                data = bytes([code]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+    def unknown_decl(self, data):
+        self._end_string()
+        if data.upper().startswith("CDATA["):
+            self.handle_data(data[len("CDATA["):])
+            self._end_string()
+
+
+def iter_document_text(chunks):
+    """Yield the document text, piece by piece, from an iterable of UTF-8 byte chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    scanner = DocumentTextScanner()
+    for chunk in chunks:
+        scanner.feed(decoder.decode(chunk))
+        text = scanner.take()
+        if text:
+            yield text
+    scanner.feed(decoder.decode(b"", final=True))
+    scanner.close()
+    text = scanner.take()
+    if text:
+        yield text
+
+
+def _may_start_page_marker(tail):
+    """
+    True if tail is a [[Page N]] marker, or could still grow into one with more input.
+    """
+    head = _PAGE_MARKER_HEAD
+    if len(tail) <= len(head):
+        return head.startswith(tail)
+    if not tail.startswith(head):
+        return False
+    rest = tail[len(head):].lstrip("0123456789")
+    digits = len(tail) - len(head) - len(rest)
+    if not digits:
+        return not rest
+    return len(rest) <= 2 and "]]".startswith(rest)
+
+
+def settle_summary(remainder, final=False):
+    """
+    Apply the summary clean-up to the text after "SUMMARY:". Returns the summary, or None
+    when more input could still change it (only when final is False).
+    """
+    text = _PAGE_MARKER.sub(' ', remainder)
+    blank = _BLANK_LINE.search(text)
+    if blank is None:
+        return None if not final else _WHITESPACE.sub(' ', text).strip()
+    if not final:
+        # The blank line only ends the summary if it is not absorbed by a page marker
+        # after it.
+        after = _WHITESPACE.match(text, blank.start()).end()
+        if after == len(text) or _may_start_page_marker(text[after:]):
+            return None
+    return _WHITESPACE.sub(' ', text[:blank.start()]).strip()
+
+
+class SummaryTracker:
+    """
+    Incrementally locates "SUMMARY:" in the document text and settles the summary.
+    feed() returns True once the summary is settled; finish() settles it at end of input.
+    summary is None until then, and stays None when the document has no "SUMMARY:".
+    """
+
+    def __init__(self):
+        self.summary = None
+        self.settled = False
+        self._before = ""
+        self._remainder = None
+        self._resume_at = 0
+
+    def feed(self, text):
+        if self.settled:
+            return True
+        if self._remainder is None:
+            self._before += text
+            start = self._before.find(SUMMARY_MARKER)
+            if start == -1:
+                self._before = self._before[-(len(SUMMARY_MARKER) - 1):]
+                return False
+            self._remainder = self._before[start + len(SUMMARY_MARKER):]
+            self._before = ""
+        else:
+            self._remainder += text
+        # Page markers never create blank lines, so only settle once the raw text has one.
+        if _BLANK_LINE.search(self._remainder, self._resume_at):
+            summary = settle_summary(self._remainder)
+            if summary is not None:
+                self.summary, self.settled, self._remainder = summary, True, None
+        else:
+            self._resume_at = len(self._remainder.rstrip())
+        return self.settled
+
+    def finish(self):
+        if not self.settled and self._remainder is not None:
+            self.summary = settle_summary(self._remainder, final=True)
+        self.settled = True
+        return self.summary
+
+
+def extract_summary(chunks):
+    """
+    Return the cleaned SUMMARY paragraph of an HTM document given as UTF-8 byte chunks,
+    or None when it has no "SUMMARY:". Stops consuming chunks once the summary is settled.
+    """
+    tracker = SummaryTracker()
+    for text in iter_document_text(chunks):
+        if tracker.feed(text):
+            return tracker.summary
+    return tracker.finish()
+
+
+def scan_document(chunks):
+    """
+    Extract the summary and the structured preamble (see preamble.parse_preamble) in one
+    pass over an HTM document given as UTF-8 byte chunks. Reading stops once the summary
+    is settled and "SUPPLEMENTARY INFORMATION:" has been reached. Returns (summary,
+    preamble).
+    """
+    tracker = SummaryTracker()
+    preamble_text = ""
+    preamble_done = False
+    for text in iter_document_text(chunks):
+        if not preamble_done:
+            # Search the new text plus enough of the old to catch a label split across
+            # pieces.
+            search_from = max(0, len(preamble_text) - len(PREAMBLE_END))
+            preamble_text += text
+            end = preamble_text.find(PREAMBLE_END, search_from)
+            if end != -1:
+                preamble_text, preamble_done = preamble_text[:end], True
+            elif len(preamble_text) > PREAMBLE_MAX_CHARS:
+                # No SUPPLEMENTARY INFORMATION heading this far in; keep what the preamble
+                # could be.
+                preamble_text, preamble_done = preamble_text[:PREAMBLE_MAX_CHARS], True
+        if tracker.feed(text) and preamble_done:
+            break
+    else:
+        tracker.finish()
+    return tracker.summary, parse_preamble(preamble_text)
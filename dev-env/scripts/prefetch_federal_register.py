@@ -0,0 +1,62 @@
+"""Fill the Federal Register response cache for a publication-date range.
+
+Usage (from dev-env, with AWS credentials for the cache bucket):
+    python scripts/prefetch_federal_register.py --from 2024-01-01 --to 2024-03-31 \
+        --bucket orchestrator-bucket-<account>-<region> [--window-days 7] [--refresh]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+_DEV_ENV = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _path in (_DEV_ENV, os.path.join(_DEV_ENV, "shared_layer", "python")):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--from",
+        dest="published_from",
+        required=True,
+        help="first publication date (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--to",
+        dest="published_to",
+        required=True,
+        help="last publication date (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--bucket",
+        default=os.environ.get("FEDERAL_REGISTER_CACHE_BUCKET"),
+        help="cache bucket (default: $FEDERAL_REGISTER_CACHE_BUCKET)",
+    )
+    parser.add_argument(
+        "--window-days", type=int, default=7, help="days per search request"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="re-fetch documents that are already cached",
+    )
+    args = parser.parse_args(argv)
+    if not args.bucket:
+        parser.error("--bucket or FEDERAL_REGISTER_CACHE_BUCKET is required")
+
+    from lambda_functions.sql_federal_document_ingest import federal_register_cache
+    from lambda_functions.sql_federal_document_ingest.prefetch import prefetch_range
+
+    federal_register_cache.CACHE_BUCKET = args.bucket
+    summary = prefetch_range(
+        args.published_from, args.published_to, args.window_days, args.refresh
+    )
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Per-container registry of boto3 clients shared by every handler.
+
+Clients are built lazily on first use and then reused for the life of the
+container, so warm invocations skip client construction, endpoint resolution
+and TLS handshakes.
+"""
+
+import os
+import threading
+
+# Synchronous child invocations can outlive botocore's default 60s read timeout.
+_SERVICE_READ_TIMEOUTS = {
+    "lambda": 900,
+}
+
+# Endpoint used for Lambda when running under `sam local` (AWS_SAM_LOCAL=true).
+SAM_LOCAL_LAMBDA_ENDPOINT = "http://host.docker.internal:3001"
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _client_config(service_name):
+    # boto3/botocore are only imported once a client is actually needed.
+    from botocore.config import Config
+
+    # Tuned once for every client: a connection pool large enough for the thread
+    # pools in the orchestrator and fan-out code, TCP keep-alive so pooled
+    # connections survive between warm invocations, and standard-mode retries.
+    config = Config(
+        max_pool_connections=int(os.environ.get("AWS_CLIENT_MAX_POOL_CONNECTIONS", "32")),
+        tcp_keepalive=True,
+        connect_timeout=5,
+        retries={
+            "mode": os.environ.get("AWS_CLIENT_RETRY_MODE", "standard"),
+            "max_attempts": int(os.environ.get("AWS_CLIENT_MAX_ATTEMPTS", "5")),
+        },
+    )
+    if service_name in _SERVICE_READ_TIMEOUTS:
+        config = config.merge(Config(read_timeout=_SERVICE_READ_TIMEOUTS[service_name]))
+    return config
+
+
+def _client_kwargs(service_name):
+    kwargs = {"config": _client_config(service_name)}
+    # AWS_SAM_LOCAL is set to "true" when running locally via SAM CLI.
+    if service_name == "lambda" and os.getenv("AWS_SAM_LOCAL", "false").lower() == "true":
+        kwargs["endpoint_url"] = SAM_LOCAL_LAMBDA_ENDPOINT
+    return kwargs
+
+
+def get_client(service_name):
+    """
+    Return the cached client for service_name ("s3", "lambda", "secretsmanager", ...),
+    creating it on first use.
+    """
+    client = _clients.get(service_name)
+    if client is None:
+        # boto3's default session is not thread safe, so creation is serialized.
+        with _lock:
+            client = _clients.get(service_name)
+            if client is None:
+                import boto3
+
+                client = boto3.client(service_name, **_client_kwargs(service_name))
+                _clients[service_name] = client
+    return client
+
+
+def clear_clients():
+    """Drop every cached client (used by tests and after credential changes)."""
+    with _lock:
+        _clients.clear()
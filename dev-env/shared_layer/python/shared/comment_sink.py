@@ -0,0 +1,97 @@
+"""Ingest a comment into its stores from a single read.
+
+Each comment used to be ingested by two functions, one per store, and each
+of them downloaded and decoded the same comment JSON. handle_comment_event
+reads the comment once, as a JsonPayload, and hands it to every sink at the
+same time, so the combined comment ingest function costs one invocation and
+one S3 GET per comment. The single-store functions call it with one sink.
+"""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from shared.payload import JsonPayload
+
+logger = logging.getLogger(__name__)
+
+
+def read_comment(s3, bucket, file_key):
+    """
+    Download and decode the comment JSON once. Raises ValueError when the object is empty.
+    """
+    payload = JsonPayload.from_bytes(
+        s3.get_object(Bucket=bucket, Key=file_key)["Body"].read()
+    )
+    if not payload:
+        raise ValueError("File content is empty")
+    return payload
+
+
+def _run_sink(name, ingest, payload):
+    try:
+        print(f"ingesting into {name}")
+        ingest(payload)
+        print(f"{name} ingest complete!")
+    except Exception as e:
+        logger.exception("Comment ingest into %s failed", name)
+        return {"statusCode": 500, "error": str(e)}
+    return {"statusCode": 200}
+
+
+def write_sinks(payload, sinks):
+    """
+    Call every sink (name -> ingest callable) with the same payload, concurrently when
+    there are several. Returns {name: {"statusCode"[, "error"]}}; one failing sink never
+    hides another.
+    """
+    if len(sinks) == 1:
+        (name, ingest), = sinks.items()
+        return {name: _run_sink(name, ingest, payload)}
+    with ThreadPoolExecutor(max_workers=len(sinks)) as pool:
+        futures = {
+            name: pool.submit(_run_sink, name, ingest, payload)
+            for name, ingest in sinks.items()
+        }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def handle_comment_event(event, sinks, get_client, function_name="CommentIngest"):
+    """
+    The comment ingest handler body: read the {"bucket", "file_key"} comment once and
+    write it to every sink. Responds 200 when every sink succeeded, else 500 with the
+    failing sinks in "error"; the body always carries the per-sink results under "sinks".
+    """
+    print(f"Received event: {json.dumps(event)}")
+    try:
+        s3dict = event
+        print("Data: ", s3dict)
+        payload = read_comment(get_client('s3'), s3dict['bucket'], s3dict['file_key'])
+        if 'comments' not in s3dict['file_key']:
+            return {
+                'statusCode': 200,
+                'body': json.dumps({'message': 'Data processed successfully'})
+            }
+        results = write_sinks(payload, sinks)
+    except Exception as e:
+        logger.exception("%s failed", function_name)
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
+
+    failed = {
+        name: result['error'] for name, result in results.items() if 'error' in result
+    }
+    if failed:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'error': "; ".join(f"{name}: {error}" for name, error in failed.items()),
+                'sinks': results,
+            })
+        }
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'message': 'Data processed successfully', 'sinks': results})
+    }
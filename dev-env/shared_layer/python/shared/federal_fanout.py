@@ -0,0 +1,157 @@
+"""Fan Federal Register document numbers out to SQLFederalDocumentIngestFunction.
+
+The docket and document ingest functions used to send one async invocation
+per frdocnum. The numbers are now sent in batches of
+FEDERAL_INGEST_BATCH_SIZE as {"frdocnums": [...]}, and the federal function
+fetches each batch with a single multi-document API request. When a claim
+table is configured, only the numbers no other payload has already queued
+are sent (see frdocnum_claims). The batches are invoked concurrently on a
+bounded thread pool, and an invoke that is throttled is retried with
+jittered backoff, so a payload citing many numbers no longer pays one
+invoke round trip per batch in sequence.
+"""
+
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List
+
+from shared import frdocnum_claims
+
+logger = logging.getLogger(__name__)
+
+FEDERAL_INGEST_BATCH_SIZE = int(os.environ.get("FEDERAL_INGEST_BATCH_SIZE", "20"))
+FANOUT_MAX_WORKERS = int(os.environ.get("FEDERAL_FANOUT_MAX_WORKERS", "8"))
+# Attempts per invoke on throttling errors, on top of botocore's own retries.
+FANOUT_INVOKE_ATTEMPTS = int(os.environ.get("FEDERAL_FANOUT_INVOKE_ATTEMPTS", "4"))
+FANOUT_BACKOFF_SECONDS = 0.2
+
+_THROTTLING_CODES = frozenset(
+    {"TooManyRequestsException", "ThrottlingException", "Throttling"}
+)
+
+
+def batched(
+    nums: Iterable[str], size: int = FEDERAL_INGEST_BATCH_SIZE
+) -> Iterator[List[str]]:
+    """Yield the sorted, de-duplicated numbers in lists of at most size."""
+    ordered = sorted(set(nums))
+    size = max(1, size)
+    for start in range(0, len(ordered), size):
+        yield ordered[start:start + size]
+
+
+def _is_throttled(error):
+    return (
+        getattr(error, "response", {}).get("Error", {}).get("Code") in _THROTTLING_CODES
+    )
+
+
+def _invoke_batch(lambda_client, function_name, batch, refresh, sleep=time.sleep):
+    """
+    Queue one batch, retrying throttling errors. Returns None on success, else the error
+    text.
+    """
+    message = {"frdocnums": batch, "refresh": True} if refresh else {"frdocnums": batch}
+    payload = json.dumps(message).encode("utf-8")
+    for attempt in range(max(1, FANOUT_INVOKE_ATTEMPTS)):
+        try:
+            lambda_client.invoke(
+                FunctionName=function_name, InvocationType="Event", Payload=payload
+            )
+        except Exception as e:
+            if _is_throttled(e) and attempt < FANOUT_INVOKE_ATTEMPTS - 1:
+                sleep(random.uniform(0, FANOUT_BACKOFF_SECONDS * 2 ** attempt))
+                continue
+            logger.exception(
+                "Federal register fan-out failed for %d frdocnums", len(batch)
+            )
+            return str(e)
+        print(
+            f"Queued federal register ingest for {len(batch)} frdocnums: "
+            f"{batch[0]!r}..{batch[-1]!r}"
+        )
+        return None
+
+
+def queue_federal_ingest(
+    lambda_client,
+    function_name: str,
+    nums: Iterable[str],
+    batch_size: int = FEDERAL_INGEST_BATCH_SIZE,
+    refresh: bool = False,
+    max_workers: int = FANOUT_MAX_WORKERS,
+) -> Dict[str, List[str]]:
+    """
+    Invoke function_name asynchronously once per batch of nums, up to max_workers at a
+    time. With refresh, the federal function re-fetches from the API rather than its
+    response cache. Returns {"queued": [...], "failed": [...]} (sorted numbers).
+    """
+    batches = list(batched(nums, batch_size))
+    if len(batches) <= 1:
+        errors = [
+            _invoke_batch(lambda_client, function_name, batch, refresh)
+            for batch in batches
+        ]
+    else:
+        # boto3 clients are thread safe, so the workers share the one Lambda client.
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(batches)))
+        ) as pool:
+            errors = list(
+                pool.map(
+                    lambda batch: _invoke_batch(
+                        lambda_client, function_name, batch, refresh
+                    ),
+                    batches,
+                )
+            )
+    queued, failed = [], []
+    for batch, error in zip(batches, errors):
+        (failed if error else queued).extend(batch)
+    return {"queued": queued, "failed": failed}
+
+
+def fan_out_frdocnums(
+    nums: Iterable[str], get_client, refresh: bool = False
+) -> Dict[str, List[str]]:
+    """
+    Queue federal ingests for the frdocnums cited by a docket or document payload,
+    skipping numbers another payload has already claimed unless refresh (or
+    FEDERAL_INGEST_FORCE_REFRESH) is set. get_client is the caller's client factory.
+    Returns {"queued": [...], "failed": [...], "skipped": [...]} (sorted numbers).
+    """
+    nums = set(nums)
+    summary = {"queued": [], "failed": [], "skipped": []}
+    if not nums:
+        return summary
+    fn = os.environ.get("SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION")
+    if not fn:
+        print(
+            "SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION not set; "
+            "skipping federal register fan-out"
+        )
+        summary["skipped"] = sorted(nums)
+        return summary
+    force = refresh or frdocnum_claims.FORCE_REFRESH
+    table = frdocnum_claims.CLAIM_TABLE
+    if table:
+        dynamodb = get_client("dynamodb")
+        claimed = frdocnum_claims.claim_new(dynamodb, table, nums, force=force)
+        summary["skipped"] = sorted(nums.difference(claimed))
+        if summary["skipped"]:
+            print(
+                f"Skipping {len(summary['skipped'])} frdocnums "
+                "already queued by other payloads"
+            )
+        nums = claimed
+    if not nums:
+        return summary
+    summary.update(queue_federal_ingest(get_client("lambda"), fn, nums, refresh=force))
+    if table and summary["failed"]:
+        # Let the next payload that cites these numbers queue them instead.
+        frdocnum_claims.release(dynamodb, table, summary["failed"])
+    return summary
@@ -0,0 +1,100 @@
+"""Collect Federal Register document numbers from docket and document payloads.
+
+Two modes:
+  collect_frdocnums(obj)  walks an already parsed JSON tree with an explicit
+                          stack, so arbitrarily deep payloads cannot hit the
+                          recursion limit.
+  scan_frdocnums(raw)     scans the raw JSON bytes for frdocnum / fdocnum
+                          members without building the object tree at all.
+
+Both match the key names case-insensitively (regulations.gov uses
+"frDocNum") and return the same set: the stripped, non-empty string or
+number values of those keys, anywhere in the payload.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Set, Union
+
+_FR_KEYS = frozenset({"frdocnum", "fdocnum"})
+
+# In valid JSON a quote that follows "{" or "," (and optional whitespace) always opens a
+# key: inside a string value the quote would have to be escaped. The scan finds the
+# literal tail 'docnum"' (a plain substring search, far faster than a regex that has no
+# literal prefix), checks that it ends a frdocnum / fdocnum key in that position, and
+# reads the value after it.
+_KEY_TAIL = b'docnum"'
+_KEY_HEADS = (b'"fr', b'"f')
+_JSON_WHITESPACE = b" \t\r\n"
+_MEMBER_VALUE = re.compile(
+    rb'\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)'
+)
+
+
+def _normalize(value: Any) -> str | None:
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def collect_frdocnums(obj: Any) -> Set[str]:
+    """
+    Return unique non-empty frdocnum / fdocnum values anywhere in a parsed JSON tree.
+    """
+    found: Set[str] = set()
+    stack = [obj]
+    # Exact type checks: json.loads only produces dict and list containers, and they are
+    # noticeably cheaper than isinstance on trees with hundreds of thousands of nodes.
+    while stack:
+        node = stack.pop()
+        if type(node) is dict:
+            for key, value in node.items():
+                if type(value) is dict or type(value) is list:
+                    stack.append(value)
+                elif isinstance(key, str) and key.lower() in _FR_KEYS:
+                    text = _normalize(value)
+                    if text:
+                        found.add(text)
+        elif type(node) is list:
+            stack.extend(node)
+    return found
+
+
+def scan_frdocnums(raw: Union[bytes, str]) -> Set[str]:
+    """
+    Return the same set as collect_frdocnums(json.loads(raw)), scanning the raw JSON
+    instead.
+    """
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    lowered = raw.lower()  # ASCII-only, so offsets are unchanged
+    found: Set[str] = set()
+    tail = lowered.find(_KEY_TAIL)
+    while tail != -1:
+        end = tail + len(_KEY_TAIL)
+        if _is_member_key(lowered, tail):
+            value = _MEMBER_VALUE.match(raw, end)
+            if value:
+                text = _normalize(json.loads(value.group(1)))
+                if text:
+                    found.add(text)
+        tail = lowered.find(_KEY_TAIL, end)
+    return found
+
+
+def _is_member_key(lowered: bytes, tail: int) -> bool:
+    """
+    True if the 'docnum"' at tail closes a "frdocnum" / "fdocnum" key that follows "{" or
+    ",".
+    """
+    for head in _KEY_HEADS:
+        quote = tail - len(head)
+        if quote >= 0 and lowered.startswith(head, quote):
+            before = quote - 1
+            while before >= 0 and lowered[before] in _JSON_WHITESPACE:
+                before -= 1
+            return before >= 0 and lowered[before] in b"{,"
+    return False
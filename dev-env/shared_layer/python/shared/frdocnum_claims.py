@@ -0,0 +1,84 @@
+"""Cross-payload de-duplication of Federal Register ingests.
+
+Hundreds of dockets and documents cite the same few Federal Register
+numbers, and each of them used to queue a fetch-and-ingest for every number
+it cites. Before fanning out, a number is now claimed with a conditional
+put in FEDERAL_INGEST_CLAIM_TABLE, keyed by frdocnum. The put only succeeds
+when the number has never been claimed or its claim has expired
+(FEDERAL_INGEST_CLAIM_TTL_SECONDS), so only the first payload to cite a
+number queues its ingest. A per-container set of the numbers already known
+to be claimed skips the round trip for repeats within a warm container, for
+at most CLAIM_LOCAL_SECONDS. The federal ingest function releases the claim
+on any number it fails to ingest, so the next payload citing it queues it
+again instead of waiting out the TTL. A forced refresh claims
+unconditionally and always queues.
+"""
+
+import os
+import time
+
+CLAIM_TABLE = os.environ.get("FEDERAL_INGEST_CLAIM_TABLE", "")
+CLAIM_TTL_SECONDS = int(
+    os.environ.get("FEDERAL_INGEST_CLAIM_TTL_SECONDS", str(7 * 24 * 3600))
+)
+# How long a container trusts a claim it has seen, so a released claim is noticed well
+# before the TTL.
+CLAIM_LOCAL_SECONDS = int(os.environ.get("FEDERAL_INGEST_CLAIM_LOCAL_SECONDS", "300"))
+# Set to "true" for a backfill that must re-ingest everything it touches.
+FORCE_REFRESH = os.environ.get("FEDERAL_INGEST_FORCE_REFRESH", "false").lower() == "true"
+
+# frdocnum -> time until which the claim is trusted without asking the table.
+_known_claims = {}
+
+
+def claim_new(dynamodb, table, nums, force=False, now=None):
+    """
+    Claim each number and return the sorted list of those this caller won, i.e. the ones
+    it should queue. With force, every number is (re)claimed and returned.
+    """
+    now = int(time.time() if now is None else now)
+    expires_at = now + CLAIM_TTL_SECONDS
+    won = []
+    for num in sorted(set(nums)):
+        if not force and _known_claims.get(num, 0) > now:
+            continue
+        request = {
+            "TableName": table,
+            "Item": {
+                "frdocnum": {"S": num},
+                "claimed_at": {"N": str(now)},
+                "expires_at": {"N": str(expires_at)},
+            },
+        }
+        if not force:
+            request.update(
+                ConditionExpression="attribute_not_exists(frdocnum) OR expires_at < :now",
+                ExpressionAttributeValues={":now": {"N": str(now)}},
+                ReturnValuesOnConditionCheckFailure="ALL_OLD",
+            )
+        try:
+            dynamodb.put_item(**request)
+        except dynamodb.exceptions.ConditionalCheckFailedException as e:
+            stored = e.response.get("Item", {}).get("expires_at", {}).get("N")
+            _known_claims[num] = min(
+                int(stored) if stored else expires_at, now + CLAIM_LOCAL_SECONDS
+            )
+            continue
+        _known_claims[num] = min(expires_at, now + CLAIM_LOCAL_SECONDS)
+        won.append(num)
+    return won
+
+
+def release(dynamodb, table, nums):
+    """
+    Drop the claims on nums (their ingest could not be queued or failed), so a later
+    payload can claim them.
+    """
+    for num in nums:
+        _known_claims.pop(num, None)
+        dynamodb.delete_item(TableName=table, Key={"frdocnum": {"S": num}})
+
+
+def clear_known_claims():
+    """Empty the per-container set (used by tests)."""
+    _known_claims.clear()
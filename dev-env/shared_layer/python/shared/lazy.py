@@ -0,0 +1,29 @@
+"""Deferred imports for modules that are expensive to load at cold start."""
+
+import importlib
+import threading
+
+
+def lazy_callable(module_name, attr_name):
+    """
+    Return a stand-in for module_name.attr_name that imports the module on first call.
+
+    Handlers bind the stand-in at module level (so tests can still patch it by name)
+    while the heavy dependency is only loaded once a request actually needs it.
+    """
+    resolved = []
+    lock = threading.Lock()
+
+    def call(*args, **kwargs):
+        if not resolved:
+            with lock:
+                if not resolved:
+                    resolved.append(
+                        getattr(importlib.import_module(module_name), attr_name)
+                    )
+        return resolved[0](*args, **kwargs)
+
+    call.__name__ = attr_name
+    call.__qualname__ = attr_name
+    call.__doc__ = f"Lazily imported {module_name}.{attr_name}."
+    return call
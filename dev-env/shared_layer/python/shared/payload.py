@@ -0,0 +1,57 @@
+"""Parse-once JSON payloads.
+
+A handler used to decode an S3 object, parse it, re-serialize it for the
+common ingest functions, which parsed it again, and parse it once more for
+the Federal Register fan-out. JsonPayload is the decoded JSON text itself
+(a str subclass), so every ingest entry point that takes a JSON string
+accepts it unchanged, and it carries the parsed document, built on first
+use and then shared by every step that needs it. Ingest code that checks
+for the data attribute can skip its own json.loads.
+"""
+
+import json
+
+_UNPARSED = object()
+
+
+class JsonPayload(str):
+    """
+    JSON text with its parsed value cached. Treat data as read-only; use from_data for an
+    edited copy.
+    """
+
+    def __new__(cls, text, data=_UNPARSED):
+        payload = super().__new__(cls, text)
+        payload._data = data
+        return payload
+
+    @classmethod
+    def from_bytes(cls, body):
+        """Decode an object body (UTF-8) once."""
+        return cls(body.decode("utf-8"))
+
+    @classmethod
+    def from_data(cls, data):
+        """Serialize data once, keeping data as the parsed value."""
+        return cls(json.dumps(data), data)
+
+    @property
+    def data(self):
+        if self._data is _UNPARSED:
+            self._data = json.loads(self)
+        return self._data
+
+    @property
+    def parsed(self):
+        """True once the text has been parsed (or the payload was built from data)."""
+        return self._data is not _UNPARSED
+
+
+def parsed_json(payload):
+    """
+    The parsed value of payload: the cached one for a JsonPayload, else
+    json.loads(payload).
+    """
+    if isinstance(payload, JsonPayload):
+        return payload.data
+    return json.loads(payload)
@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from lambda_functions.comment_ingest import app as comment_app
+from lambda_functions.open_search import app as opensearch_app
+from lambda_functions.sql_comment_ingest import app as sql_comment_app
+from shared.payload import JsonPayload
+
+KEY = "raw-data/A/A-1/text-A-1/comments/A-1-0001.json"
+COMMENT = {"data": {"id": "A-1-0001", "attributes": {"comment": "Please reconsider."}}}
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="test-bucket")
+        client.put_object(Bucket="test-bucket", Key=KEY, Body=json.dumps(COMMENT))
+        yield client
+
+
+def _spy_s3(s3, app):
+    spy = MagicMock(wraps=s3)
+    return patch.object(app, "get_client", side_effect={"s3": spy}.get), spy
+
+
+def test_one_read_feeds_both_sinks(s3):
+    get_client, spy = _spy_s3(s3, comment_app)
+    with get_client, patch.object(comment_app, "ingest_comment_sql") as sql, \
+            patch.object(comment_app, "ingest_comment_opensearch") as opensearch:
+        response = comment_app.handler({"bucket": "test-bucket", "file_key": KEY}, None)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["sinks"] == {
+        "sql": {"statusCode": 200},
+        "opensearch": {"statusCode": 200},
+    }
+    spy.get_object.assert_called_once_with(Bucket="test-bucket", Key=KEY)
+    payload = sql.call_args.args[0]
+    assert isinstance(payload, JsonPayload) and json.loads(payload) == COMMENT
+    assert opensearch.call_args.args[0] is payload
+
+
+def test_sinks_are_written_concurrently(s3):
+    both_started = threading.Barrier(2, timeout=5)
+    get_client, _ = _spy_s3(s3, comment_app)
+    # Each sink waits for the other; writing them one after the other would time out here.
+    with get_client, \
+            patch.object(comment_app, "ingest_comment_sql",
+                         side_effect=lambda p: both_started.wait()), \
+            patch.object(comment_app, "ingest_comment_opensearch",
+                         side_effect=lambda p: both_started.wait()):
+        response = comment_app.handler({"bucket": "test-bucket", "file_key": KEY}, None)
+    assert response["statusCode"] == 200
+
+
+def test_a_failing_sink_is_reported_without_hiding_the_other(s3):
+    get_client, _ = _spy_s3(s3, comment_app)
+    with get_client, \
+            patch.object(comment_app, "ingest_comment_sql") as sql, \
+            patch.object(comment_app, "ingest_comment_opensearch",
+                         side_effect=RuntimeError("opensearch down")):
+        response = comment_app.handler({"bucket": "test-bucket", "file_key": KEY}, None)
+
+    assert response["statusCode"] == 500
+    body = json.loads(response["body"])
+    assert body["error"] == "opensearch: opensearch down"
+    assert body["sinks"] == {
+        "sql": {"statusCode": 200},
+        "opensearch": {"statusCode": 500, "error": "opensearch down"},
+    }
+    sql.assert_called_once()
+
+
+def test_empty_comment_fails_before_any_sink(s3):
+    s3.put_object(Bucket="test-bucket", Key=KEY, Body=b"")
+    get_client, _ = _spy_s3(s3, comment_app)
+    with get_client, patch.object(comment_app, "ingest_comment_sql") as sql:
+        response = comment_app.handler({"bucket": "test-bucket", "file_key": KEY}, None)
+    assert response["statusCode"] == 500
+    assert json.loads(response["body"]) == {"error": "File content is empty"}
+    sql.assert_not_called()
+
+
+@pytest.mark.parametrize("app, sink, ingest_name", [
+    (opensearch_app, "opensearch", "ingest_comment_opensearch"),
+    (sql_comment_app, "sql", "ingest_comment_sql"),
+])
+def test_single_store_functions_remain_as_wrappers(s3, app, sink, ingest_name):
+    get_client, _ = _spy_s3(s3, app)
+    with get_client, patch.object(app, ingest_name) as ingest:
+        response = app.handler({"bucket": "test-bucket", "file_key": KEY}, None)
+    assert response["statusCode"] == 200
+    body = json.loads(response["body"])
+    assert body["message"] == "Data processed successfully"
+    assert body["sinks"] == {sink: {"statusCode": 200}}
+    assert json.loads(ingest.call_args.args[0]) == COMMENT
+
+    with get_client, patch.object(app, ingest_name, side_effect=RuntimeError("db down")):
+        response = app.handler({"bucket": "test-bucket", "file_key": KEY}, None)
+    assert response["statusCode"] == 500
+    assert json.loads(response["body"])["error"] == f"{sink}: db down"
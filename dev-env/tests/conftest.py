@@ -0,0 +1,14 @@
+import pytest
+
+from shared.aws_clients import clear_clients
+
+
+@pytest.fixture(autouse=True)
+def _fresh_aws_clients():
+    """
+    Each test builds its own clients, so mocks and moto state never leak through the
+    client cache.
+    """
+    clear_clients()
+    yield
+    clear_clients()
@@ -116,3 +116,123 @@ def test_handler_summary_with_extra_whitespace(mock_s3_setup):
     assert response_body["data"]["summary_text"] == "This is a summary with extra whitespace."
     assert response_body["data"]["docket_id"] == "docket-24680"
 
+
+def test_handler_rejects_non_htm_before_download():
+    """Non-HTM keys are rejected without touching S3"""
+    from unittest.mock import patch
+
+    event = {
+        "bucket": "test-bucket",
+        "file_key": "raw-data/folder/docket-12345/test-file.json",
+    }
+    with patch("lambda_functions.sql_htm_summary.app.get_client") as mock_get_client:
+        response = handler(event, None)
+
+    mock_get_client.assert_not_called()
+    assert response["statusCode"] == 500
+    assert "not an HTM or HTML file" in json.loads(response["body"])["error"]
+
+
+def test_handler_passes_preamble_to_ingestion(mock_s3_setup):
+    """The summary and the structured preamble come from the same scan"""
+    s3, bucket_name = mock_s3_setup
+    file_key = "raw-data/folder/docket-11223/test-file.htm"
+    file_content = """<html><body><pre>
+    [Federal Register Volume 88, Number 12 (Thursday, January 19, 2023)]
+    [Pages 3355-3357]
+
+    7 CFR Part 319
+
+    AGENCY: Animal and Plant Health Inspection Service, USDA.
+
+    ACTION: Proposed rule.
+
+    SUMMARY: This is the summary.
+
+    DATES: Comments are due March 20, 2023.
+
+    SUPPLEMENTARY INFORMATION:
+
+    Background text.
+    </pre></body></html>"""
+    upload_file(s3, bucket_name, file_key, file_content)
+
+    response = handler({"bucket": bucket_name, "file_key": file_key}, None)
+    data = json.loads(response["body"])["data"]
+
+    assert response["statusCode"] == 200
+    assert data["summary_text"] == "This is the summary."
+    assert (
+        data["preamble"]["agency"] == "Animal and Plant Health Inspection Service, USDA."
+    )
+    assert data["preamble"]["dates"] == "Comments are due March 20, 2023."
+    assert data["preamble"]["page_start"] == 3355
+    assert data["preamble"]["cfr_parts"][0]["parts"] == ["319"]
+    assert "Background" not in json.dumps(data["preamble"])
+
+
+def test_handler_does_not_ingest_missing_summary(mock_s3_setup):
+    """
+    A file without SUMMARY: must not overwrite a summary from another file of the docket
+    """
+    from unittest.mock import patch
+
+    s3, bucket_name = mock_s3_setup
+    file_key = "raw-data/folder/docket-67890/test-file.htm"
+    upload_file(s3, bucket_name, file_key, "<pre>DATES: This is the dates section.</pre>")
+
+    with patch("lambda_functions.sql_htm_summary.app.ingest_summary") as ingest:
+        response = handler({"bucket": bucket_name, "file_key": file_key}, None)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["ingested"] is False
+    ingest.assert_not_called()
+
+
+def test_handler_skips_ingest_when_a_better_candidate_is_stored(
+    mock_s3_setup, monkeypatch
+):
+    """With a candidate table, only summaries that beat the docket's best are ingested"""
+    from unittest.mock import patch
+
+    s3, bucket_name = mock_s3_setup
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    dynamodb = boto3.client("dynamodb", region_name="us-east-1")
+    dynamodb.create_table(
+        TableName="summary-candidates",
+        BillingMode="PAY_PER_REQUEST",
+        AttributeDefinitions=[{"AttributeName": "docket_id", "AttributeType": "S"}],
+        KeySchema=[{"AttributeName": "docket_id", "KeyType": "HASH"}],
+    )
+    monkeypatch.setattr(
+        "lambda_functions.sql_htm_summary.app.CANDIDATE_TABLE", "summary-candidates"
+    )
+    long_summary = (
+        "SUMMARY: This proposed rule would amend the importation requirements for citrus."
+        "\n\nDATES: x"
+    )
+    upload_file(
+        s3,
+        bucket_name,
+        "raw-data/folder/docket-1/documents/docket-1-0001_content.htm",
+        long_summary,
+    )
+    upload_file(
+        s3,
+        bucket_name,
+        "raw-data/folder/docket-1/documents/docket-1-0002_content.htm",
+        "SUMMARY: Closed.\n\nDATES: x",
+    )
+
+    with patch("lambda_functions.sql_htm_summary.app.ingest_summary") as ingest:
+        for name in ("docket-1-0001_content.htm", "docket-1-0002_content.htm"):
+            handler(
+                {
+                    "bucket": bucket_name,
+                    "file_key": f"raw-data/folder/docket-1/documents/{name}",
+                },
+                None,
+            )
+
+    ingest.assert_called_once()
+    assert ingest.call_args.args[0]["summary_text"].startswith("This proposed rule")
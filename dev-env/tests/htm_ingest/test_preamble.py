@@ -0,0 +1,90 @@
+from lambda_functions.sql_htm_summary.preamble import parse_preamble
+
+PREAMBLE = """
+[Federal Register Volume 88, Number 12 (Thursday, January 19, 2023)]
+[Proposed Rules]
+[Pages 3355-3357]
+From the Federal Register Online via the Government Publishing Office [www.gpo.gov]
+[FR Doc No: 2023-00917]
+
+-----------------------------------------------------------------------
+
+DEPARTMENT OF AGRICULTURE
+
+Animal and Plant Health Inspection Service
+
+7 CFR Parts 319 and 352
+
+[Docket No. APHIS-2022-0055]
+RIN 0579-AE71
+
+Importation of Fresh Citrus From Chile Into the Continental United States
+
+AGENCY: Animal and Plant Health Inspection Service, USDA.
+
+ACTION: Proposed rule.
+
+-----------------------------------------------------------------------
+
+SUMMARY: We are proposing to amend the regulations.
+
+DATES: We will consider all comments that we receive on or before March
+20, 2023.
+
+ADDRESSES: You may submit comments by either of the following methods:
+
+     Federal eRulemaking Portal: Go to www.regulations.gov.
+
+[[Page 3356]]
+
+     Postal Mail/Commercial Delivery: Send your comment to Docket No.
+APHIS-2022-0055.
+
+FOR FURTHER INFORMATION CONTACT: Ms. Claudia Ferguson, Senior Regulatory
+Policy Specialist, (301) 851-2352.
+
+"""
+
+
+def test_parse_preamble_fields():
+    preamble = parse_preamble(PREAMBLE)
+
+    assert preamble == {
+        "volume": 88,
+        "number": 12,
+        "publication_date": "Thursday, January 19, 2023",
+        "document_type": "Proposed Rules",
+        "page_start": 3355,
+        "page_end": 3357,
+        "cfr_parts": [
+            {"heading": "7 CFR Parts 319 and 352", "title": 7, "parts": ["319", "352"]}
+        ],
+        "docket_numbers": ["APHIS-2022-0055"],
+        "rin": "0579-AE71",
+        "agency": "Animal and Plant Health Inspection Service, USDA.",
+        "action": "Proposed rule.",
+        "dates": (
+            "We will consider all comments that we receive on or before March 20, 2023."
+        ),
+        "addresses": (
+            "You may submit comments by either of the following methods: "
+            "Federal eRulemaking Portal: Go to www.regulations.gov. "
+            "Postal Mail/Commercial Delivery: Send your comment to Docket No. "
+            "APHIS-2022-0055."
+        ),
+        "further_information_contact": (
+            "Ms. Claudia Ferguson, Senior Regulatory Policy Specialist, (301) 851-2352."
+        ),
+    }
+
+
+def test_parse_preamble_single_page_and_missing_fields():
+    preamble = parse_preamble(
+        "[Page 120]\n\nAGENCY: Environmental Protection Agency (EPA).\n"
+    )
+
+    assert preamble == {
+        "page_start": 120,
+        "page_end": 120,
+        "agency": "Environmental Protection Agency (EPA).",
+    }
@@ -0,0 +1,169 @@
+import itertools
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from lambda_functions.sql_htm_summary.summary_candidates import (
+    current_best,
+    ingest_if_best,
+    offer_candidate,
+    score_candidate,
+)
+
+TABLE = "summary-candidates"
+LONG = (
+    "We are proposing to amend the regulations governing the importation of fresh citrus."
+)
+
+
+@pytest.fixture
+def dynamodb():
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("dynamodb", region_name="us-east-1")
+        client.create_table(
+            TableName=TABLE,
+            BillingMode="PAY_PER_REQUEST",
+            AttributeDefinitions=[{"AttributeName": "docket_id", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "docket_id", "KeyType": "HASH"}],
+        )
+        yield client
+
+
+def key(sequence):
+    return (
+        "raw-data/APHIS/APHIS-2022-0055/text-APHIS-2022-0055/documents/"
+        f"APHIS-2022-0055-{sequence}_content.htm"
+    )
+
+
+def test_score_ranks_meaningful_then_earliest_publication_then_length():
+    published = lambda date: {"publication_date": date}
+
+    closed = score_candidate(key("0001"), "Closed.", published("Monday, January 2, 2023"))
+    later = score_candidate(key("0001"), LONG, published("Friday, June 2, 2023"))
+    earlier = score_candidate(key("0007"), LONG, published("Monday, January 2, 2023"))
+    lower_sequence = score_candidate(
+        key("0003"), LONG, published("Monday, January 2, 2023")
+    )
+    longer = score_candidate(
+        key("0003"), LONG + " More.", published("Monday, January 2, 2023")
+    )
+    empty = score_candidate(key("0001"), "", published("Monday, January 2, 2023"))
+
+    assert empty < closed < later < earlier < lower_sequence < longer
+
+
+def candidates():
+    return [
+        (key("0004"), {"docket_id": "APHIS-2022-0055", "summary_text": "Closed."}),
+        (key("0002"), {"docket_id": "APHIS-2022-0055", "summary_text": LONG}),
+        (
+            key("0009"),
+            {"docket_id": "APHIS-2022-0055", "summary_text": LONG + " Final rule."},
+        ),
+    ]
+
+
+@pytest.mark.parametrize("order", list(itertools.permutations(range(3))))
+def test_best_candidate_wins_in_any_arrival_order(dynamodb, order):
+    ingested = []
+    for index in order:
+        file_key, data = candidates()[index]
+        score = score_candidate(file_key, data["summary_text"])
+        ingest_if_best(dynamodb, TABLE, "APHIS-2022-0055", score, data, ingested.append)
+
+    # Only candidates that beat everything seen before them are written
+    scores = [
+        score_candidate(file_key, data["summary_text"]) for file_key, data in candidates()
+    ]
+    improvements = [
+        i for n, i in enumerate(order) if all(scores[i] > scores[j] for j in order[:n])
+    ]
+    assert ingested == [candidates()[i][1] for i in improvements]
+    assert ingested[-1]["summary_text"] == LONG
+    assert current_best(dynamodb, TABLE, "APHIS-2022-0055")[1]["summary_text"] == LONG
+
+
+def test_equal_candidate_is_not_rewritten(dynamodb):
+    file_key, data = candidates()[1]
+    score = score_candidate(file_key, data["summary_text"])
+
+    assert offer_candidate(dynamodb, TABLE, "APHIS-2022-0055", score, data)
+    assert not offer_candidate(dynamodb, TABLE, "APHIS-2022-0055", score, data)
+
+
+def test_ingest_converges_when_a_better_candidate_lands_mid_ingest(dynamodb):
+    worse_key, worse = candidates()[0]
+    better_key, better = candidates()[1]
+    ingested = []
+
+    def ingest(data):
+        ingested.append(data["summary_text"])
+        if len(ingested) == 1:
+            # Another invocation stores (and ingests) a better candidate while this one
+            # writes
+            offer_candidate(
+                dynamodb,
+                TABLE,
+                "APHIS-2022-0055",
+                score_candidate(better_key, LONG),
+                better,
+            )
+
+    ingest_if_best(
+        dynamodb,
+        TABLE,
+        "APHIS-2022-0055",
+        score_candidate(worse_key, "Closed."),
+        worse,
+        ingest,
+    )
+
+    assert ingested == ["Closed.", LONG]
+
+
+def test_failed_ingest_is_withdrawn_so_a_retry_is_ingested(dynamodb):
+    file_key, data = candidates()[1]
+    score = score_candidate(file_key, data["summary_text"])
+
+    def failing(data):
+        raise RuntimeError("database unavailable")
+
+    with pytest.raises(RuntimeError):
+        ingest_if_best(dynamodb, TABLE, "APHIS-2022-0055", score, data, failing)
+    assert current_best(dynamodb, TABLE, "APHIS-2022-0055") is None
+
+    ingested = []
+    assert ingest_if_best(
+        dynamodb, TABLE, "APHIS-2022-0055", score, data, ingested.append
+    )
+    assert ingested == [data]
+
+
+def test_failed_ingest_restores_the_previous_best(dynamodb):
+    worse_key, worse = candidates()[0]
+    better_key, better = candidates()[1]
+    worse_score = score_candidate(worse_key, worse["summary_text"])
+    ingest_if_best(
+        dynamodb, TABLE, "APHIS-2022-0055", worse_score, worse, lambda data: None
+    )
+
+    def failing(data):
+        raise RuntimeError("database unavailable")
+
+    with pytest.raises(RuntimeError):
+        ingest_if_best(
+            dynamodb,
+            TABLE,
+            "APHIS-2022-0055",
+            score_candidate(better_key, LONG),
+            better,
+            failing,
+        )
+
+    assert current_best(dynamodb, TABLE, "APHIS-2022-0055") == (worse_score, worse)
@@ -0,0 +1,165 @@
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from lambda_functions.sql_htm_summary.summary_scanner import (
+    extract_summary,
+    iter_document_text,
+    scan_document,
+)
+
+
+def legacy_summary(file_content):
+    """The BeautifulSoup pipeline the handler used before the streaming scanner."""
+    plain_text = BeautifulSoup(file_content, 'html.parser').get_text()
+    summary_start = plain_text.find("SUMMARY:")
+    if summary_start == -1:
+        return None
+    summary_text = plain_text[summary_start + len("SUMMARY:"):]
+    summary_text = re.sub(r'\n?\s*\[\[Page \d+\]\]\s*\n?', ' ', summary_text)
+    empty_line_match = re.search(r'\n\s*\n', summary_text)
+    if empty_line_match:
+        summary_text = summary_text[:empty_line_match.start()].strip()
+    return re.sub(r'\s+', ' ', summary_text).strip()
+
+
+FR_DOCUMENT = """<html>
+<head><title>Federal Register, Volume 88 Issue 12 (Thursday, January 19, 2023)</title>
+<style>p { margin: 0 } /* SUMMARY: not this one */</style>
+<script>var s = "SUMMARY: nor this one\\n\\n";</script>
+</head>
+<body><pre>
+[Federal Register Volume 88, Number 12 (Thursday, January 19, 2023)]
+[Proposed Rules]
+[Pages 3355-3357]
+<!-- SUMMARY: comments are not text -->
+-----------------------------------------------------------------------
+
+DEPARTMENT OF AGRICULTURE
+
+Animal and Plant Health Inspection Service
+
+7 CFR Part 319
+
+[Docket No. APHIS-2022-0055]
+
+AGENCY: Animal and Plant Health Inspection Service, USDA.
+
+ACTION: Proposed rule.
+
+-----------------------------------------------------------------------
+
+SUMMARY: We are proposing to amend the regulations governing the
+importation of fruits and vegetables &mdash; including fresh &amp; frozen
+produce &#150; to allow the importation of fresh citrus from
+<a href="#">Chile</a> into the continental United States.
+
+[[Page 3356]]
+
+DATES: We will consider all comments that we receive on or before
+March 20, 2023.
+
+""" + "\n\n".join(
+    f"Paragraph {n} of the supplementary information." for n in range(500)
+) + """
+</pre></body></html>
+"""
+
+CORPUS = {
+    "federal register document": FR_DOCUMENT,
+    "no summary": "<html><body><pre>\nAGENCY: EPA.\n\nDATES: Soon.\n</pre></body></html>",
+    "summary at end of file": (
+        "<pre>SUMMARY: Runs to the end\nof the file without a blank line."
+    ),
+    "marker split by tags": "<pre>SUMM<b>ARY:</b> Split across\ntags.\n\nDATES: x</pre>",
+    "page marker after blank line": (
+        "SUMMARY: First page.\n\n[[Page 2]]\n\nSecond page.\n\nDATES: x"
+    ),
+    "page marker before blank line": (
+        "SUMMARY: First page.\n[[Page 2]]\n\n\nStill summary.\n\nDATES: x"
+    ),
+    "consecutive page markers": "SUMMARY: A\n\n[[Page 2]]\n\n[[Page 3]]\n\nB\n\nC",
+    "not a page marker": "SUMMARY: A\n\n[[Page 2a]]\n\nB",
+    "whitespace-only blank line": "SUMMARY: One\n \t \nTwo",
+    "crlf line endings": "SUMMARY: One\r\nline\r\n\r\nTwo",
+    "empty summary": "SUMMARY:\n\nDATES: x",
+    "entities": (
+        "SUMMARY: &lt;tag&gt; &unknownentity; &#x2014; &#8212; &#129; &nbsp;end\n\nx"
+    ),
+    "invalid character references": (
+        "SUMMARY: a&#0;b&#xD800;c&#xdfff;d&#x110000;e&#99999999999;f\n\nx"
+    ),
+    "blank string between paragraphs": "<p>SUMMARY: a</p>\n\n<p>b</p>",
+    "blank string inside inline tag": "SUMMARY: a<b>\n\n</b>b",
+    "blank string after skipped style": "SUMMARY: a <style>x</style>\n\n<p>b</p>",
+    "spaces and tabs between divs": "<div>SUMMARY: a</div> \t <div>b</div>\n\n<p>c</p>",
+    "blank string between comments": "SUMMARY: a<!-- c -->\n\n<!-- d -->b",
+    "blank string inside pre": "<pre>SUMMARY: a<b>\n\n</b>b</pre>",
+    "blank string inside textarea": "<textarea>SUMMARY: x <i>\n\n</i> y</textarea>",
+    "blank string after pre closes": "<pre>SUMMARY: a</pre>\n\n<p>b</p>",
+    "nbsp is not ascii whitespace": "<p>SUMMARY: a</p>&nbsp;\n\n<p>b</p>",
+    "html document": (
+        "<html>\n<body>\n<p>SUMMARY:\nThe\nagency</p>\n\n<p>proposes.</p>\n"
+        "\n<p>DATES: x</p>\n</body>\n</html>"
+    ),
+    "cdata and template": (
+        "<template>SUMMARY: hidden</template><![CDATA[SUMMARY: from cdata]]>\n\nx"
+    ),
+    "unicode": "SUMMARY: Café § 319.56–8 — naïve.\n\nDATES: x",
+}
+
+
+def chunked(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("name", sorted(CORPUS))
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 16384])
+def test_streaming_summary_matches_beautifulsoup(name, chunk_size):
+    content = CORPUS[name]
+    expected = legacy_summary(content)
+    assert extract_summary(chunked(content.encode("utf-8"), chunk_size)) == expected
+    assert scan_document(chunked(content.encode("utf-8"), chunk_size))[0] == expected
+
+
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_document_text_matches_beautifulsoup_get_text(name):
+    content = CORPUS[name]
+    expected = BeautifulSoup(content, 'html.parser').get_text()
+    assert "".join(iter_document_text(chunked(content.encode("utf-8"), 7))) == expected
+
+
+def test_scanner_stops_reading_after_the_summary():
+    data = FR_DOCUMENT.encode("utf-8")
+    consumed = []
+
+    def chunks():
+        for chunk in chunked(data, 256):
+            consumed.append(len(chunk))
+            yield chunk
+
+    assert extract_summary(chunks()).startswith("We are proposing to amend")
+    assert sum(consumed) < len(data) // 4
+
+
+def test_single_scan_stops_after_the_preamble():
+    document = FR_DOCUMENT.replace(
+        "\nDATES:",
+        "\nFOR FURTHER INFORMATION CONTACT: Ms. Claudia Ferguson.\n\n"
+        "SUPPLEMENTARY INFORMATION:\n\nDATES:",
+    )
+    data = document.encode("utf-8")
+    consumed = []
+
+    def chunks():
+        for chunk in chunked(data, 256):
+            consumed.append(len(chunk))
+            yield chunk
+
+    summary, preamble = scan_document(chunks())
+
+    assert summary.startswith("We are proposing to amend")
+    assert preamble["further_information_contact"] == "Ms. Claudia Ferguson."
+    assert "dates" not in preamble
+    assert sum(consumed) < len(data) // 4
@@ -2,10 +2,16 @@ import json
 import pytest
 import boto3
 from moto import mock_aws
-from unittest.mock import patch
+from unittest.mock import ANY, MagicMock, patch
 
 # Import the functions to be tested - update import path as needed
-from lambda_functions.orchestrator.app import extractS3, orch_lambda
+from lambda_functions.orchestrator.app import (
+    extractS3,
+    extract_s3_records,
+    orch_lambda,
+    parse_key,
+    resolve_route,
+)
 
 # Fixture for mocking AWS credentials
 @pytest.fixture
@@ -21,6 +27,7 @@ def aws_credentials():
         'SQL_DOCUMENT_INGEST_FUNCTION': 'SQLDocumentIngestFunction',
         'SQL_COMMENT_INGEST_FUNCTION': 'SQLCommentIngestFunction',
         'OPENSEARCH_COMMENT_INGEST_FUNCTION': 'OpenSearchCommentIngestFunction',
+        'COMMENT_INGEST_FUNCTION': 'CommentIngestFunction',
         'OPENSEARCH_TEXT_EXTRACT_FUNCTION': 'OpenSearchTextExtractFunction',
         'HTM_SUMMARY_INGEST_FUNCTION': 'HTMSummaryIngestFunction',
         'SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION': 'SQLFederalDocumentIngestFunction',
@@ -95,7 +102,7 @@ def test_orch_lambda_docket_json(aws_credentials):
     }
     
     # Mock the lambda client invoke method
-    with patch('lambda_functions.orchestrator.app.boto3.client') as mock_boto:
+    with patch('boto3.client') as mock_boto:
         mock_lambda = mock_boto.return_value
         mock_lambda.invoke.return_value = {'StatusCode': 200}
         
@@ -103,7 +110,7 @@ def test_orch_lambda_docket_json(aws_credentials):
         result = orch_lambda(event, {})
         
         # Verify lambda was called correctly
-        mock_boto.assert_called_once_with('lambda')
+        mock_boto.assert_called_once_with('lambda', config=ANY)
         expected_payload = json.dumps({
                 "bucket": "test-bucket",
                 "file_key": "raw-data/path/to/docket_file.json"
@@ -141,17 +148,17 @@ def test_orch_lambda_federal_register_json(aws_credentials):
             }
         ]
     }
-    with patch("lambda_functions.orchestrator.app.boto3.client") as mock_boto:
+    with patch("boto3.client") as mock_boto:
         mock_lambda = mock_boto.return_value
         mock_lambda.invoke.return_value = {"StatusCode": 200}
         result = orch_lambda(event, {})
-        mock_boto.assert_called_once_with("lambda")
+        mock_boto.assert_called_once_with("lambda", config=ANY)
         expected_payload = json.dumps(
             {
                 "bucket": "test-bucket",
                 "file_key": "raw-data/APHIS/APHIS-2022/federal_register/some-doc.json",
             }
-        )
+        ).encode("utf-8")
         mock_lambda.invoke.assert_called_once_with(
             FunctionName="SQLFederalDocumentIngestFunction",
             InvocationType="RequestResponse",
@@ -183,7 +190,7 @@ def test_orch_lambda_html_routes_to_htm_summary(aws_credentials):
         ]
     }
 
-    with patch('lambda_functions.orchestrator.app.boto3.client') as mock_boto:
+    with patch('boto3.client') as mock_boto:
         mock_lambda = mock_boto.return_value
         mock_lambda.invoke.return_value = {'StatusCode': 200}
 
@@ -192,7 +199,7 @@ def test_orch_lambda_html_routes_to_htm_summary(aws_credentials):
         expected_payload = json.dumps({
             'bucket': 'test-bucket',
             'file_key': 'raw-data/AGY/DOCKET-1/documents/summary.HTML'
-        })
+        }).encode('utf-8')
         mock_lambda.invoke.assert_called_once_with(
             FunctionName='HTMSummaryIngestFunction',
             InvocationType='RequestResponse',
@@ -264,8 +271,8 @@ def test_orch_lambda_exception(aws_credentials):
         ]
     }
     
-    # Mock extractS3 to raise an exception
-    with patch('lambda_functions.orchestrator.app.extractS3') as mock_extract:
+    # Mock extract_s3_records to raise an exception
+    with patch('lambda_functions.orchestrator.app.extract_s3_records') as mock_extract:
         mock_extract.side_effect = Exception("Unexpected error")
         
         # Call the function
@@ -273,4 +280,447 @@ def test_orch_lambda_exception(aws_credentials):
     
     # Verify the result
     assert result['statusCode'] == 500
-    assert 'Unexpected error' in result['body']
\ No newline at end of file
+    assert 'Unexpected error' in result['body']
+
+
+def _s3_record(key, bucket='test-bucket'):
+    return {'s3': {'bucket': {'name': bucket}, 'object': {'key': key}}}
+
+
+def test_extract_s3_records_multiple_s3_records():
+    """Every record of a direct S3 event is extracted, in order"""
+    event = {
+        'Records': [
+            _s3_record('raw-data/a/docket_1.json'),
+            _s3_record('raw-data/b/docket_2.json'),
+        ]
+    }
+
+    assert extract_s3_records(event) == [
+        {'bucket': 'test-bucket', 'file_key': 'raw-data/a/docket_1.json'},
+        {'bucket': 'test-bucket', 'file_key': 'raw-data/b/docket_2.json'},
+    ]
+
+
+def test_extract_s3_records_sns_with_multiple_inner_records():
+    """SNS envelopes are unwrapped and every inner S3 record is extracted"""
+    message = json.dumps(
+        {
+            'Records': [
+                _s3_record('raw-data/a/docket_1.json'),
+                _s3_record('raw-data/a/docket_2.json'),
+            ]
+        }
+    )
+    event = {'Records': [{'Sns': {'Message': message}}, {'Sns': {'Message': message}}]}
+
+    result = extract_s3_records(event)
+
+    assert len(result) == 4
+    assert [r['file_key'] for r in result] == [
+        'raw-data/a/docket_1.json',
+        'raw-data/a/docket_2.json',
+    ] * 2
+
+
+def test_orch_lambda_multi_record_event_routes_every_record(aws_credentials):
+    """A multi-record delivery invokes once per record and reports a result for each"""
+    keys = [f'raw-data/path/to/docket_{i}.json' for i in range(5)]
+    event = {'Records': [_s3_record(k) for k in keys]}
+
+    with patch('boto3.client') as mock_boto:
+        mock_lambda = mock_boto.return_value
+        mock_lambda.invoke.return_value = {'StatusCode': 200}
+
+        result = orch_lambda(event, {})
+
+        mock_boto.assert_called_once_with('lambda', config=ANY)
+        assert mock_lambda.invoke.call_count == 5
+        invoked_keys = sorted(
+            json.loads(c.kwargs['Payload'])['file_key']
+            for c in mock_lambda.invoke.call_args_list
+        )
+        assert invoked_keys == sorted(keys)
+
+    assert result['statusCode'] == 200
+    results = json.loads(result['body'])['results']
+    assert [r['file_key'] for r in results] == keys
+    assert all(r['statusCode'] == 200 for r in results)
+
+
+def test_orch_lambda_multi_record_event_reports_partial_failure(aws_credentials):
+    """One failing invoke is reported per record without hiding the others"""
+    event = {
+        'Records': [
+            _s3_record('raw-data/path/to/docket_ok.json'),
+            _s3_record('raw-data/path/to/docket_bad.json'),
+        ]
+    }
+
+    def _invoke(FunctionName, InvocationType, Payload):
+        if 'docket_bad' in json.loads(Payload)['file_key']:
+            raise Exception("invoke failed")
+        return {'StatusCode': 200}
+
+    with patch('boto3.client') as mock_boto:
+        mock_boto.return_value.invoke.side_effect = _invoke
+        result = orch_lambda(event, {})
+
+    assert result['statusCode'] == 207
+    results = {r['file_key']: r for r in json.loads(result['body'])['results']}
+    assert results['raw-data/path/to/docket_ok.json']['statusCode'] == 200
+    assert results['raw-data/path/to/docket_bad.json']['statusCode'] == 500
+    assert (
+        results['raw-data/path/to/docket_bad.json']['body']['targets'][0]['error']
+        == 'invoke failed'
+    )
+
+
+def test_orch_lambda_malformed_record_fails_alone(aws_credentials):
+    """
+    A malformed record among good ones is a failed entry; the good ones are still routed
+    """
+    keys = ['raw-data/path/to/docket_1.json', 'raw-data/path/to/docket_2.json']
+    event = {'Records': [
+        _s3_record(keys[0]), {'wrong_format': True}, _s3_record(keys[1])
+    ]}
+
+    with patch('boto3.client') as mock_boto:
+        mock_lambda = mock_boto.return_value
+        mock_lambda.invoke.return_value = {'StatusCode': 200}
+
+        result = orch_lambda(event, {})
+
+        assert mock_lambda.invoke.call_count == 2
+
+    assert result['statusCode'] == 207
+    results = json.loads(result['body'])['results']
+    assert [(r['file_key'], r['statusCode']) for r in results] == [
+        (keys[0], 200), (keys[1], 200), (None, 400)
+    ]
+    assert "Cannot extract S3 information from event" in results[2]['body']['error']
+
+
+def test_orch_lambda_malformed_record_beside_single_record(aws_credentials):
+    """One good record beside a malformed one is answered with a per-record result list"""
+    event = {'Records': [
+        {'Sns': {'Message': 'not json'}}, _s3_record('raw-data/path/to/docket_1.json')
+    ]}
+
+    with patch('boto3.client') as mock_boto:
+        mock_boto.return_value.invoke.return_value = {'StatusCode': 200}
+        result = orch_lambda(event, {})
+
+    assert result['statusCode'] == 207
+    results = json.loads(result['body'])['results']
+    assert [r['statusCode'] for r in results] == [200, 400]
+
+
+def test_extract_s3_records_still_raises_without_malformed_list():
+    """Callers that do not collect malformed records keep the strict behaviour"""
+    with pytest.raises(ValueError):
+        extract_s3_records({'Records': [
+            _s3_record('raw-data/a/docket_1.json'), {'wrong_format': True}
+        ]})
+
+
+def test_orch_lambda_multi_record_event_counts_partially_failed_record(aws_credentials):
+    """
+    A record where only some targets failed (207) makes the delivery a partial failure
+    """
+    import io
+
+    keys = [
+        'raw-data/A/A-1/text-A-1/comments/A-1-0001.json',
+        'raw-data/path/to/docket_ok.json',
+    ]
+
+    def _invoke(FunctionName, InvocationType, Payload):
+        status = 500 if FunctionName == 'OpenSearchCommentIngestFunction' else 200
+        body = {
+            'statusCode': status,
+            'body': json.dumps({'error': 'opensearch down'} if status == 500 else {}),
+        }
+        return {
+            'StatusCode': 200,
+            'Payload': io.BytesIO(json.dumps(body).encode('utf-8')),
+        }
+
+    with patch('boto3.client') as mock_boto:
+        mock_boto.return_value.invoke.side_effect = _invoke
+        result = orch_lambda({'Records': [_s3_record(k) for k in keys]}, {})
+
+    assert result['statusCode'] == 207
+    results = {
+        r['file_key']: r['statusCode'] for r in json.loads(result['body'])['results']
+    }
+    assert results == {keys[0]: 207, keys[1]: 200}
+
+
+@pytest.mark.parametrize(
+    "key, expected",
+    [
+        (
+            "raw-data/CMS/CMS-2020-0098/text-CMS-2020-0098/docket/CMS-2020-0098.json",
+            "docket json",
+        ),
+        (
+            "raw-data/CMS/CMS-2020-0098/text-CMS-2020-0098/documents/"
+            "CMS-2020-0098-0001.json",
+            "document json",
+        ),
+        (
+            "raw-data/CMS/CMS-2020-0098/text-CMS-2020-0098/comments/"
+            "CMS-2020-0098-0002.json",
+            "comment json",
+        ),
+        (
+            "raw-data/APHIS/APHIS-2022-0044/binary-APHIS-2022-0044/"
+            "comments_attachments/APHIS-2022-0044-0003_attachment_1.pdf",
+            "pdf file",
+        ),
+        (
+            "raw-data/ACF/ACF-2025-0004/text-ACF-2025-0004/documents/"
+            "ACF-2025-0004-0001_content.htm",
+            "htm/html file",
+        ),
+        (
+            "raw-data/APHIS/APHIS-2022-0044/binary-APHIS-2022-0044/federal_register/"
+            "some-doc.json",
+            "federal register document json",
+        ),
+        ("raw-data/docket_TEST-2023-0001.json", "docket json"),
+        ("raw-data/federal_register_2024-00001.json", "federal register document json"),
+    ],
+)
+def test_resolve_route_key_shapes(key, expected):
+    """Canonical and legacy flat key shapes resolve to the expected route"""
+    assert resolve_route(key).description == expected
+
+
+def test_resolve_route_uses_path_segments_not_substrings():
+    """
+    Kind comes from the path segment, so docket ids containing 'docket' or 'comments' do
+    not misroute
+    """
+    key = (
+        "raw-data/XYZ/XYZ-docket-comments/text-XYZ-docket-comments/documents/"
+        "XYZ-0001.json"
+    )
+    assert parse_key(key) == ("documents", ".json")
+    assert resolve_route(key).description == "document json"
+    # comments_attachments json is not a comment
+    assert (
+        resolve_route(
+            "raw-data/A/A-1/binary-A-1/comments_attachments/A-1-0002_attachment_1.json"
+        )
+        is None
+    )
+
+
+def test_resolve_route_unknown_file_type():
+    assert resolve_route("raw-data/path/to/regular_file.json") is None
+    assert (
+        resolve_route(
+            "raw-data/A/A-1/binary-A-1/documents_attachments/A-1-0001_attachment_1.docx"
+        )
+        is None
+    )
+
+
+def test_orch_lambda_pdf_is_queued_with_event_invocation(aws_credentials):
+    """
+    Comment attachment PDFs are dispatched fire-and-forget and the dispatch is recorded
+    """
+    key = (
+        'raw-data/APHIS/APHIS-2022-0044/binary-APHIS-2022-0044/comments_attachments/'
+        'APHIS-2022-0044-0003_attachment_1.pdf'
+    )
+    event = {'Records': [_s3_record(key)]}
+
+    with patch('boto3.client') as mock_boto, \
+            patch('lambda_functions.orchestrator.app.print') as mock_print:
+        mock_lambda = mock_boto.return_value
+        mock_lambda.invoke.return_value = {
+            'StatusCode': 202,
+            'ResponseMetadata': {'RequestId': 'req-1'},
+        }
+
+        result = orch_lambda(event, {})
+
+        mock_lambda.invoke.assert_called_once_with(
+            FunctionName='OpenSearchTextExtractFunction',
+            InvocationType='Event',
+            Payload=json.dumps({'bucket': 'test-bucket', 'file_key': key}).encode('utf-8')
+        )
+
+    assert result['statusCode'] == 202
+    assert 'queued' in result['body']
+    records = [
+        json.loads(c.args[0])
+        for c in mock_print.call_args_list
+        if c.args and isinstance(c.args[0], str) and c.args[0].startswith('{"dispatch"')
+    ]
+    assert records == [{
+        'dispatch': 'OpenSearchTextExtractFunction',
+        'bucket': 'test-bucket',
+        'file_key': key,
+        'statusCode': 202,
+        'requestId': 'req-1',
+    }]
+
+
+def test_route_on_complete_callback_runs_per_target(aws_credentials):
+    """A route's on_complete callback sees each target's invoke response"""
+    from lambda_functions.orchestrator import app
+
+    seen = []
+    route = app.Route(
+        "comment json",
+        ("comments",),
+        (".json",),
+        ("OPENSEARCH_COMMENT_INGEST_FUNCTION", "SQL_COMMENT_INGEST_FUNCTION"),
+        on_complete=lambda s3dict, fn, resp: seen.append((fn, resp['StatusCode'])),
+    )
+    mock_lambda = MagicMock()
+    mock_lambda.invoke.return_value = {'StatusCode': 200}
+    s3dict = {
+        'bucket': 'test-bucket',
+        'file_key': 'raw-data/A/A-1/text-A-1/comments/A-1-0001.json',
+    }
+
+    functions = {
+        'OPENSEARCH_COMMENT_INGEST_FUNCTION': 'OpenSearchCommentIngestFunction',
+        'SQL_COMMENT_INGEST_FUNCTION': 'SQLCommentIngestFunction',
+    }
+    with patch.object(app, 'resolve_route', return_value=route):
+        response = app.route_record(s3dict, mock_lambda, functions)
+
+    assert response['statusCode'] == 200
+    assert seen == [
+        ('OpenSearchCommentIngestFunction', 200),
+        ('SQLCommentIngestFunction', 200),
+    ]
+
+
+def test_orch_lambda_comment_fans_out_to_both_sinks_concurrently(aws_credentials):
+    """Both comment sinks are invoked at the same time, not one after the other"""
+    import threading
+
+    key = 'raw-data/A/A-1/text-A-1/comments/A-1-0001.json'
+    both_started = threading.Barrier(2, timeout=5)
+
+    def _invoke(FunctionName, InvocationType, Payload):
+        # Each call waits for the other; a sequential fan-out would time out here.
+        both_started.wait()
+        return {'StatusCode': 200}
+
+    with patch('boto3.client') as mock_boto:
+        mock_boto.return_value.invoke.side_effect = _invoke
+        result = orch_lambda({'Records': [_s3_record(key)]}, {})
+
+    assert result['statusCode'] == 200
+    targets = json.loads(result['body'])['targets']
+    assert {t['function'] for t in targets} == {
+        'OpenSearchCommentIngestFunction',
+        'SQLCommentIngestFunction',
+    }
+
+
+def test_orch_lambda_comment_reports_failing_sink_without_hiding_other(aws_credentials):
+    """
+    A failing OpenSearch sink is reported while the SQL sink result is still returned
+    """
+    import io
+
+    key = 'raw-data/A/A-1/text-A-1/comments/A-1-0001.json'
+
+    def _invoke(FunctionName, InvocationType, Payload):
+        if FunctionName == 'OpenSearchCommentIngestFunction':
+            body = {'statusCode': 500, 'body': json.dumps({'error': 'opensearch down'})}
+        else:
+            body = {
+                'statusCode': 200,
+                'body': json.dumps({'message': 'Data processed successfully'}),
+            }
+        return {
+            'StatusCode': 200,
+            'Payload': io.BytesIO(json.dumps(body).encode('utf-8')),
+        }
+
+    with patch('boto3.client') as mock_boto:
+        mock_boto.return_value.invoke.side_effect = _invoke
+        result = orch_lambda({'Records': [_s3_record(key)]}, {})
+
+    assert result['statusCode'] == 207
+    targets = {t['function']: t for t in json.loads(result['body'])['targets']}
+    assert targets['OpenSearchCommentIngestFunction']['statusCode'] == 500
+    assert 'opensearch down' in targets['OpenSearchCommentIngestFunction']['error']
+    assert targets['SQLCommentIngestFunction'] == {
+        'function': 'SQLCommentIngestFunction',
+        'statusCode': 200,
+    }
+
+
+def _combined_comment_route():
+    from lambda_functions.orchestrator import app
+    return app.Route(
+        "comment json", ("comments", "comment"), (".json",), ("COMMENT_INGEST_FUNCTION",)
+    )
+
+
+def test_orch_lambda_comment_goes_to_the_combined_comment_ingest(aws_credentials):
+    """
+    With COMBINED_COMMENT_INGEST, a comment is sent once, to the function that writes both
+    stores
+    """
+    from lambda_functions.orchestrator import app
+
+    key = 'raw-data/A/A-1/text-A-1/comments/A-1-0001.json'
+
+    functions = {'COMMENT_INGEST_FUNCTION': 'CommentIngestFunction'}
+    with patch('boto3.client') as mock_boto, \
+            patch.object(app, 'resolve_route', return_value=_combined_comment_route()), \
+            patch.object(app, 'get_target_functions', return_value=functions):
+        mock_boto.return_value.invoke.return_value = {'StatusCode': 200}
+        result = orch_lambda({'Records': [_s3_record(key)]}, {})
+
+    assert result['statusCode'] == 200
+    mock_boto.return_value.invoke.assert_called_once()
+    assert (
+        mock_boto.return_value.invoke.call_args.kwargs['FunctionName']
+        == 'CommentIngestFunction'
+    )
+
+
+def test_orch_lambda_comment_reports_failing_sink_of_combined_ingest(aws_credentials):
+    """
+    A sink failure reported by the combined comment ingest is surfaced with its per-sink
+    detail
+    """
+    import io
+    from lambda_functions.orchestrator import app
+
+    key = 'raw-data/A/A-1/text-A-1/comments/A-1-0001.json'
+    sinks = {
+        'sql': {'statusCode': 200},
+        'opensearch': {'statusCode': 500, 'error': 'opensearch down'},
+    }
+    body = {
+        'statusCode': 500,
+        'body': json.dumps({'error': 'opensearch: opensearch down', 'sinks': sinks}),
+    }
+
+    functions = {'COMMENT_INGEST_FUNCTION': 'CommentIngestFunction'}
+    with patch('boto3.client') as mock_boto, \
+            patch.object(app, 'resolve_route', return_value=_combined_comment_route()), \
+            patch.object(app, 'get_target_functions', return_value=functions):
+        mock_boto.return_value.invoke.return_value = {
+            'StatusCode': 200, 'Payload': io.BytesIO(json.dumps(body).encode('utf-8')),
+        }
+        result = orch_lambda({'Records': [_s3_record(key)]}, {})
+
+    assert result['statusCode'] == 500
+    target, = json.loads(result['body'])['targets']
+    assert target['function'] == 'CommentIngestFunction'
+    assert json.loads(target['error'])['sinks'] == sinks
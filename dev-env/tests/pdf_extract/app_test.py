@@ -7,6 +7,7 @@ from unittest.mock import patch, MagicMock
 from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+import gzip
 import json
 
 # Mock the imports before importing the handler
@@ -14,7 +15,25 @@ sys.modules['common.ingest'] = MagicMock()
 sys.modules['common.ingest'].ingest_extracted_text = MagicMock()
 sys.modules['psycopg'] = MagicMock()
 
-from lambda_functions.pdf_text_extract.app import handler, extract_text, s3_saver  # Import from app.py
+from lambda_functions.pdf_text_extract.app import (  # Import from app.py
+    TextExtractionFailed,
+    handler,
+    extract_text,
+    s3_saver,
+)
+from lambda_functions.pdf_text_extract.extraction_cache import (
+    cache_key,
+    clear_local_cache,
+    content_digest,
+    put_cached_pages,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_extraction_cache():
+    clear_local_cache()
+    yield
+    clear_local_cache()
 
 # Fixture to mock AWS credentials
 @pytest.fixture(scope="function")
@@ -70,7 +89,10 @@ def create_pdf():
 def test_pdf_extractor_handler(s3_mock):
     pdf_content = create_pdf()
     bucket_name = "test-bucket"
-    file_key = "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/APHIS-2022-0055-0002_attachment_1.pdf"
+    file_key = (
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        "APHIS-2022-0055-0002_attachment_1.pdf"
+    )
     
     # Upload the PDF to the mock S3 bucket
     s3_mock.put_object(Bucket=bucket_name, Key=file_key, Body=pdf_content)
@@ -84,4 +106,399 @@ def test_pdf_extractor_handler(s3_mock):
 
     
     
-    
\ No newline at end of file
+    
+
+def test_pdf_extractor_handler_rejects_non_pdf_without_download(s3_mock):
+    file_key = (
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        "APHIS-2022-0055-0002_attachment_1.pdf"
+    )
+    s3_mock.put_object(Bucket="test-bucket", Key=file_key, Body=b"<html>" + b" " * 100000)
+
+    with patch("lambda_functions.pdf_text_extract.app.spooled_object") as spooled:
+        response = handler({"bucket": "test-bucket", "file_key": file_key}, None)
+
+    assert response['statusCode'] == 415
+    spooled.assert_not_called()
+
+
+def test_pdf_extractor_handler_diverts_oversized_pdf(s3_mock, monkeypatch):
+    file_key = (
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        "APHIS-2022-0055-0002_attachment_1.pdf"
+    )
+    s3_mock.put_object(Bucket="test-bucket", Key=file_key, Body=create_pdf())
+    monkeypatch.setattr("lambda_functions.pdf_text_extract.app.MAX_PDF_BYTES", 100)
+    monkeypatch.setenv("PDF_LARGE_FILE_FUNCTION", "LargePdfTextExtractFunction")
+    lambda_client = MagicMock()
+    s3 = boto3.client("s3")
+    clients = {"s3": s3, "lambda": lambda_client}
+    event = {"bucket": "test-bucket", "file_key": file_key}
+
+    with patch("lambda_functions.pdf_text_extract.app.get_client",
+               side_effect=clients.get), \
+            patch("lambda_functions.pdf_text_extract.app.spooled_object") as spooled:
+        response = handler(event, None)
+
+    assert response['statusCode'] == 202
+    spooled.assert_not_called()
+    lambda_client.invoke.assert_called_once_with(
+        FunctionName="LargePdfTextExtractFunction",
+        InvocationType="Event",
+        Payload=json.dumps(event).encode("utf-8"),
+    )
+
+
+def test_pdf_extractor_handler_extracts_oversized_pdf_without_large_file_function(
+    s3_mock, monkeypatch
+):
+    file_key = (
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        "APHIS-2022-0055-0002_attachment_1.pdf"
+    )
+    s3_mock.put_object(Bucket="test-bucket", Key=file_key, Body=create_pdf())
+    monkeypatch.setattr("lambda_functions.pdf_text_extract.app.MAX_PDF_BYTES", 100)
+    monkeypatch.delenv("PDF_LARGE_FILE_FUNCTION", raising=False)
+
+    response = handler({"bucket": "test-bucket", "file_key": file_key}, None)
+
+    assert response['statusCode'] == 200
+
+
+def test_pdf_extractor_handler_reuses_text_of_duplicate_attachments(s3_mock):
+    pdf_content = create_pdf()
+    keys = [
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        f"APHIS-2022-0055-000{n}_attachment_1.pdf"
+        for n in (2, 3, 4)
+    ]
+    for key in keys:
+        s3_mock.put_object(Bucket="test-bucket", Key=key, Body=pdf_content)
+
+    pages = ([(0, "Campaign letter", 0.01)], 1)
+    with patch(
+        "lambda_functions.pdf_text_extract.app.extract_pages", return_value=pages
+    ) as extract:
+        responses = [
+            handler({"bucket": "test-bucket", "file_key": key}, None) for key in keys[:2]
+        ]
+        # A new container only has the S3 copy of the cache
+        clear_local_cache()
+        responses.append(handler({"bucket": "test-bucket", "file_key": keys[2]}, None))
+
+    assert [r['statusCode'] for r in responses] == [200, 200, 200]
+    extract.assert_called_once()
+    cached = s3_mock.get_object(
+        Bucket="test-bucket", Key=cache_key(content_digest(pdf_content))
+    )
+    assert json.loads(gzip.decompress(cached["Body"].read())) == {
+        "method": "pypdf",
+        "pages": [[0, "Campaign letter"]],
+    }
+    for n in (2, 3, 4):
+        txt = s3_mock.get_object(
+            Bucket="test-bucket",
+            Key=(
+                "derived-data/APHIS/APHIS-2022-0055/mirrulations/extracted_txt/"
+                "comments_extracted_text/pypdf/"
+                f"APHIS-2022-0055-000{n}_attachment_1_extracted.txt"
+            ),
+        )
+        assert txt["Body"].read() == b"Campaign letter"
+
+
+def test_pdf_extractor_handler_cache_hit_skips_backend_selection(s3_mock):
+    pdf_content = create_pdf()
+    key = (
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        "APHIS-2022-0055-0002_attachment_1.pdf"
+    )
+    s3_mock.put_object(Bucket="test-bucket", Key=key, Body=pdf_content)
+    put_cached_pages(
+        s3_mock,
+        "test-bucket",
+        content_digest(pdf_content),
+        [(0, "Campaign letter", 0.0)],
+        "pypdf-upright",
+    )
+    clear_local_cache()
+
+    with patch("lambda_functions.pdf_text_extract.app.select_backend") as select, \
+            patch(
+                "lambda_functions.pdf_text_extract.app.ingest_extracted_text"
+            ) as ingest:
+        response = handler({"bucket": "test-bucket", "file_key": key}, None)
+
+    assert response['statusCode'] == 200
+    select.assert_not_called()
+    assert ingest.call_args.args[0]["extractedMethod"] == "pypdf-upright"
+    s3_mock.head_object(
+        Bucket="test-bucket",
+        Key=(
+            "derived-data/APHIS/APHIS-2022-0055/mirrulations/extracted_txt/"
+            "comments_extracted_text/pypdf-upright/"
+            "APHIS-2022-0055-0002_attachment_1_extracted.txt"
+        ),
+    )
+
+
+def create_multipage_pdf(pages):
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(pages):
+        c.drawString(100, 750, f"Content of page {page + 1}")
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+class ShortLivedContext:
+    """Lambda context whose time runs out after a fixed number of budget checks."""
+
+    function_name = "PDFTextExtractFunction"
+    invoked_function_arn = (
+        "arn:aws:lambda:us-east-1:123456789012:function:PDFTextExtractFunction"
+    )
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    def get_remaining_time_in_millis(self):
+        self.checks -= 1
+        return 60000 if self.checks > 0 else 1000
+
+
+def test_pdf_extractor_handler_continues_across_invocations(s3_mock):
+    file_key = (
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        "APHIS-2022-0055-0002_attachment_1.pdf"
+    )
+    s3_mock.put_object(Bucket="test-bucket", Key=file_key, Body=create_multipage_pdf(5))
+    lambda_client = MagicMock()
+    clients = {"s3": boto3.client("s3"), "lambda": lambda_client}
+
+    event = {"bucket": "test-bucket", "file_key": file_key}
+    statuses = []
+    with patch("lambda_functions.pdf_text_extract.app.get_client",
+               side_effect=clients.get), \
+            patch("lambda_functions.pdf_text_extract.checkpoint.get_client",
+                  side_effect=clients.get), \
+            patch(
+                "lambda_functions.pdf_text_extract.app.ingest_extracted_text"
+            ) as ingest:
+        while True:
+            response = handler(event, ShortLivedContext(checks=2))
+            statuses.append(response['statusCode'])
+            if response['statusCode'] != 202:
+                break
+            # Each invocation finishes two pages and hands over to the next one
+            ingest.assert_not_called()
+            kwargs = lambda_client.invoke.call_args.kwargs
+            assert kwargs["FunctionName"] == ShortLivedContext.invoked_function_arn
+            assert kwargs["InvocationType"] == "Event"
+            event = json.loads(kwargs["Payload"])
+
+    assert statuses == [202, 202, 200]
+    assert event["continuation"]["invocation"] == 2
+    ingest.assert_called_once()
+    text = ingest.call_args.args[0]["extractedText"]
+    assert [text.index(f"page {n}") for n in range(1, 6)] == sorted(
+        text.index(f"page {n}") for n in range(1, 6)
+    )
+    checkpoints = s3_mock.list_objects_v2(
+        Bucket="test-bucket", Prefix="derived-data/extraction_checkpoints/"
+    )
+    assert checkpoints.get("KeyCount", 0) == 0
+
+
+def _start_and_collect_continuations(s3_mock, keys, clients, pdf_content):
+    """
+    Start an extraction for each key (one invocation each) and return their continuation
+    events.
+    """
+    continuations = []
+    for key in keys:
+        s3_mock.put_object(Bucket="test-bucket", Key=key, Body=pdf_content)
+        response = handler(
+            {"bucket": "test-bucket", "file_key": key}, ShortLivedContext(checks=2)
+        )
+        assert response['statusCode'] == 202
+        continuations.append(
+            json.loads(clients["lambda"].invoke.call_args.kwargs["Payload"])
+        )
+    return continuations
+
+
+def _finish(event, clients):
+    """
+    Run continuations of one extraction until it stops handing over; returns the final
+    response.
+    """
+    while True:
+        response = handler(event, ShortLivedContext(checks=100))
+        if response['statusCode'] != 202:
+            return response
+        event = json.loads(clients["lambda"].invoke.call_args.kwargs["Payload"])
+
+
+def test_identical_pdfs_extracted_at_the_same_time_keep_separate_checkpoints(s3_mock):
+    keys = [
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        f"APHIS-2022-0055-000{n}_attachment_1.pdf"
+        for n in (2, 3)
+    ]
+    clients = {"s3": boto3.client("s3"), "lambda": MagicMock()}
+
+    # No cache store, so each copy has to finish from its own checkpoint
+    with patch("lambda_functions.pdf_text_extract.app.get_client",
+               side_effect=clients.get), \
+            patch("lambda_functions.pdf_text_extract.checkpoint.get_client",
+                  side_effect=clients.get), \
+            patch("lambda_functions.pdf_text_extract.app.put_cached_pages"), \
+            patch(
+                "lambda_functions.pdf_text_extract.app.ingest_extracted_text"
+            ) as ingest:
+        continuations = _start_and_collect_continuations(
+            s3_mock, keys, clients, create_multipage_pdf(5)
+        )
+        assert (
+            continuations[0]["continuation"]["checkpoint_key"]
+            != continuations[1]["continuation"]["checkpoint_key"]
+        )
+        responses = [_finish(event, clients) for event in continuations]
+
+    assert [r['statusCode'] for r in responses] == [200, 200]
+    assert ingest.call_count == 2
+    assert all(
+        "Content of page 5" in call.args[0]["extractedText"]
+        for call in ingest.call_args_list
+    )
+    checkpoints = s3_mock.list_objects_v2(
+        Bucket="test-bucket", Prefix="derived-data/extraction_checkpoints/"
+    )
+    assert checkpoints.get("KeyCount", 0) == 0
+
+
+def test_continuation_answered_from_cache_deletes_its_checkpoint(s3_mock):
+    key = (
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        "APHIS-2022-0055-0002_attachment_1.pdf"
+    )
+    pdf_content = create_multipage_pdf(5)
+    clients = {"s3": boto3.client("s3"), "lambda": MagicMock()}
+
+    with patch("lambda_functions.pdf_text_extract.app.get_client",
+               side_effect=clients.get), \
+            patch("lambda_functions.pdf_text_extract.checkpoint.get_client",
+                  side_effect=clients.get), \
+            patch("lambda_functions.pdf_text_extract.app.ingest_extracted_text"):
+        (continuation,) = _start_and_collect_continuations(
+            s3_mock, [key], clients, pdf_content
+        )
+        # Another copy of the same PDF finishes first and fills the cache
+        put_cached_pages(
+            s3_mock,
+            "test-bucket",
+            content_digest(pdf_content),
+            [(0, "Campaign letter", 0.0)],
+            "pypdf",
+        )
+        with patch("lambda_functions.pdf_text_extract.app.extract_pages") as extract:
+            assert (
+                handler(continuation, ShortLivedContext(checks=100))['statusCode'] == 200
+            )
+        extract.assert_not_called()
+
+    checkpoints = s3_mock.list_objects_v2(
+        Bucket="test-bucket", Prefix="derived-data/extraction_checkpoints/"
+    )
+    assert checkpoints.get("KeyCount", 0) == 0
+
+
+def test_pdf_extractor_handler_returns_rejections_when_raising(s3_mock, monkeypatch):
+    monkeypatch.setattr("lambda_functions.pdf_text_extract.app.RAISE_ON_FAILURE", True)
+    prefix = "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+    not_pdf = prefix + "APHIS-2022-0055-0002_attachment_1.pdf"
+    scanned = prefix + "APHIS-2022-0055-0003_attachment_1.pdf"
+    s3_mock.put_object(Bucket="test-bucket", Key=not_pdf, Body=b"<html>Not found</html>")
+    s3_mock.put_object(Bucket="test-bucket", Key=scanned, Body=create_pdf())
+
+    app = "lambda_functions.pdf_text_extract.app"
+    response = handler({"bucket": "test-bucket", "file_key": not_pdf}, None)
+    assert response['statusCode'] == 415
+    with patch(f"{app}.extract_pages", return_value=([(0, "", 0.0)], 1)):
+        response = handler({"bucket": "test-bucket", "file_key": scanned}, None)
+    assert response['statusCode'] == 400
+    assert "Extracted text is empty" in response['body']
+
+
+def test_pdf_extractor_handler_raises_unexpected_failures(s3_mock, monkeypatch):
+    file_key = ("raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/"
+                "comments_attachments/APHIS-2022-0055-0002_attachment_1.pdf")
+    app = "lambda_functions.pdf_text_extract.app"
+    s3_mock.put_object(Bucket="test-bucket", Key=file_key, Body=create_pdf())
+    event = {"bucket": "test-bucket", "file_key": file_key}
+    down = RuntimeError("OpenSearch unavailable")
+
+    with patch(f"{app}.ingest_extracted_text", side_effect=down):
+        assert handler(event, None)['statusCode'] == 500
+        monkeypatch.setattr(f"{app}.RAISE_ON_FAILURE", True)
+        with pytest.raises(TextExtractionFailed) as failure:
+            handler(event, None)
+    assert failure.value.response['statusCode'] == 500
+    assert "OpenSearch unavailable" in failure.value.response['body']
+
+
+def test_pdf_extractor_handler_gives_up_after_continuation_limit(s3_mock, monkeypatch):
+    file_key = (
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        "APHIS-2022-0055-0002_attachment_1.pdf"
+    )
+    s3_mock.put_object(Bucket="test-bucket", Key=file_key, Body=create_multipage_pdf(3))
+    monkeypatch.setattr(
+        "lambda_functions.pdf_text_extract.checkpoint.MAX_CONTINUATIONS", 0
+    )
+
+    with patch("lambda_functions.pdf_text_extract.checkpoint.get_client") as get_client:
+        response = handler(
+            {"bucket": "test-bucket", "file_key": file_key}, ShortLivedContext(checks=1)
+        )
+
+    assert response['statusCode'] == 400
+    get_client.return_value.invoke.assert_not_called()
+
+
+def test_pdf_extractor_handler_chunked_output(s3_mock, monkeypatch):
+    file_key = (
+        "raw-data/APHIS/APHIS-2022-0055/binary-APHIS-2022-0055/comments_attachments/"
+        "APHIS-2022-0055-0002_attachment_1.pdf"
+    )
+    s3_mock.put_object(Bucket="test-bucket", Key=file_key, Body=create_multipage_pdf(5))
+    monkeypatch.setattr("lambda_functions.pdf_text_extract.app.OUTPUT_MODE", "chunked")
+    monkeypatch.setattr("lambda_functions.pdf_text_extract.app.CHUNK_MAX_CHARS", 40)
+
+    with patch("lambda_functions.pdf_text_extract.app.ingest_extracted_text") as ingest:
+        response = handler({"bucket": "test-bucket", "file_key": file_key}, None)
+
+    assert response['statusCode'] == 200
+    docs = [call.args[0] for call in ingest.call_args_list]
+    assert [(d["chunkIndex"], d["pageStart"], d["pageEnd"]) for d in docs] == [
+        (0, 1, 2),
+        (1, 3, 4),
+        (2, 5, 5),
+    ]
+    assert all(
+        d["attachmentId"] == "APHIS-2022-0055-0002-1" and d["chunkCount"] == 3
+        for d in docs
+    )
+    assert docs[2]["chunkId"] == "APHIS-2022-0055-0002-1-2"
+    assert docs[2]["extractedText"] == "Content of page 5"
+    saved = s3_mock.get_object(
+        Bucket="test-bucket",
+        Key=(
+            "derived-data/APHIS/APHIS-2022-0055/mirrulations/extracted_txt/"
+            "comments_extracted_text/pypdf/"
+            "APHIS-2022-0055-0002_attachment_1_chunks.jsonl.gz"
+        ),
+    )
+    assert len(gzip.decompress(saved["Body"].read()).splitlines()) == 3
@@ -0,0 +1,164 @@
+import io
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+)
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from lambda_functions.pdf_text_extract import backends
+from lambda_functions.pdf_text_extract.backends import (
+    Backend,
+    get_backend,
+    register_backend,
+    registered_backends,
+    select_backend,
+)
+from lambda_functions.pdf_text_extract.parallel_extract import extract_text_from_file
+
+
+def text_pdf(pages=2):
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(pages):
+        c.drawString(100, 750, f"Content of page {page + 1}")
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def scanned_pdf(pages=3):
+    """Pages without any font resources, like image-only scans."""
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_bundled_backends_are_registered():
+    names = {backend.name for backend in registered_backends()}
+    assert {"pypdf", "pypdf-upright", "no-text-layer"} <= names
+    with pytest.raises(ValueError, match="Unknown PDF backend"):
+        get_backend("tesseract")
+
+
+def test_selector_uses_text_layer_and_bytes_per_page(monkeypatch):
+    assert select_backend(text_pdf()).name == "pypdf"
+    assert select_backend(scanned_pdf()).name == "no-text-layer"
+
+    monkeypatch.setattr(backends, "DENSE_BYTES_PER_PAGE", 100)
+    assert select_backend(text_pdf()).name == "pypdf-upright"
+
+    monkeypatch.setattr(backends, "FORCED_BACKEND", "pypdf")
+    assert select_backend(scanned_pdf()).name == "pypdf"
+
+
+def mixed_pdf(layout):
+    """Pages in layout order: "t" has a text layer, "s" is an image-only scan."""
+    text_pages = iter(PdfReader(io.BytesIO(text_pdf(layout.count("t")))).pages)
+    writer = PdfWriter()
+    for kind in layout:
+        if kind == "t":
+            writer.add_page(next(text_pages))
+        else:
+            writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def nested_form_pdf(depth=3):
+    """A page whose only font is declared in a form XObject nested depth levels down."""
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=612, height=792)
+    resources = DictionaryObject({NameObject("/Font"): DictionaryObject({
+        NameObject("/F1"): DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }),
+    })})
+    for level in range(depth):
+        form = DecodedStreamObject()
+        form.set_data(
+            b"BT /F1 12 Tf 100 700 Td (Nested) Tj ET" if level == 0 else b"/Fm0 Do"
+        )
+        form.update(
+            {
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Form"),
+                NameObject("/BBox"): ArrayObject(
+                    [
+                        NumberObject(0),
+                        NumberObject(0),
+                        NumberObject(612),
+                        NumberObject(792),
+                    ]
+                ),
+                NameObject("/Resources"): resources,
+            }
+        )
+        resources = DictionaryObject({NameObject("/XObject"): DictionaryObject({
+            NameObject("/Fm0"): writer._add_object(form),
+        })})
+    page[NameObject("/Resources")] = resources
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_selector_checks_every_page_and_nested_forms_before_ruling_out_text():
+    # Scanned cover, middle and back pages; the text is only on the pages in between
+    assert select_backend(mixed_pdf("ststs")).name == "pypdf"
+    assert select_backend(nested_form_pdf(depth=3)).name == "pypdf"
+
+
+def test_selector_falls_back_to_pypdf_when_detection_fails(monkeypatch):
+    def broken(reader):
+        raise KeyError("/Resources")
+
+    monkeypatch.setattr(backends, "has_text_layer", broken)
+    assert select_backend(scanned_pdf()).name == "pypdf"
+
+
+def test_backends_produce_the_same_text_for_upright_pages(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(text_pdf(3))
+
+    texts = {
+        name: extract_text_from_file(str(path), backend=get_backend(name))
+        for name in ("pypdf", "pypdf-upright")
+    }
+
+    assert texts["pypdf"] == texts["pypdf-upright"]
+    assert "Content of page 3" in texts["pypdf"]
+    assert extract_text_from_file(str(path), backend=get_backend("no-text-layer")) == ""
+
+
+def test_registered_backend_is_used_for_extraction(tmp_path, monkeypatch):
+    monkeypatch.setattr(backends, "_BACKENDS", dict(backends._BACKENDS))
+    shouting = register_backend(
+        Backend(
+            "shouting",
+            get_backend("pypdf").open,
+            lambda reader: len(reader.pages),
+            lambda reader, start=0, stop=None: (
+                (index, text.upper(), seconds)
+                for index, text, seconds in get_backend("pypdf").iter_pages(
+                    reader, start, stop
+                )
+            ),
+        )
+    )
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(text_pdf(1))
+
+    assert extract_text_from_file(str(path), backend=shouting) == "CONTENT OF PAGE 1"
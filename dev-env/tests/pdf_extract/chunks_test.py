@@ -0,0 +1,63 @@
+import gzip
+import json
+
+from lambda_functions.pdf_text_extract.chunks import chunk_pages, encode_chunks
+
+
+def pages_of(*texts):
+    return [(index, text, 0.0) for index, text in enumerate(texts)]
+
+
+def test_chunks_are_page_aligned_and_bounded():
+    pages = pages_of("a" * 40, "b" * 40, "", "c" * 40, "d" * 10)
+
+    chunks = list(chunk_pages(pages, max_chars=90))
+
+    assert [(c["chunkIndex"], c["pageStart"], c["pageEnd"]) for c in chunks] == [
+        (0, 1, 2),
+        (1, 4, 5),
+    ]
+    assert chunks[0]["text"] == "a" * 40 + " " + "b" * 40
+    assert all(len(c["text"]) <= 90 for c in chunks)
+
+
+def test_oversized_page_is_split_at_whitespace():
+    long_page = " ".join(["word"] * 30)  # 149 characters
+    pages = pages_of("intro", long_page, "outro")
+
+    chunks = list(chunk_pages(pages, max_chars=50))
+
+    assert chunks[0] == {"chunkIndex": 0, "pageStart": 1, "pageEnd": 1, "text": "intro"}
+    middle = [c for c in chunks if c["pageStart"] == 2]
+    assert all(c["pageEnd"] == 2 and len(c["text"]) <= 50 for c in middle)
+    assert " ".join(c["text"] for c in middle) == long_page
+    assert chunks[-1]["text"] == "outro"
+    assert [c["chunkIndex"] for c in chunks] == list(range(len(chunks)))
+
+
+def test_encode_chunks_writes_one_json_line_per_chunk():
+    chunks = list(chunk_pages(pages_of("first page", "second page"), max_chars=12))
+
+    lines = (
+        gzip.decompress(encode_chunks(chunks, "APHIS-2022-0055-0002-1"))
+        .decode("utf-8")
+        .splitlines()
+    )
+
+    records = [json.loads(line) for line in lines]
+    assert records == [
+        {
+            "attachmentId": "APHIS-2022-0055-0002-1",
+            "chunkIndex": 0,
+            "pageStart": 1,
+            "pageEnd": 1,
+            "text": "first page",
+        },
+        {
+            "attachmentId": "APHIS-2022-0055-0002-1",
+            "chunkIndex": 1,
+            "pageStart": 2,
+            "pageEnd": 2,
+            "text": "second page",
+        },
+    ]
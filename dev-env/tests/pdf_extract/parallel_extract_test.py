@@ -0,0 +1,71 @@
+import io
+
+import pytest
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from lambda_functions.pdf_text_extract import parallel_extract
+from lambda_functions.pdf_text_extract.app import extract_text
+from lambda_functions.pdf_text_extract.parallel_extract import (
+    extract_pages,
+    extract_text_from_file,
+    plan_workers,
+    shard_ranges,
+)
+
+
+def write_pdf(path, pages):
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for page in range(pages):
+        c.drawString(100, 750, f"Content of page {page + 1}")
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+def test_shard_ranges_cover_every_page_in_order():
+    assert shard_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert shard_ranges(2, 4) == [(0, 1), (1, 2)]
+
+
+def test_plan_workers_serial_below_threshold(monkeypatch):
+    monkeypatch.setattr(parallel_extract, "PARALLEL_PAGE_THRESHOLD", 100)
+    assert plan_workers(99, max_workers=4) == 1
+    assert plan_workers(100, max_workers=4) == 4
+    assert plan_workers(500, max_workers=1) == 1
+
+
+def test_parallel_extraction_matches_serial(tmp_path, monkeypatch):
+    path = write_pdf(tmp_path / "doc.pdf", 7)
+    monkeypatch.setattr(parallel_extract, "PARALLEL_PAGE_THRESHOLD", 2)
+
+    page_stats = []
+    parallel_text = extract_text_from_file(path, page_stats, max_workers=3)
+    with open(path, "rb") as f:
+        serial_text = extract_text(io.BytesIO(f.read()))
+
+    assert parallel_text == serial_text
+    assert "Content of page 1" in parallel_text and "Content of page 7" in parallel_text
+    assert parallel_text.index("page 3") < parallel_text.index("page 4")
+    assert [stat["page"] for stat in page_stats] == list(range(7))
+
+
+def test_parallel_extraction_reports_worker_errors(tmp_path):
+    path = write_pdf(tmp_path / "doc.pdf", 2)
+
+    # Ask for a page range past the end of the document so a worker fails
+    with pytest.raises(RuntimeError, match="Parallel PDF extraction failed"):
+        parallel_extract.extract_pages_parallel(path, 4, 2)
+
+
+def test_extract_pages_stops_between_parallel_batches_and_resumes(tmp_path, monkeypatch):
+    path = write_pdf(tmp_path / "doc.pdf", 9)
+    monkeypatch.setattr(parallel_extract, "PARALLEL_PAGE_THRESHOLD", 2)
+    monkeypatch.setattr(parallel_extract, "BATCH_PAGES_PER_WORKER", 2)
+
+    first, page_count = extract_pages(path, should_stop=lambda: True, max_workers=2)
+    rest, _ = extract_pages(path, start=len(first), max_workers=2)
+
+    assert page_count == 9
+    assert [index for index, _, _ in first] == [0, 1, 2, 3]
+    assert [index for index, _, _ in first + rest] == list(range(9))
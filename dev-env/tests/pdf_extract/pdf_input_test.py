@@ -0,0 +1,81 @@
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from lambda_functions.pdf_text_extract import pdf_input
+from lambda_functions.pdf_text_extract.pdf_input import (
+    mapped_file,
+    probe_object,
+    spooled_object,
+)
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3")
+        client.create_bucket(Bucket="test-bucket")
+        yield client
+
+
+def test_spooled_object_downloads_and_cleans_up(s3):
+    s3.put_object(Bucket="test-bucket", Key="a.pdf", Body=b"%PDF-1.4 body")
+    with spooled_object(s3, "test-bucket", "a.pdf") as path:
+        with open(path, "rb") as f:
+            assert f.read() == b"%PDF-1.4 body"
+    assert not os.path.exists(path)
+
+
+def test_spooled_object_uses_ranged_parts_for_large_objects(s3, monkeypatch):
+    monkeypatch.setattr(pdf_input, "DOWNLOAD_PART_SIZE", 5 * 1024 * 1024)
+    body = os.urandom(11 * 1024 * 1024)
+    s3.put_object(Bucket="test-bucket", Key="big.pdf", Body=body)
+    with spooled_object(s3, "test-bucket", "big.pdf") as path, mapped_file(path) as data:
+        assert len(data) == len(body)
+        assert data[:] == body
+
+
+def test_spooled_object_removes_file_when_download_fails(s3, monkeypatch):
+    created = []
+    real_mkstemp = pdf_input.tempfile.mkstemp
+
+    def recording_mkstemp(*args, **kwargs):
+        fd, path = real_mkstemp(*args, **kwargs)
+        created.append(path)
+        return fd, path
+
+    monkeypatch.setattr(pdf_input.tempfile, "mkstemp", recording_mkstemp)
+    with pytest.raises(Exception):
+        with spooled_object(s3, "test-bucket", "missing.pdf"):
+            pass
+    assert created and not os.path.exists(created[0])
+
+
+def test_mapped_file_handles_empty_files(tmp_path):
+    path = tmp_path / "empty.pdf"
+    path.write_bytes(b"")
+    with mapped_file(str(path)) as data:
+        assert data[:5] == b""
+
+
+def test_probe_object_reads_prefix_and_total_size(s3):
+    body = b"%PDF-1.7" + b"x" * 5000
+    s3.put_object(Bucket="test-bucket", Key="a.pdf", Body=body)
+
+    head, size = probe_object(s3, "test-bucket", "a.pdf")
+
+    assert head == body[:1024]
+    assert size == len(body)
+
+
+def test_probe_object_small_and_empty_objects(s3):
+    s3.put_object(Bucket="test-bucket", Key="small.pdf", Body=b"<html>")
+    s3.put_object(Bucket="test-bucket", Key="empty.pdf", Body=b"")
+
+    assert probe_object(s3, "test-bucket", "small.pdf") == (b"<html>", 6)
+    assert probe_object(s3, "test-bucket", "empty.pdf") == (b"", 0)
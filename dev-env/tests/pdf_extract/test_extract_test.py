@@ -10,7 +10,13 @@ from reportlab.pdfgen import canvas
 import json
 
 # Add the parent directory of `app.py` to the Python path
-from lambda_functions.pdf_text_extract.app import handler, extract_text  # Import from app.py
+from lambda_functions.pdf_text_extract.app import (  # Import from app.py
+    handler,
+    extract_text,
+    summarize_page_stats,
+    write_text,
+)
+from lambda_functions.pdf_text_extract.page_text import iter_page_text
 
 
 def create_sample_pdf():
@@ -95,4 +101,35 @@ def test_extract_text_numbers_and_special_chars():
     # Print extracted text for debugging
     print(f"Extracted text (numbers & special chars): {extracted_text}")
 
-    print("✅ PDF with numbers and special characters processed correctly!")
\ No newline at end of file
+    print("✅ PDF with numbers and special characters processed correctly!")
+
+def test_iter_page_text_extracts_each_page_once():
+    pages = [MagicMock(), MagicMock(), MagicMock()]
+    pages[0].extract_text.return_value = "first\npage"
+    pages[1].extract_text.return_value = ""
+    pages[2].extract_text.return_value = None
+    reader = MagicMock(pages=pages)
+
+    result = [(index, text) for index, text, _ in iter_page_text(reader)]
+
+    assert result == [(0, "first page"), (1, ""), (2, "")]
+    for page in pages:
+        page.extract_text.assert_called_once_with()
+
+
+def test_write_text_streams_into_sink_and_records_page_stats():
+    pdf_stream = create_pdf_with_text(["line %d" % i for i in range(45)])  # two pages
+    from lambda_functions.pdf_text_extract.app import PdfReader
+
+    sink = io.StringIO()
+    page_stats = []
+    written = write_text(PdfReader(pdf_stream), sink, page_stats)
+
+    assert written == len(sink.getvalue())
+    assert "line 0" in sink.getvalue() and "line 44" in sink.getvalue()
+    assert "\n" not in sink.getvalue()
+    assert [stat["page"] for stat in page_stats] == [0, 1]
+    assert all(stat["chars"] > 0 and stat["seconds"] >= 0 for stat in page_stats)
+    summary = summarize_page_stats(page_stats)
+    assert summary["pages"] == 2 and summary["empty_pages"] == 0
+    assert summary["chars"] == sum(stat["chars"] for stat in page_stats)
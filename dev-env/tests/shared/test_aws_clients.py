@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+from shared import aws_clients
+from shared.aws_clients import get_client
+
+
+def test_get_client_is_cached_per_service():
+    with patch("boto3.client") as mock_boto:
+        mock_boto.side_effect = lambda name, **kwargs: object()
+
+        s3_first = get_client("s3")
+        s3_second = get_client("s3")
+        lambda_client = get_client("lambda")
+
+    assert s3_first is s3_second
+    assert lambda_client is not s3_first
+    assert mock_boto.call_count == 2
+
+
+def test_get_client_uses_tuned_config():
+    with patch("boto3.client") as mock_boto:
+        get_client("s3")
+        get_client("lambda")
+
+    s3_config = mock_boto.call_args_list[0].kwargs["config"]
+    assert s3_config.tcp_keepalive is True
+    assert s3_config.max_pool_connections == 32
+    assert s3_config.retries["mode"] == "standard"
+    lambda_config = mock_boto.call_args_list[1].kwargs["config"]
+    assert lambda_config.read_timeout == 900
+    assert lambda_config.tcp_keepalive is True
+
+
+def test_get_client_sam_local_lambda_endpoint():
+    with patch.dict("os.environ", {"AWS_SAM_LOCAL": "true"}):
+        with patch("boto3.client") as mock_boto:
+            get_client("lambda")
+            get_client("s3")
+
+    assert (
+        mock_boto.call_args_list[0].kwargs["endpoint_url"]
+        == aws_clients.SAM_LOCAL_LAMBDA_ENDPOINT
+    )
+    assert "endpoint_url" not in mock_boto.call_args_list[1].kwargs
+
+
+def test_clear_clients_forces_rebuild():
+    with patch("boto3.client") as mock_boto:
+        mock_boto.side_effect = lambda name, **kwargs: object()
+        first = get_client("secretsmanager")
+        aws_clients.clear_clients()
+        second = get_client("secretsmanager")
+
+    assert first is not second
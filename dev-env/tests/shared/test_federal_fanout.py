@@ -0,0 +1,125 @@
+import io
+import json
+import os
+import zipfile
+from unittest.mock import MagicMock
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from shared import federal_fanout
+from shared.federal_fanout import batched, queue_federal_ingest
+
+
+def test_batched_sorts_dedupes_and_splits():
+    assert list(batched(["c", "a", "b", "a", "d"], 2)) == [["a", "b"], ["c", "d"]]
+    assert list(batched([], 2)) == []
+
+
+def test_queue_federal_ingest_sends_one_event_per_batch():
+    client = MagicMock()
+    nums = {f"2024-{n:05d}" for n in range(45)}
+    assert queue_federal_ingest(client, "FederalFn", nums, batch_size=20) == {
+        "queued": sorted(nums),
+        "failed": [],
+    }
+    assert client.invoke.call_count == 3
+    sent = [
+        json.loads(c.kwargs["Payload"])["frdocnums"] for c in client.invoke.call_args_list
+    ]
+    assert sorted(len(batch) for batch in sent) == [5, 20, 20]
+    assert sorted(sum(sent, [])) == sorted(nums)
+    for c in client.invoke.call_args_list:
+        assert c.kwargs["FunctionName"] == "FederalFn"
+        assert c.kwargs["InvocationType"] == "Event"
+
+
+@pytest.fixture
+def lambda_client(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws(config={"lambda": {"use_docker": False}}):
+        role = boto3.client("iam").create_role(
+            RoleName="federal-ingest", AssumeRolePolicyDocument="{}"
+        )["Role"]["Arn"]
+        code = io.BytesIO()
+        with zipfile.ZipFile(code, "w") as archive:
+            archive.writestr("app.py", "def handler(event, context):\n    return event\n")
+        client = boto3.client("lambda")
+        client.create_function(
+            FunctionName="FederalFn",
+            Runtime="python3.12",
+            Role=role,
+            Handler="app.handler",
+            Code={"ZipFile": code.getvalue()},
+        )
+        yield client
+
+
+def _throttled():
+    return ClientError(
+        {"Error": {"Code": "TooManyRequestsException", "Message": "Rate exceeded"}},
+        "Invoke",
+    )
+
+
+def test_queue_federal_ingest_invokes_batches_concurrently(lambda_client):
+    recorder = MagicMock(wraps=lambda_client)
+    nums = [f"2024-{n:05d}" for n in range(95)]
+    summary = queue_federal_ingest(
+        recorder, "FederalFn", nums, batch_size=10, max_workers=4
+    )
+    assert summary == {"queued": nums, "failed": []}
+    sent = sorted(
+        num
+        for c in recorder.invoke.call_args_list
+        for num in json.loads(c.kwargs["Payload"])["frdocnums"]
+    )
+    assert sent == nums
+    assert recorder.invoke.call_count == 10
+
+
+def test_throttled_invokes_are_retried(lambda_client, monkeypatch):
+    monkeypatch.setattr(federal_fanout.time, "sleep", lambda seconds: None)
+    recorder = MagicMock(wraps=lambda_client)
+    calls = []
+
+    def invoke(**kwargs):
+        calls.append(kwargs)
+        if len(calls) <= 2:
+            raise _throttled()
+        return lambda_client.invoke(**kwargs)
+
+    recorder.invoke.side_effect = invoke
+    assert queue_federal_ingest(recorder, "FederalFn", ["2024-1"]) == {
+        "queued": ["2024-1"],
+        "failed": [],
+    }
+    assert len(calls) == 3
+
+
+def test_failed_batches_are_reported_and_others_still_queued(lambda_client, monkeypatch):
+    monkeypatch.setattr(federal_fanout.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(federal_fanout, "FANOUT_INVOKE_ATTEMPTS", 2)
+
+    def invoke(**kwargs):
+        if "2024-3" in json.loads(kwargs["Payload"])["frdocnums"]:
+            raise _throttled()
+        return lambda_client.invoke(**kwargs)
+
+    recorder = MagicMock(wraps=lambda_client)
+    recorder.invoke.side_effect = invoke
+    summary = queue_federal_ingest(
+        recorder, "FederalFn", ["2024-1", "2024-2", "2024-3", "2024-4"], batch_size=2
+    )
+    assert summary == {"queued": ["2024-1", "2024-2"], "failed": ["2024-3", "2024-4"]}
+    assert recorder.invoke.call_count == 3
+
+
+def test_fan_out_reports_skipped_when_no_function_is_configured(monkeypatch):
+    monkeypatch.delenv("SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION", raising=False)
+    summary = federal_fanout.fan_out_frdocnums({"2024-1"}, {}.get)
+    assert summary == {"queued": [], "failed": [], "skipped": ["2024-1"]}
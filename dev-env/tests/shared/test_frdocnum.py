@@ -0,0 +1,79 @@
+import json
+import sys
+
+import pytest
+
+from shared.frdocnum import collect_frdocnums, scan_frdocnums
+
+PAYLOADS = [
+    {
+        "data": {
+            "id": "EPA-HQ-OAR-2021-0317-0001",
+            "attributes": {"frDocNum": "2021-24202"},
+        }
+    },
+    {"frdocnum": " 2024-1 ", "items": [{"fdocnum": "2024-2"}, {"FDOCNUM": 2024}]},
+    {
+        "frdocnum": None,
+        "fdocnum": "",
+        "x": {"frdocnum": "   "},
+        "y": [True, {"frdocnum": False}],
+    },
+    {
+        "title": 'quoted {"frdocnum": "not-a-key"} and ,"fdocnum":"nor-this"',
+        "frdocnum": "2023-9",
+    },
+    {"frdocnum": "2022-é\\\"x", "nested": {"frdocnum": {"frdocnum": "2022-7"}}},
+    {"frdocnum": 1.5, "list": [[[{"fdocnum": "2020-1"}]]], "docnum": "ignored"},
+    [],
+]
+
+
+def test_collect_matches_key_names_case_insensitively():
+    data = {
+        "data": {"attributes": {"frDocNum": "2021-24202"}},
+        "included": [{"FdocNum": "2021-1"}],
+    }
+    assert collect_frdocnums(data) == {"2021-24202", "2021-1"}
+
+
+def test_collect_keeps_strings_and_numbers_only():
+    data = {
+        "frdocnum": 2024,
+        "x": {"fdocnum": True},
+        "y": [{"frdocnum": None}, {"frdocnum": " "}],
+    }
+    assert collect_frdocnums(data) == {"2024"}
+
+
+def test_collect_handles_nesting_beyond_recursion_limit():
+    depth = sys.getrecursionlimit() * 3
+    data = {"frdocnum": "top"}
+    node = data
+    for level in range(depth):
+        child = {"fdocnum": f"level-{level}"} if level == depth - 1 else {}
+        node["child"] = [child]
+        node = child
+    assert collect_frdocnums(data) == {"top", f"level-{depth - 1}"}
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_scan_matches_collect(payload):
+    for raw in (
+        json.dumps(payload),
+        json.dumps(payload, indent=2, ensure_ascii=False),
+        json.dumps(payload, separators=(",", ":")),
+    ):
+        assert scan_frdocnums(raw) == collect_frdocnums(payload)
+        assert scan_frdocnums(raw.encode("utf-8")) == collect_frdocnums(payload)
+
+
+def test_scan_ignores_key_text_inside_string_values():
+    raw = json.dumps({"body": '{"frdocnum": "2024-1"}', "other": ',"fdocnum": 5'})
+    assert scan_frdocnums(raw) == set()
+
+
+def test_scan_handles_deep_nesting():
+    depth = 5000
+    raw = '{"a":' * depth + '{"frdocnum":"2024-5"}' + '}' * depth
+    assert scan_frdocnums(raw) == {"2024-5"}
@@ -0,0 +1,136 @@
+import json
+import os
+from unittest.mock import MagicMock
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from shared import frdocnum_claims
+from shared.federal_fanout import fan_out_frdocnums
+from shared.frdocnum_claims import claim_new, clear_known_claims, release
+
+TABLE = "frdocnum-claims"
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    clear_known_claims()
+    with mock_aws():
+        client = boto3.client("dynamodb", region_name="us-east-1")
+        client.create_table(
+            TableName=TABLE,
+            BillingMode="PAY_PER_REQUEST",
+            AttributeDefinitions=[{"AttributeName": "frdocnum", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "frdocnum", "KeyType": "HASH"}],
+        )
+        yield client
+    clear_known_claims()
+
+
+def test_only_the_first_claim_wins(dynamodb):
+    assert claim_new(dynamodb, TABLE, {"2024-2", "2024-1"}, now=1000) == [
+        "2024-1",
+        "2024-2",
+    ]
+    clear_known_claims()  # another container
+    assert claim_new(dynamodb, TABLE, {"2024-1", "2024-3"}, now=1001) == ["2024-3"]
+    item = dynamodb.get_item(TableName=TABLE, Key={"frdocnum": {"S": "2024-1"}})["Item"]
+    assert item["claimed_at"] == {"N": "1000"}
+    assert int(item["expires_at"]["N"]) == 1000 + frdocnum_claims.CLAIM_TTL_SECONDS
+
+
+def test_warm_container_skips_the_table_for_known_claims(dynamodb):
+    claim_new(dynamodb, TABLE, {"2024-1"}, now=1000)
+    spy = MagicMock(wraps=dynamodb)
+    spy.exceptions = dynamodb.exceptions
+    assert claim_new(spy, TABLE, {"2024-1"}, now=1001) == []
+    spy.put_item.assert_not_called()
+
+
+def test_expired_claims_can_be_taken_again(dynamodb, monkeypatch):
+    monkeypatch.setattr(frdocnum_claims, "CLAIM_TTL_SECONDS", 60)
+    assert claim_new(dynamodb, TABLE, {"2024-1"}, now=1000) == ["2024-1"]
+    assert claim_new(dynamodb, TABLE, {"2024-1"}, now=1030) == []
+    assert claim_new(dynamodb, TABLE, {"2024-1"}, now=1061) == ["2024-1"]
+
+
+def test_force_always_claims(dynamodb):
+    claim_new(dynamodb, TABLE, {"2024-1"}, now=1000)
+    assert claim_new(dynamodb, TABLE, {"2024-1"}, force=True, now=1001) == ["2024-1"]
+
+
+def test_release_lets_the_next_payload_claim(dynamodb):
+    claim_new(dynamodb, TABLE, {"2024-1"}, now=1000)
+    release(dynamodb, TABLE, ["2024-1"])
+    assert claim_new(dynamodb, TABLE, {"2024-1"}, now=1001) == ["2024-1"]
+
+
+def test_warm_container_notices_a_claim_released_elsewhere(dynamodb, monkeypatch):
+    monkeypatch.setattr(frdocnum_claims, "CLAIM_LOCAL_SECONDS", 60)
+    claim_new(dynamodb, TABLE, {"2024-1"}, now=1000)
+    # The federal function failed to ingest the number and released it
+    dynamodb.delete_item(TableName=TABLE, Key={"frdocnum": {"S": "2024-1"}})
+    assert claim_new(dynamodb, TABLE, {"2024-1"}, now=1030) == []
+    assert claim_new(dynamodb, TABLE, {"2024-1"}, now=1061) == ["2024-1"]
+
+
+def _fan_out_clients(dynamodb, lambda_client):
+    return {"dynamodb": dynamodb, "lambda": lambda_client}.get
+
+
+def _queued(lambda_client):
+    return [json.loads(c.kwargs["Payload"]) for c in lambda_client.invoke.call_args_list]
+
+
+def test_fan_out_queues_each_number_once_across_payloads(dynamodb, monkeypatch):
+    monkeypatch.setenv("SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION", "FederalFn")
+    monkeypatch.setattr(frdocnum_claims, "CLAIM_TABLE", TABLE)
+    lambda_client = MagicMock()
+    get_client = _fan_out_clients(dynamodb, lambda_client)
+
+    assert fan_out_frdocnums({"2024-1", "2024-2"}, get_client)["queued"] == [
+        "2024-1",
+        "2024-2",
+    ]
+    assert fan_out_frdocnums({"2024-2", "2024-3"}, get_client) == {
+        "queued": ["2024-3"], "failed": [], "skipped": ["2024-2"],
+    }
+    assert fan_out_frdocnums({"2024-1"}, get_client) == {
+        "queued": [],
+        "failed": [],
+        "skipped": ["2024-1"],
+    }
+    assert _queued(lambda_client) == [
+        {"frdocnums": ["2024-1", "2024-2"]},
+        {"frdocnums": ["2024-3"]},
+    ]
+
+    assert fan_out_frdocnums({"2024-1"}, get_client, refresh=True)["queued"] == ["2024-1"]
+    assert _queued(lambda_client)[-1] == {"frdocnums": ["2024-1"], "refresh": True}
+
+
+def test_fan_out_releases_claims_when_the_invoke_fails(dynamodb, monkeypatch):
+    monkeypatch.setenv("SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION", "FederalFn")
+    monkeypatch.setattr(frdocnum_claims, "CLAIM_TABLE", TABLE)
+    failing = MagicMock()
+    failing.invoke.side_effect = RuntimeError("function not found")
+    summary = fan_out_frdocnums({"2024-1"}, _fan_out_clients(dynamodb, failing))
+    assert summary == {"queued": [], "failed": ["2024-1"], "skipped": []}
+    lambda_client = MagicMock()
+    assert fan_out_frdocnums({"2024-1"}, _fan_out_clients(dynamodb, lambda_client))[
+        "queued"
+    ] == ["2024-1"]
+
+
+def test_fan_out_without_claim_table_queues_everything(monkeypatch):
+    monkeypatch.setenv("SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION", "FederalFn")
+    monkeypatch.setattr(frdocnum_claims, "CLAIM_TABLE", "")
+    lambda_client = MagicMock()
+    get_client = {"lambda": lambda_client}.get
+    fan_out_frdocnums({"2024-1"}, get_client)
+    fan_out_frdocnums({"2024-1"}, get_client)
+    assert lambda_client.invoke.call_count == 2
@@ -0,0 +1,30 @@
+import sys
+import types
+
+from shared.lazy import lazy_callable
+
+
+def test_lazy_callable_imports_on_first_call(monkeypatch):
+    calls = []
+    module = types.ModuleType("fake_heavy_module")
+    module.work = lambda *args, **kwargs: calls.append((args, kwargs)) or "done"
+
+    work = lazy_callable("fake_heavy_module", "work")
+    # Nothing is imported until the stand-in is called
+    assert "fake_heavy_module" not in sys.modules
+
+    monkeypatch.setitem(sys.modules, "fake_heavy_module", module)
+    assert work(1, key="value") == "done"
+    assert calls == [((1,), {"key": "value"})]
+    assert work.__name__ == "work"
+
+
+def test_lazy_callable_resolves_once(monkeypatch):
+    module = types.ModuleType("fake_heavy_module")
+    module.work = lambda: "first"
+    monkeypatch.setitem(sys.modules, "fake_heavy_module", module)
+
+    work = lazy_callable("fake_heavy_module", "work")
+    assert work() == "first"
+    module.work = lambda: "second"
+    assert work() == "first"
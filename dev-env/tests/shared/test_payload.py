@@ -0,0 +1,36 @@
+import json
+
+from shared.payload import JsonPayload, parsed_json
+
+
+def test_payload_is_the_json_text():
+    payload = JsonPayload.from_bytes('{"id": "é"}'.encode("utf-8"))
+    assert payload == '{"id": "é"}'
+    assert isinstance(payload, str)
+    assert json.loads(payload) == {"id": "é"}
+
+
+def test_data_is_parsed_once_and_cached(monkeypatch):
+    payload = JsonPayload('{"a": [1, 2]}')
+    assert not payload.parsed
+    calls = []
+    real_loads = json.loads
+    monkeypatch.setattr(
+        json, "loads", lambda text: calls.append(text) or real_loads(text)
+    )
+    assert payload.data == {"a": [1, 2]}
+    assert payload.data is payload.data
+    assert calls == ['{"a": [1, 2]}']
+
+
+def test_from_data_keeps_the_parsed_value():
+    data = {"docketId": "EPA-1"}
+    payload = JsonPayload.from_data(data)
+    assert payload.parsed and payload.data is data
+    assert json.loads(payload) == data
+
+
+def test_parsed_json_accepts_plain_strings():
+    assert parsed_json('{"x": 1}') == {"x": 1}
+    payload = JsonPayload('{"x": 1}')
+    assert parsed_json(payload) is payload.data
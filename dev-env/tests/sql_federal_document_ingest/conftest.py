@@ -0,0 +1,114 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from lambda_functions.sql_federal_document_ingest.http_client import KeepAliveClient
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    """
+    A local stand-in for the Federal Register API. Answers from server.script (a list of
+    (status, headers, body)) first, then like the API: /documents/<n>[,<n>...].json and
+    the /documents.json publication-date search over server.published ({date: [numbers]}).
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append({
+            "path": self.path,
+            "headers": {k.lower(): v for k, v in self.headers.items()},
+            "client_port": self.client_address[1],
+        })
+        status, headers, body = server.script.pop(0) if server.script else _answer(self)
+        if "gzip" in self.headers.get("Accept-Encoding", "") and body:
+            body = gzip.compress(body)
+            headers = {**headers, "Content-Encoding": "gzip"}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _answer(handler):
+    url = urlsplit(handler.path)
+    path = url.path.removeprefix("/api/v1")
+    if path == "/documents.json":
+        return _search(handler.server, parse_qs(url.query))
+    nums = path.removeprefix("/documents/").removesuffix(".json").split(",")
+    if len(nums) > 1:
+        found = [{"document_number": n} for n in nums if n not in handler.server.missing]
+        body = {"count": len(found), "results": found}
+        return 200, {"Content-Type": "application/json"}, json.dumps(body).encode()
+    num = nums[0]
+    if num in handler.server.missing:
+        return 404, {}, b'{"status": 404, "message": "Record not found"}'
+    etag = f'"{num}-v1"'
+    if handler.headers.get("If-None-Match") == etag:
+        return 304, {"ETag": etag}, b""
+    return (
+        200,
+        {"ETag": etag, "Content-Type": "application/json"},
+        json.dumps({"document_number": num}).encode(),
+    )
+
+
+def _search(server, query):
+    start = query["conditions[publication_date][gte]"][0]
+    end = query["conditions[publication_date][lte]"][0]
+    per_page, page = int(query["per_page"][0]), int(query["page"][0])
+    nums = [
+        n
+        for day, day_nums in sorted(server.published.items())
+        if start <= day <= end
+        for n in day_nums
+    ]
+    results = [
+        {"document_number": n} for n in nums[(page - 1) * per_page:page * per_page]
+    ]
+    body = {
+        "count": len(nums),
+        "total_pages": -(-len(nums) // per_page),
+        "results": results,
+    }
+    return 200, {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+
+@pytest.fixture
+def stub_api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPI)
+    server.requests, server.script, server.missing, server.published = [], [], set(), {}
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_client(stub_api):
+    """
+    Factory of (KeepAliveClient for the stub server, list of the backoff sleeps it
+    recorded instead of sleeping).
+    """
+    def make(**kwargs):
+        sleeps = []
+        client = KeepAliveClient(
+            f"http://127.0.0.1:{stub_api.server_port}/api/v1",
+            sleep=sleeps.append,
+            **kwargs,
+        )
+        return client, sleeps
+    return make
@@ -29,7 +29,9 @@ def test_handler_fetches_when_frdocnum_in_event():
 
 
 def test_handler_reads_s3_when_bucket_and_key():
-    with patch("lambda_functions.sql_federal_document_ingest.app.boto3.client") as mock_boto:
+    with patch(
+        "lambda_functions.sql_federal_document_ingest.app.get_client"
+    ) as mock_boto:
         mock_s3 = MagicMock()
         mock_boto.return_value = mock_s3
         mock_s3.get_object.return_value = {
@@ -59,3 +61,90 @@ def test_handler_ingests_cfr_parts_when_no_cfr_references():
                 r = fed_app.handler({"frdocnum": "2024-10001"}, None)
                 ingest_cfr.assert_called_once_with(DOC_NO_CFR)
                 assert r["statusCode"] == 200
+
+
+def test_handler_fetches_frdocnums_batch_and_ingests_each():
+    docs = {"2024-10001": DOC_NO_CFR, "2024-10002": DOC_WITH_CFR}
+    with patch.object(
+        fed_app, "fetch_documents_json", return_value=(docs, ["2024-10003"])
+    ) as fetch:
+        with patch(
+            "lambda_functions.sql_federal_document_ingest.app.ingest_federal_document"
+        ) as ingest:
+            with patch(
+                "lambda_functions.sql_federal_document_ingest.app.ingest_cfr_part"
+            ) as ingest_cfr:
+                r = fed_app.handler(
+                    {"frdocnums": ["2024-10002", " 2024-10001 ", "2024-10003", ""]}, None
+                )
+    fetch.assert_called_once_with(
+        ["2024-10001", "2024-10002", "2024-10003"], refresh=False
+    )
+    assert [c.args[0] for c in ingest.call_args_list] == [DOC_NO_CFR, DOC_WITH_CFR]
+    assert ingest_cfr.call_count == 2
+    assert r["statusCode"] == 200
+    assert json.loads(r["body"]) == {
+        "ingested": ["2024-10001", "2024-10002"],
+        "not_found": ["2024-10003"],
+        "failed": {},
+    }
+
+
+def test_handler_reports_batch_documents_that_fail_to_ingest():
+    docs = {"2024-10001": DOC_NO_CFR, "2024-10002": DOC_WITH_CFR}
+    with patch.object(fed_app, "fetch_documents_json", return_value=(docs, [])):
+        with patch(
+            "lambda_functions.sql_federal_document_ingest.app.ingest_federal_document",
+            side_effect=[None, RuntimeError("db down")],
+        ):
+            with patch(
+                "lambda_functions.sql_federal_document_ingest.app.ingest_cfr_part"
+            ):
+                r = fed_app.handler({"frdocnums": ["2024-10001", "2024-10002"]}, None)
+    assert r["statusCode"] == 500
+    body = json.loads(r["body"])
+    assert body["ingested"] == ["2024-10001"]
+    assert body["failed"] == {"2024-10002": "db down"}
+
+
+def test_handler_reports_batch_the_api_would_not_serve_and_keeps_the_rest():
+    def fetch(batch, refresh=False):
+        if "2024-10001" in batch:
+            raise RuntimeError(
+                "HTTP 503 for https://www.federalregister.gov/api/v1/documents/"
+                "2024-10001.json"
+            )
+        return {num: DOC_NO_CFR for num in batch}, []
+
+    def one_per_batch(nums):
+        return ([num] for num in sorted(set(nums)))
+
+    with patch.object(fed_app, "batched", side_effect=one_per_batch), \
+            patch.object(fed_app, "fetch_documents_json", side_effect=fetch):
+        with patch.object(fed_app, "ingest_federal_document"):
+            with patch.object(fed_app, "ingest_cfr_part"):
+                r = fed_app.handler({"frdocnums": ["2024-10001", "2024-10002"]}, None)
+    assert r["statusCode"] == 500
+    body = json.loads(r["body"])
+    assert body["ingested"] == ["2024-10002"]
+    assert list(body["failed"]) == ["2024-10001"]
+    assert "HTTP 503" in body["failed"]["2024-10001"]
+
+
+def test_handler_releases_claims_on_numbers_that_failed(monkeypatch):
+    docs = {"2024-10001": DOC_NO_CFR, "2024-10002": DOC_WITH_CFR}
+    dynamodb = MagicMock()
+    monkeypatch.setattr(fed_app, "CLAIM_TABLE", "frdocnum-claims")
+    with patch.object(fed_app, "fetch_documents_json", return_value=(docs, [])), \
+            patch.object(fed_app, "get_client", return_value=dynamodb), \
+            patch.object(fed_app, "release") as release:
+        with patch(
+            "lambda_functions.sql_federal_document_ingest.app.ingest_federal_document",
+            side_effect=[None, RuntimeError("db down")],
+        ):
+            with patch(
+                "lambda_functions.sql_federal_document_ingest.app.ingest_cfr_part"
+            ):
+                r = fed_app.handler({"frdocnums": ["2024-10001", "2024-10002"]}, None)
+    assert r["statusCode"] == 500
+    release.assert_called_once_with(dynamodb, "frdocnum-claims", ["2024-10002"])
@@ -0,0 +1,134 @@
+import gzip
+import json
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from lambda_functions.sql_federal_document_ingest import federal_register_cache as cache
+from lambda_functions.sql_federal_document_ingest import federal_register_fetch as fetch
+from lambda_functions.sql_federal_document_ingest.prefetch import (
+    date_windows,
+    prefetch_range,
+)
+
+BUCKET = "cache-bucket"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def cached_api(s3, stub_api, stub_client, monkeypatch):
+    """
+    fetch_document_json wired to the stub API, with the response cache in the moto bucket.
+    """
+    client, _ = stub_client()
+    monkeypatch.setattr(fetch, "_client", client)
+    monkeypatch.setattr(cache, "CACHE_BUCKET", BUCKET)
+    cache.clear_local_cache()
+    yield stub_api
+    cache.clear_local_cache()
+
+
+def _api_paths(stub_api):
+    return [r["path"] for r in stub_api.requests]
+
+
+def test_second_fetch_is_served_from_cache(cached_api, s3):
+    first = fetch.fetch_document_json("2024-1")
+    assert fetch.fetch_document_json("2024-1") == first
+    assert _api_paths(cached_api) == ["/api/v1/documents/2024-1.json"]
+    stored = s3.get_object(Bucket=BUCKET, Key=cache.cache_key("2024-1"))
+    assert json.loads(gzip.decompress(stored["Body"].read())) == {
+        "document_number": "2024-1"
+    }
+
+
+def test_s3_copy_is_used_by_a_cold_container(cached_api):
+    fetch.fetch_document_json("2024-1")
+    cache.clear_local_cache()
+    assert json.loads(fetch.fetch_document_json("2024-1")) == {
+        "document_number": "2024-1"
+    }
+    assert len(cached_api.requests) == 1
+
+
+def test_expired_entries_are_refetched(cached_api, monkeypatch):
+    fetch.fetch_document_json("2024-1")
+    monkeypatch.setattr(cache, "CACHE_TTL_SECONDS", 0)
+    fetch.fetch_document_json("2024-1")
+    cache.clear_local_cache()
+    fetch.fetch_document_json("2024-1")
+    assert len(cached_api.requests) == 3
+
+
+def test_refresh_skips_the_lookup(cached_api):
+    fetch.fetch_document_json("2024-1")
+    fetch.fetch_document_json("2024-1", refresh=True)
+    assert len(cached_api.requests) == 2
+
+
+def test_batch_fetch_requests_only_the_misses(cached_api):
+    fetch.fetch_document_json("2024-2")
+    cached_api.missing.add("2024-9")
+    documents, missing = fetch.fetch_documents_json(
+        ["2024-1", "2024-2", "2024-3", "2024-9"]
+    )
+    assert sorted(documents) == ["2024-1", "2024-2", "2024-3"]
+    assert missing == ["2024-9"]
+    assert _api_paths(cached_api)[-1] == "/api/v1/documents/2024-1,2024-3,2024-9.json"
+    documents, missing = fetch.fetch_documents_json(["2024-1", "2024-3"])
+    assert sorted(documents) == ["2024-1", "2024-3"] and missing == []
+    assert len(cached_api.requests) == 2
+
+
+def test_no_bucket_means_no_cache(stub_api, stub_client, monkeypatch):
+    client, _ = stub_client()
+    monkeypatch.setattr(fetch, "_client", client)
+    monkeypatch.setattr(cache, "CACHE_BUCKET", "")
+    fetch.fetch_document_json("2024-1")
+    fetch.fetch_document_json("2024-1")
+    assert len(stub_api.requests) == 2
+
+
+def test_date_windows_cover_the_range():
+    assert list(date_windows("2024-01-01", "2024-01-10", 4)) == [
+        ("2024-01-01", "2024-01-04"),
+        ("2024-01-05", "2024-01-08"),
+        ("2024-01-09", "2024-01-10"),
+    ]
+    with pytest.raises(ValueError):
+        list(date_windows("2024-01-02", "2024-01-01"))
+
+
+def test_prefetch_pages_the_search_and_fills_the_cache(cached_api, s3, monkeypatch):
+    monkeypatch.setattr(fetch, "SEARCH_PAGE_SIZE", 2)
+    cached_api.published = {
+        "2024-01-02": ["2024-100", "2024-101", "2024-102"],
+        "2024-01-03": ["2024-103"],
+        "2024-01-09": ["2024-104"],
+    }
+    summary = prefetch_range("2024-01-01", "2024-01-10", window_days=7)
+    assert summary == {"found": 5, "cached": 5, "not_found": 0}
+    keys = {o["Key"] for o in s3.list_objects_v2(Bucket=BUCKET)["Contents"]}
+    assert keys == {cache.cache_key(f"2024-{n}") for n in range(100, 105)}
+    searches = [
+        p for p in _api_paths(cached_api) if p.startswith("/api/v1/documents.json")
+    ]
+    assert len(searches) == 3  # two pages for the first week, one for the rest
+
+    # Later ingests of these documents never reach the API.
+    cache.clear_local_cache()
+    before = len(cached_api.requests)
+    fetch.fetch_documents_json(["2024-100", "2024-104"])
+    assert len(cached_api.requests) == before
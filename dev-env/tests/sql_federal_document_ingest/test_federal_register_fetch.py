@@ -0,0 +1,42 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from lambda_functions.sql_federal_document_ingest import federal_register_fetch as fetch
+
+
+def test_fetch_documents_json_makes_one_comma_separated_request():
+    response = {
+        "count": 2,
+        "results": [
+            {"document_number": "2024-10002", "title": "B"},
+            {"document_number": "2024-10001", "title": "A"},
+        ],
+        "errors": {"not_found": ["2024-99999"]},
+    }
+    with patch.object(fetch, "_get", return_value=json.dumps(response)) as get:
+        documents, missing = fetch.fetch_documents_json(
+            ["2024-10002", "2024-99999", "2024-10001", "2024-10001"]
+        )
+    get.assert_called_once()
+    assert get.call_args.args[0] == "/documents/2024-10001,2024-10002,2024-99999.json"
+    assert {num: json.loads(doc)["title"] for num, doc in documents.items()} == {
+        "2024-10001": "A",
+        "2024-10002": "B",
+    }
+    assert missing == ["2024-99999"]
+
+
+def test_fetch_documents_json_accepts_a_bare_single_document():
+    with patch.object(
+        fetch, "_get", return_value=json.dumps({"document_number": "2024-10001"})
+    ):
+        documents, missing = fetch.fetch_documents_json(["2024-10001"])
+    assert list(documents) == ["2024-10001"]
+    assert missing == []
+
+
+def test_fetch_documents_json_rejects_empty_input():
+    with pytest.raises(ValueError):
+        fetch.fetch_documents_json([" ", ""])
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from lambda_functions.sql_federal_document_ingest import federal_register_fetch
+from lambda_functions.sql_federal_document_ingest.http_client import (
+    HTTPError,
+    backoff_seconds,
+    retry_after_seconds,
+)
+
+
+def test_reuses_one_connection_and_decompresses_gzip(stub_api, stub_client):
+    client, _ = stub_client()
+    bodies = [json.loads(client.get(f"/documents/2024-{n}.json").body) for n in range(5)]
+    assert bodies == [{"document_number": f"2024-{n}"} for n in range(5)]
+    assert client.connections_opened == 1
+    assert len({r["client_port"] for r in stub_api.requests}) == 1
+    assert all(r["headers"]["accept-encoding"] == "gzip" for r in stub_api.requests)
+    assert stub_api.requests[0]["path"] == "/api/v1/documents/2024-0.json"
+    client.close()
+
+
+def test_retries_429_and_5xx_honoring_retry_after(stub_api, stub_client):
+    stub_api.script = [
+        (429, {"Retry-After": "7"}, b"slow down"),
+        (503, {}, b"unavailable"),
+    ]
+    client, sleeps = stub_client()
+    response = client.get("/documents/2024-1.json")
+    assert json.loads(response.body) == {"document_number": "2024-1"}
+    assert len(stub_api.requests) == 3
+    assert sleeps[0] >= 7
+    assert 0 <= sleeps[1] <= 1.0
+
+
+def test_gives_up_after_max_attempts(stub_api, stub_client):
+    stub_api.script = [(502, {}, b"bad gateway")] * 3
+    client, sleeps = stub_client(max_attempts=3)
+    with pytest.raises(HTTPError) as raised:
+        client.get("/documents/2024-1.json")
+    assert raised.value.status == 502
+    assert raised.value.body == b"bad gateway"
+    assert len(sleeps) == 2
+
+
+def test_does_not_retry_client_errors(stub_api, stub_client):
+    stub_api.script = [(404, {}, b"not found")]
+    client, sleeps = stub_client()
+    with pytest.raises(HTTPError):
+        client.get("/documents/missing.json")
+    assert len(stub_api.requests) == 1
+    assert sleeps == []
+
+
+def test_refetch_is_conditional_and_304_returns_the_stored_body(stub_api, stub_client):
+    client, _ = stub_client()
+    first = client.get("/documents/2024-1.json")
+    second = client.get("/documents/2024-1.json")
+    assert stub_api.requests[1]["headers"]["if-none-match"] == '"2024-1-v1"'
+    assert second.not_modified and second.body == first.body
+    third = client.get("/documents/2024-1.json", conditional=False)
+    assert "if-none-match" not in stub_api.requests[2]["headers"]
+    assert not third.not_modified
+
+
+def test_stored_bodies_are_bounded_by_total_size(stub_api, stub_client, monkeypatch):
+    from lambda_functions.sql_federal_document_ingest import http_client
+
+    body_size = len(json.dumps({"document_number": "2024-1"}))
+    monkeypatch.setattr(http_client, "VALIDATOR_MAX_BYTES", 2 * body_size)
+    client, _ = stub_client()
+    for n in (1, 2, 3):
+        client.get(f"/documents/2024-{n}.json")
+    assert client._validator_bytes <= 2 * body_size
+
+    # The oldest body was evicted, so its re-fetch is unconditional; the newest is kept
+    client.get("/documents/2024-1.json")
+    assert "if-none-match" not in stub_api.requests[-1]["headers"]
+    assert client.get("/documents/2024-3.json").not_modified
+
+    monkeypatch.setattr(http_client, "VALIDATOR_MAX_BYTES", body_size - 1)
+    client.get("/documents/2024-4.json")
+    assert not client.get("/documents/2024-4.json").not_modified
+
+
+def test_recovers_when_server_closed_the_idle_connection(stub_api, stub_client):
+    client, sleeps = stub_client()
+    client.get("/documents/2024-1.json")
+    # Simulate the server timing out the kept-alive connection.
+    client._idle[0].sock.close()
+    assert json.loads(client.get("/documents/2024-2.json").body) == {
+        "document_number": "2024-2"
+    }
+    assert client.connections_opened == 2
+    assert sleeps == []
+
+
+def test_retry_after_parsing_and_backoff_bounds():
+    assert retry_after_seconds("12") == 12.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(None) is None
+    assert all(0 <= backoff_seconds(0) <= 0.5 for _ in range(50))
+    assert backoff_seconds(0, retry_after=3) >= 3
+
+
+def test_fetch_document_json_goes_through_the_stub(stub_api, stub_client, monkeypatch):
+    client, _ = stub_client()
+    monkeypatch.setattr(federal_register_fetch, "_client", client)
+    assert json.loads(federal_register_fetch.fetch_document_json(" 2024-10001 ")) == {
+        "document_number": "2024-10001"
+    }
+    stub_api.script = [(404, {}, b'{"errors": "not found"}')]
+    with pytest.raises(ValueError, match="HTTP 404 for frdocnum='2024-x'"):
+        federal_register_fetch.fetch_document_json("2024-x")
@@ -13,6 +13,7 @@ sys.modules['psycopg'] = MagicMock()
 
 # import the handler
 from lambda_functions.sql_docket_ingest.app import handler
+from shared.aws_clients import get_client
 
 @pytest.fixture
 def aws_credentials():
@@ -140,7 +141,10 @@ def test_handler_with_empty_file(mock_s3_bucket):
         assert 'File content is empty' in json.loads(response['body'])['error']
 
 def test_handler_queues_federal_ingest_for_frdocnums(mock_s3_bucket, aws_credentials):
-    """After docket ingest, each unique frdocnum/fdocnum triggers async federal Lambda."""
+    """
+    After docket ingest, the unique frdocnum/fdocnum values are sent to the federal Lambda
+    in one batch.
+    """
     os.environ["SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION"] = "SQLFederalDocumentIngestFunction"
     body = {
         "data": {"id": "D-1"},
@@ -157,28 +161,29 @@ def test_handler_queues_federal_ingest_for_frdocnums(mock_s3_bucket, aws_credent
     )
     event = {"bucket": "test-bucket", "file_key": "raw-data/docket_D-1.json"}
     mock_lambda_client = MagicMock()
-    real_boto_client = boto3.client
+    real_get_client = get_client
 
-    def _client(name, **kwargs):
+    def _client(name):
         if name == "lambda":
             return mock_lambda_client
-        return real_boto_client(name, **kwargs)
+        return real_get_client(name)
 
     with patch("lambda_functions.sql_docket_ingest.app.ingest_docket"):
-        with patch("lambda_functions.sql_docket_ingest.app.boto3.client", side_effect=_client):
+        with patch(
+            "lambda_functions.sql_docket_ingest.app.get_client", side_effect=_client
+        ):
             response = handler(event, {})
     assert response["statusCode"] == 200
-    assert mock_lambda_client.invoke.call_count == 2
-    payloads = []
-    for c in mock_lambda_client.invoke.call_args_list:
-        kwargs = c[1]
-        payloads.append(json.loads(kwargs["Payload"].decode("utf-8")))
-    nums = {p["frdocnum"] for p in payloads}
-    assert nums == {"2024-10001", "2024-10002"}
-    for c in mock_lambda_client.invoke.call_args_list:
-        kwargs = c[1]
-        assert kwargs["FunctionName"] == "SQLFederalDocumentIngestFunction"
-        assert kwargs["InvocationType"] == "Event"
+    assert json.loads(response["body"])["federal_fanout"] == {
+        "queued": ["2024-10001", "2024-10002"], "failed": [], "skipped": [],
+    }
+    mock_lambda_client.invoke.assert_called_once()
+    kwargs = mock_lambda_client.invoke.call_args[1]
+    assert json.loads(kwargs["Payload"].decode("utf-8")) == {
+        "frdocnums": ["2024-10001", "2024-10002"]
+    }
+    assert kwargs["FunctionName"] == "SQLFederalDocumentIngestFunction"
+    assert kwargs["InvocationType"] == "Event"
     del os.environ["SQL_FEDERAL_DOCUMENT_INGEST_FUNCTION"]
 
 
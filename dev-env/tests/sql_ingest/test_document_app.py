@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from moto import mock_aws
+
+sys.modules['common.ingest'] = MagicMock()
+sys.modules['psycopg'] = MagicMock()
+
+from lambda_functions.sql_document_ingest import app as document_app
+from shared.payload import JsonPayload
+
+KEY = (
+    "raw-data/EPA/EPA-HQ-OAR-2021-0317/text-EPA-HQ-OAR-2021-0317/documents/"
+    "EPA-HQ-OAR-2021-0317-0001.json"
+)
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="test-bucket")
+        yield client
+
+
+def _run(s3, body):
+    s3.put_object(Bucket="test-bucket", Key=KEY, Body=json.dumps(body))
+    with patch.object(document_app, "ingest_document") as ingest:
+        response = document_app.handler({"bucket": "test-bucket", "file_key": KEY}, {})
+    assert response["statusCode"] == 200
+    ingest.assert_called_once()
+    return ingest.call_args.args[0]
+
+
+def test_ingest_receives_the_parsed_payload(s3):
+    body = {"docketId": "EPA-HQ-OAR-2021-0317", "data": {"attributes": {"title": "Rule"}}}
+    payload = _run(s3, body)
+    assert isinstance(payload, JsonPayload)
+    assert payload.parsed and payload.data == body
+    assert json.loads(payload) == body
+
+
+def test_null_docket_id_is_filled_from_the_key(s3):
+    payload = _run(s3, {"docketId": None, "data": {}})
+    assert payload.data == {"docketId": "EPA-HQ-OAR-2021-0317", "data": {}}
+    assert json.loads(payload) == payload.data